@@ -121,6 +121,29 @@ function formatFileSize(bytes) {
     return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
 }
 
+// POST form data, gzip-compressing the request body when the browser supports it
+async function postForm(url, formData) {
+    if (typeof CompressionStream === 'undefined') {
+        return fetch(url, { method: 'POST', body: formData });
+    }
+
+    // Let the browser build the multipart body and boundary, then compress it
+    const request = new Request(url, { method: 'POST', body: formData });
+    const contentType = request.headers.get('Content-Type');
+    const compressedBody = await new Response(
+        request.body.pipeThrough(new CompressionStream('gzip'))
+    ).blob();
+
+    return fetch(url, {
+        method: 'POST',
+        body: compressedBody,
+        headers: {
+            'Content-Type': contentType,
+            'Content-Encoding': 'gzip'
+        }
+    });
+}
+
 // API Functions
 async function handleFindKoreanText() {
     if (!findFile) {
@@ -135,10 +158,7 @@ async function handleFindKoreanText() {
         formData.append('file', findFile);
         formData.append('template_type', findTemplateType.value);
 
-        const response = await fetch(`${API_BASE_URL}/api/search/`, {
-            method: 'POST',
-            body: formData
-        });
+        const response = await postForm(`${API_BASE_URL}/api/search/`, formData);
 
         const result = await response.json();
         console.log("Response:", result);
@@ -172,10 +192,7 @@ async function handleApplyTranslation() {
         formData.append('template_type', applyTemplateType.value);
         formData.append('return_file', true);    
 
-        const response = await fetch(`${API_BASE_URL}/api/apply/`, {
-            method: 'POST',
-            body: formData
-        });
+        const response = await postForm(`${API_BASE_URL}/api/apply/`, formData);
 
         if (response.ok) {
             // Get the processed file content
@@ -2,6 +2,9 @@
 
 import os
 
+# WSGI application (run with: gunicorn -c gunicorn.conf.py)
+wsgi_app = "wsgi:application"
+
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
 backlog = 2048
@@ -17,6 +20,11 @@ keepalive = 2
 max_requests = 1000
 max_requests_jitter = 100
 
+# Load the app once in the master and fork workers from it, so imports,
+# Swagger models, compiled patterns and warmed caches are shared
+# copy-on-write instead of being rebuilt by every worker
+preload_app = os.environ.get('LOCALE_TOOL_PRELOAD', '1') != '0'
+
 # Logging
 accesslog = "-"
 errorlog = "-"
@@ -35,3 +43,40 @@ tmp_upload_dir = None
 # SSL (not needed for Railway)
 keyfile = None
 certfile = None
+
+
+# Server hooks
+
+def when_ready(server):
+    """Warm up the preloaded app in the master, right before the first fork"""
+    if preload_app:
+        from api.app import warm_up
+        stats = warm_up(freeze=True)
+        server.log.info(
+            "Warmed up in %.2fs (%d files, %d cached strings)",
+            stats['duration'], stats['files'], stats['cached_strings']
+        )
+
+
+def post_worker_init(worker):
+    """Without preloading, every worker warms up before accepting requests
+
+    Threads do not survive the fork, so the upload janitor starts here, in
+    every worker, rather than in the master. Readiness reports utilization
+    against the request slots of all workers, and the counts of workers
+    that died without child_exit are dropped.
+    """
+    from api.app import load_monitor, upload_store, warm_up
+    if not preload_app:
+        warm_up()
+    upload_store.start()
+    load_monitor.set_capacity(worker.cfg.workers * worker.cfg.threads)
+    load_monitor.release_dead_workers()
+
+
+def child_exit(server, worker):
+    """Drop the in-flight count of an exited worker (recycled, timed out or killed)"""
+    if preload_app:
+        # Without preloading the master holds no monitor shared with the workers
+        from api.app import load_monitor
+        load_monitor.release_worker(worker.pid)
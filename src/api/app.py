@@ -1,17 +1,43 @@
-from flask import Flask, request, send_file, make_response
-from flask_restx import Api, Resource, fields, Namespace
+from flask import Flask, request, send_file, Response, stream_with_context
+from flask_restx import Api, Resource, fields, inputs, Namespace
 from flask_cors import CORS
 from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import HTTPException
 import os
-import re
+import sys
 import time
-import tempfile
-import shutil
 from typing import List, Dict
 import json
+import sqlite3
+
+# Make sibling modules importable both as `python app.py` and as `api.app`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from locale_service import LocaleService, ScanBudgetExceeded
+from catalog_export import CONTENT_TYPES, EXPORT_FORMATS, iter_catalog
+from payload_limits import check_upload_text, init_payload_limits, read_upload_text
+from compression import init_compression
+from profiling import init_profiling
+from readiness import LoadMonitor, init_readiness, readiness
+from serialization import init_serialization
+from downloads import attachment_response, iter_encoded, iter_zip, unique_archive_names
+from jobs import JOB_OPERATIONS, JobManager, QueueFullError
+from warmup import freeze_shared_state, warm_up_engine
+from upload_store import QuotaExceededError, UploadStore, init_upload_store
+from scan_store import apply_record, content_hash, content_path, open_default_store, search_record
+from suggestions import SuggestionIndex, add_element_suggestions, load_catalog_index, placeholder_suggestions
+from sessions import SessionMismatchError, SessionNotFoundError, parse_element_ids
+from sessions import open_default_store as open_session_store
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+init_payload_limits(app)  # Per-endpoint size limits and spooled uploads
+init_compression(app)  # gzip/brotli request and response bodies
+init_profiling(app)  # Admin-gated single-request profiling (LOCALE_TOOL_PROFILE_TOKEN)
+
+# Load signals for /api/health/ready, in memory shared with forked workers
+load_monitor = LoadMonitor()
+init_readiness(app, load_monitor)
 
 # Configuration
 UPLOAD_FOLDER = os.path.join(os.path.expanduser('~'), 'locale_tool_uploads')
@@ -20,6 +46,11 @@ ALLOWED_EXTENSIONS = {'tsx'}
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Uploads saved to disk, by content hash (the janitor starts in every worker
+# on its first request, or from gunicorn's post_worker_init)
+upload_store = UploadStore(legacy_dir=UPLOAD_FOLDER)
+init_upload_store(app, upload_store)
+
 # Initialize Flask-RESTX
 api = Api(
     app,
@@ -29,232 +60,23 @@ api = Api(
     doc='/docs/',  # Swagger UI will be available at /docs/
     prefix='/api'
 )
-
-class LocaleService:
-    """Service class containing the core locale processing logic"""
-    
-    def __init__(self):
-        # Korean language detection pattern
-        self.korean_pattern = re.compile(r'[가-힣]+')
-        
-        # Template patterns
-        self.bt_template = r'\{bt\("W\d+",\s*"([^"]+)"\)\}'
-        self.bvt_template = r'\{bvt\(([^)]+)\)\}'
-    
-    def detect_korean_text(self, text: str) -> List[str]:
-        """Detect Korean text in the given string"""
-        # Find all Korean text segments first
-        korean_segments = self.korean_pattern.findall(text)
-        
-        if not korean_segments:
-            return []
-        
-        # If there's only one segment, return it
-        if len(korean_segments) == 1:
-            return korean_segments
-        
-        # If there are multiple segments, try to find the largest continuous block
-        largest_joined = ""
-        
-        # Try all possible combinations of segments
-        for i in range(len(korean_segments)):
-            for j in range(i + 1, len(korean_segments) + 1):
-                # Try to join segments from i to j-1
-                joined_text = " ".join(korean_segments[i:j])
-                # Check if this joined text exists in the original text
-                if joined_text in text and len(joined_text) > len(largest_joined):
-                    largest_joined = joined_text
-        
-        # If we found a joined text, return it
-        if largest_joined:
-            return [largest_joined]
-        
-        # If no joined text found, return all segments
-        return korean_segments
-    
-    def find_tsx_elements_with_korean(self, content: str) -> List[Dict]:
-        """Find TSX elements containing Korean text"""
-        elements = []
-        
-        # First, find simple elements (those without nested tags)
-        simple_pattern = r'<(\w+)([^>]*?)>([^<]*)</\1>'
-        
-        for match in re.finditer(simple_pattern, content):
-            tag_name = match.group(1)
-            attributes = match.group(2)
-            inner_text = match.group(3).strip()
-            
-            # Check if inner text contains Korean
-            korean_texts = self.detect_korean_text(inner_text)
-            if korean_texts:
-                elements.append({
-                    'tag': tag_name,
-                    'attributes': attributes,
-                    'inner_text': inner_text,
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_simple': True
-                })
-        
-        # Also check for self-closing tags with Korean text in attributes
-        self_closing_pattern = r'<(\w+)([^>]*?)/>'
-        for match in re.finditer(self_closing_pattern, content):
-            tag_name = match.group(1)
-            attributes = match.group(2)
-            
-            # Check if attributes contain Korean text
-            korean_texts = self.detect_korean_text(attributes)
-            if korean_texts:
-                elements.append({
-                    'tag': tag_name,
-                    'attributes': attributes,
-                    'inner_text': '',
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_self_closing': True
-                })
-        
-        # Also check for attributes with Korean text
-        attr_pattern = r'(\w+)=["\']([^"\']*[가-힣]+[^"\']*)["\']'
-        for match in re.finditer(attr_pattern, content):
-            attr_name = match.group(1)
-            attr_value = match.group(2)
-            korean_texts = self.detect_korean_text(attr_value)
-            if korean_texts:
-                elements.append({
-                    'tag': 'attribute',
-                    'attributes': f'{attr_name}="{attr_value}"',
-                    'inner_text': attr_value,
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_attribute': True
-                })
-        
-        return elements
-    
-    def has_any_template(self, text: str) -> bool:
-        """Check if text has any template (bt or bvt)"""
-        bt_pattern = r'\{bt\("W\d+",\s*"[^"]+"\)\}'
-        return bool(re.search(bt_pattern, text) or re.search(self.bvt_template, text))
-    
-    def search_untemplated(self, content: str) -> Dict:
-        """Search for elements without templates"""
-        start_time = time.time()
-        
-        # Find elements with Korean text
-        elements = self.find_tsx_elements_with_korean(content)
-        
-        # Filter out already templated elements
-        untemplated_elements = []
-        for element in elements:
-            if not self.has_any_template(element['full_match']):
-                untemplated_elements.append(element)
-        
-        duration = time.time() - start_time
-        
-        return {
-            'success': True,
-            'count': len(untemplated_elements),
-            'elements': untemplated_elements,
-            'duration': duration,
-            'message': f'Found {len(untemplated_elements)} untemplated Korean elements'
-        }
-    
-    def apply_template(self, content: str, template_type: str = 'bt') -> Dict:
-        """Apply selected template to the content"""
-        start_time = time.time()
-        
-        if template_type not in ['bt', 'bvt']:
-            return {
-                'success': False,
-                'error': 'Invalid template type. Must be "bt" or "bvt"'
-            }
-        
-        if template_type == 'bvt':
-            return {
-                'success': False,
-                'error': 'BVT Template is temporarily disabled. Only BT Template is available.'
-            }
-        
-        try:
-            updated_content = content
-            replacements_count = 0
-            
-            if template_type == "bt":
-                # Process simple JSX elements
-                simple_pattern = r'<(\w+)([^>]*?)>([^<]*)</\1>'
-                simple_matches = list(re.finditer(simple_pattern, updated_content))
-                
-                # Process simple matches in reverse order
-                for match in reversed(simple_matches):
-                    tag_name = match.group(1)
-                    attributes = match.group(2)
-                    inner_text = match.group(3)
-                    
-                    # Check if already templated
-                    if self.has_any_template(match.group(0)):
-                        continue
-                    
-                    # Check if inner text contains Korean
-                    korean_texts = self.detect_korean_text(inner_text)
-                    if not korean_texts:
-                        continue
-                    
-                    # Apply BT template to Korean text only
-                    replacements_count += 1
-                    new_inner_text = inner_text
-                    for korean_text in korean_texts:
-                        if not self.has_any_template(korean_text):
-                            new_inner_text = new_inner_text.replace(korean_text, f'{{bt("W#", "{korean_text}")}}')
-                    
-                    # Replace the entire match
-                    new_element = f'<{tag_name}{attributes}>{new_inner_text}</{tag_name}>'
-                    updated_content = updated_content[:match.start()] + new_element + updated_content[match.end():]
-                
-                # Replace attributes with Korean text
-                attr_pattern = r'(\w+)=["\']([^"\']*[가-힣]+[^"\']*)["\']'
-                attr_matches = list(re.finditer(attr_pattern, updated_content))
-                
-                # Process matches in reverse order
-                for match in reversed(attr_matches):
-                    attr_name = match.group(1)
-                    attr_value = match.group(2)
-                    
-                    # Check if already templated
-                    if self.has_any_template(match.group(0)):
-                        continue
-                    
-                    # Apply BT template
-                    replacements_count += 1
-                    bt_template = f'bt("W#", "{attr_value}")'
-                    new_attr = f'{attr_name}={{{bt_template}}}'
-                    updated_content = updated_content[:match.start()] + new_attr + updated_content[match.end():]
-            
-            duration = time.time() - start_time
-            
-            return {
-                'success': True,
-                'updated_content': updated_content,
-                'replacements_count': replacements_count,
-                'duration': duration,
-                'message': f'Template applied successfully! {replacements_count} replacements in {duration:.2f}s'
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Failed to apply template: {str(e)}'
-            }
+init_serialization(api)  # Single-pass JSON encoding of (large) results
 
 # Initialize the service
 locale_service = LocaleService()
 
+# Search/apply history (LOCALE_TOOL_STORE=0 disables recording)
+scan_store = open_default_store()
+
+# Background jobs for long-running batch scans (threads start on first submit)
+job_manager = JobManager(service=locale_service, store=scan_store)
+
+# Search sessions applied without a rescan (LOCALE_TOOL_SESSIONS=0 disables them)
+session_store = open_session_store()
+
+# Existing translations suggested for untemplated strings (LOCALE_TOOL_CATALOG_PATHS)
+suggestion_index = load_catalog_index()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -265,44 +87,115 @@ def save_uploaded_file(uploaded_file, save_to_disk=False):
         return None, "File type not allowed. Only TSX files are supported."
     
     try:
-        content = uploaded_file.read().decode('utf-8')
-        uploaded_file.seek(0)  # Reset file pointer
+        # Read from the (possibly disk-spooled) upload stream
+        content = read_upload_text(uploaded_file)
         
         if save_to_disk:
-            # Save to upload directory
-            filename = uploaded_file.filename
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            
-            # Create backup if file exists
-            if os.path.exists(file_path):
-                backup_path = file_path + '.backup'
-                shutil.copy2(file_path, backup_path)
-            
-            # Save file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            return content, file_path
+            # Stored once per distinct content, so same-name uploads never collide
+            return content, upload_store.save(content)
         else:
             # Just return content without saving
             return content, None
             
     except UnicodeDecodeError:
         return None, "File must be UTF-8 encoded"
+    except QuotaExceededError as e:
+        return None, str(e)
     except Exception as e:
         return None, f"Error processing file: {str(e)}"
 
+def record_scan(operation, records):
+    """Write a scan to the history store; a store failure never fails the request"""
+    if scan_store is None:
+        return
+    try:
+        scan_store.record_scan(operation, records, source='api')
+    except sqlite3.Error as e:
+        app.logger.warning(f'Could not record {operation} scan: {e}')
+
+def search_status(result):
+    """HTTP status of a search result: partial results of an aborted scan are a 422"""
+    return 200 if result['success'] else 422
+
+def suggestion_indexes(content):
+    """The catalog index plus the templates already in the scanned file"""
+    return (suggestion_index, SuggestionIndex.from_content(content))
+
+def with_search_suggestions(result, content):
+    """Attach existing translations similar to each search hit"""
+    add_element_suggestions(result['elements'], suggestion_indexes(content))
+    return result
+
+def with_apply_suggestions(result, content):
+    """Attach existing translations similar to the newly wrapped texts"""
+    result['suggestions'] = placeholder_suggestions(result['updated_content'], suggestion_indexes(content))
+    return result
+
+def with_search_session(result, content, requested):
+    """Number the hits and attach a session token holding the apply plan of the search
+    
+    Only done when the caller asks for a session: the plan is a second pass
+    over the content and a file on disk, which plain searches do not pay for.
+    """
+    if not requested or session_store is None or not result['success']:
+        return result
+    for number, element in enumerate(result['elements']):
+        element['id'] = number
+    try:
+        units = locale_service.plan_template_units(content)
+        result['session'] = session_store.create(content, result['elements'], units)
+    except ScanBudgetExceeded:
+        # Apply without a session plans from scratch and reports the abort
+        pass
+    except OSError as e:
+        app.logger.warning(f'Could not store search session: {e}')
+    return result
+
+def session_plan(content, token, element_ids):
+    """Stored (edits, count) of a search session for an apply, or None without a token
+    
+    Raises SessionNotFoundError (404), SessionMismatchError (409) and
+    ValueError (400) for invalid element IDs; see session_error.
+    """
+    element_ids = parse_element_ids(element_ids)
+    if not token:
+        if element_ids is not None:
+            raise ValueError('element_ids requires the session token of a search')
+        return None
+    if session_store is None:
+        raise SessionNotFoundError('Search sessions are disabled (LOCALE_TOOL_SESSIONS=0)')
+    return session_store.plan(token, content, element_ids)
+
+def session_error(error):
+    """Error response for an exception raised by session_plan"""
+    if isinstance(error, SessionNotFoundError):
+        status = 404
+    elif isinstance(error, SessionMismatchError):
+        status = 409
+    else:
+        status = 400
+    return {
+        'success': False,
+        'error': str(error)
+    }, status
+
 # Create namespaces
 health_ns = Namespace('health', description='Health check operations')
 search_ns = Namespace('search', description='Search for untemplated Korean elements')
 apply_ns = Namespace('apply', description='Apply templates to Korean text')
 file_ns = Namespace('file', description='File processing operations')
+export_ns = Namespace('export', description='Export untemplated strings as a translation catalog')
+jobs_ns = Namespace('jobs', description='Asynchronous batch jobs')
+history_ns = Namespace('history', description='Stored search and apply history')
 
 # Add namespaces to API
 api.add_namespace(health_ns)
 api.add_namespace(search_ns)
 api.add_namespace(apply_ns)
 api.add_namespace(file_ns)
+api.add_namespace(export_ns)
+api.add_namespace(jobs_ns)
+api.add_namespace(history_ns)
 
 # Define API models
 health_model = api.model('Health', {
@@ -312,23 +205,60 @@ health_model = api.model('Health', {
 })
 
 content_model = api.model('Content', {
-    'content': fields.String(required=True, description='TSX content to process')
+    'content': fields.String(required=True, description='TSX content to process'),
+    'filename': fields.String(required=False, description='File name recorded in the scan history'),
+    'session': fields.Boolean(required=False, default=False, description='Number the hits and return a session token for a selective apply')
 })
 
 # File upload parser for search endpoint
 search_parser = api.parser()
 search_parser.add_argument('file', location='files', type=FileStorage, required=True, help='TSX file to process')
 search_parser.add_argument('template_type', location='form', default='bt', choices=['bt', 'bvt'], help='Template type to use for search')
+search_parser.add_argument('session', location='form', type=inputs.boolean, default=False, help='Number the hits and return a session token for a selective apply')
 
 # File upload parser for apply endpoint  
 apply_parser = api.parser()
 apply_parser.add_argument('file', location='files', type=FileStorage, required=True, help='TSX file to process')
 apply_parser.add_argument('template_type', location='form', default='bt', choices=['bt', 'bvt'], help='Template type to apply')
 apply_parser.add_argument('return_file', location='form', type=bool, default=False, help='Whether to return the processed file as download')
+apply_parser.add_argument('session', location='form', required=False, help='Session token of a search of the same file: apply its plan without rescanning')
+apply_parser.add_argument('element_ids', location='form', required=False, help='Comma-separated IDs of the search hits to template (requires session; default all)')
+
+# File upload parser for export endpoint
+export_parser = api.parser()
+export_parser.add_argument('files', location='files', type=FileStorage, action='append', required=True, help='TSX files to export strings from')
+export_parser.add_argument('format', location='form', default='json', choices=list(EXPORT_FORMATS), help='Catalog format')
+
+# File upload parser for multi-file zip download
+apply_zip_parser = api.parser()
+apply_zip_parser.add_argument('files', location='files', type=FileStorage, action='append', required=True, help='TSX files to process')
+apply_zip_parser.add_argument('template_type', location='form', default='bt', choices=['bt', 'bvt'], help='Template type to apply')
+
+# File upload parser for job submission
+job_parser = api.parser()
+job_parser.add_argument('files', location='files', type=FileStorage, action='append', required=True, help='TSX files to process')
+job_parser.add_argument('operation', location='form', default='search', choices=list(JOB_OPERATIONS), help='Operation to perform')
+job_parser.add_argument('template_type', location='form', default='bt', choices=['bt', 'bvt'], help='Template type to apply')
+
+# Query parsers for the scan history
+history_strings_parser = api.parser()
+history_strings_parser.add_argument('text', location='args', required=True, help='Korean text to look up')
+history_strings_parser.add_argument('tag', location='args', required=False, help='Only hits with this tag')
+
+history_trend_parser = api.parser()
+history_trend_parser.add_argument('path', location='args', required=False, help='Trend of a single file')
+history_trend_parser.add_argument('limit', location='args', type=int, default=50, help='Number of points')
+
+history_file_parser = api.parser()
+history_file_parser.add_argument('path', location='args', required=True, help='File path or upload name')
+history_file_parser.add_argument('limit', location='args', type=int, default=50, help='Number of entries')
 
 apply_model = api.model('ApplyTemplate', {
     'content': fields.String(required=True, description='TSX content to process'),
-    'template_type': fields.String(required=False, default='bt', enum=['bt', 'bvt'], description='Template type to apply')
+    'template_type': fields.String(required=False, default='bt', enum=['bt', 'bvt'], description='Template type to apply'),
+    'filename': fields.String(required=False, description='File name recorded in the scan history'),
+    'session': fields.String(required=False, description='Session token of a search of the same content: apply its plan without rescanning'),
+    'element_ids': fields.List(fields.Integer, required=False, description='IDs of the search hits to template (requires session; default all)')
 })
 
 file_model = api.model('ProcessFile', {
@@ -337,17 +267,35 @@ file_model = api.model('ProcessFile', {
     'template_type': fields.String(required=False, default='bt', enum=['bt', 'bvt'], description='Template type to apply')
 })
 
+suggestion_model = api.model('Suggestion', {
+    'id': fields.String(description='Template ID of the existing translation'),
+    'text': fields.String(description='Text of the existing translation'),
+    'score': fields.Float(description='Similarity of the bigram sets (Dice coefficient, 0-1)')
+})
+
+placeholder_suggestion_model = api.model('PlaceholderSuggestion', {
+    'text': fields.String(description='Text wrapped in a new W# placeholder'),
+    'suggestions': fields.List(fields.Nested(suggestion_model), description='Existing translations with similar text, best first')
+})
+
 element_model = api.model('Element', {
+    'id': fields.Integer(description='Hit number, used to select hits when applying a search session'),
     'tag': fields.String(description='HTML/JSX tag name'),
     'attributes': fields.String(description='Element attributes'),
     'inner_text': fields.String(description='Inner text content'),
     'korean_texts': fields.List(fields.String, description='Korean text segments found'),
     'start': fields.Integer(description='Start position in content'),
     'end': fields.Integer(description='End position in content'),
+    'line': fields.Integer(description='Start line (1-based)'),
+    'column': fields.Integer(description='Start column (1-based)'),
+    'end_line': fields.Integer(description='End line (1-based)'),
+    'end_column': fields.Integer(description='End column (1-based)'),
     'full_match': fields.String(description='Full matched element'),
     'is_simple': fields.Boolean(description='Whether element is simple (no nested tags)'),
     'is_self_closing': fields.Boolean(description='Whether element is self-closing'),
-    'is_attribute': fields.Boolean(description='Whether this is an attribute match')
+    'is_attribute': fields.Boolean(description='Whether this is an attribute match'),
+    'partially_templated': fields.Boolean(description='Whether the element already has templates and text left outside them'),
+    'suggestions': fields.List(fields.Nested(suggestion_model), description='Existing translations with similar text, best first')
 })
 
 debug_info_model = api.model('DebugInfo', {
@@ -364,6 +312,9 @@ search_response_model = api.model('SearchResponse', {
     'message': fields.String(description='Response message'),
     'filename': fields.String(description='Name of uploaded file (if applicable)'),
     'template_type': fields.String(description='Template type used for search'),
+    'partial': fields.Boolean(description='Whether the scan was aborted by the scan budget (elements found before it)'),
+    'error': fields.String(description='Why the scan was aborted'),
+    'session': fields.String(description='Token for /api/apply/ with the same content: applies the plan of this search (when requested)'),
     'debug_info': fields.Nested(debug_info_model, description='Debug information about the file')
 })
 
@@ -374,7 +325,60 @@ apply_response_model = api.model('ApplyResponse', {
     'duration': fields.Float(description='Processing time in seconds'),
     'message': fields.String(description='Response message'),
     'filename': fields.String(description='Name of uploaded file (if applicable)'),
-    'template_type': fields.String(description='Template type applied')
+    'template_type': fields.String(description='Template type applied'),
+    'suggestions': fields.List(fields.Nested(placeholder_suggestion_model), description='Existing translations that could replace new W# placeholders')
+})
+
+readiness_thresholds_model = api.model('ReadinessThresholds', {
+    'max_utilization': fields.Float(description='Not ready at or above this utilization (0 disables)'),
+    'max_queue_depth': fields.Integer(description='Not ready at or above this job queue depth (0 disables)'),
+    'max_p95_seconds': fields.Float(description='Not ready at or above this p95 scan latency (0 disables)'),
+    'min_memory_mb': fields.Float(description='Not ready below this memory headroom (0 disables)')
+})
+
+readiness_model = api.model('Readiness', {
+    'ready': fields.Boolean(description='Whether the server should receive new requests'),
+    'reasons': fields.List(fields.String, description='Thresholds that are exceeded'),
+    'in_flight': fields.Integer(description='Requests being handled, probes excluded'),
+    'capacity': fields.Integer(description='Requests handled at once (workers x threads)'),
+    'utilization': fields.Float(description='in_flight / capacity'),
+    'queue_depth': fields.Integer(description='Jobs waiting in the queue of this worker'),
+    'jobs_running': fields.Integer(description='Jobs running in this worker'),
+    'job_workers': fields.Integer(description='Job threads per worker'),
+    'recent_scans': fields.Integer(description='Scans finished within the window'),
+    'p95_scan_seconds': fields.Float(description='p95 duration of the recent scans (null without any)'),
+    'memory_available_bytes': fields.Integer(description='Memory left before the cgroup limit or MemAvailable (null if unknown)'),
+    'thresholds': fields.Nested(readiness_thresholds_model, description='Configured thresholds')
+})
+
+cache_stats_model = api.model('CacheStats', {
+    'hits': fields.Integer(description='Number of cache hits'),
+    'misses': fields.Integer(description='Number of cache misses'),
+    'hit_rate': fields.Float(description='Fraction of lookups served from the cache'),
+    'size': fields.Integer(description='Number of cached strings'),
+    'max_size': fields.Integer(description='Maximum number of cached strings')
+})
+
+metrics_model = api.model('Metrics', {
+    'detect_cache': fields.Nested(cache_stats_model, description='detect_korean_text memo cache statistics'),
+    'scripts': fields.List(fields.String, description='Scripts enabled for detection')
+})
+
+job_model = api.model('Job', {
+    'job_id': fields.String(description='Job identifier'),
+    'operation': fields.String(description='Operation performed by the job'),
+    'template_type': fields.String(description='Template type'),
+    'status': fields.String(description='queued, running, completed or failed'),
+    'filenames': fields.List(fields.String, description='Names of the submitted files'),
+    'files_total': fields.Integer(description='Number of files in the job'),
+    'files_done': fields.Integer(description='Number of files processed so far'),
+    'bytes_total': fields.Integer(description='Total size of the submitted files in bytes'),
+    'bytes_processed': fields.Integer(description='Bytes processed so far'),
+    'created_at': fields.Float(description='Submission time (UNIX timestamp)'),
+    'started_at': fields.Float(description='Start time (UNIX timestamp)'),
+    'finished_at': fields.Float(description='Completion time (UNIX timestamp)'),
+    'expires_at': fields.Float(description='Time after which the result is deleted (UNIX timestamp)'),
+    'error': fields.String(description='Error message if the job failed')
 })
 
 error_model = api.model('Error', {
@@ -394,9 +398,39 @@ class HealthCheck(Resource):
             'version': '1.0.0'
         }
 
+@health_ns.route('/ready')
+class Readiness(Resource):
+    @health_ns.response(200, 'Ready', readiness_model)
+    @health_ns.response(503, 'Not ready: a load threshold is exceeded', readiness_model)
+    @health_ns.doc('readiness')
+    def get(self):
+        """Readiness for load balancers and autoscalers, from live load signals"""
+        result = readiness(load_monitor.snapshot(
+            queue_depth=job_manager.queue_depth(),
+            jobs_running=job_manager.running_count,
+            job_workers=job_manager.workers
+        ))
+        if result['ready']:
+            return result, 200
+        return result, 503, {'Retry-After': '5'}
+
+@health_ns.route('/metrics')
+class Metrics(Resource):
+    @health_ns.marshal_with(metrics_model)
+    @health_ns.doc('metrics')
+    def get(self):
+        """Engine metrics for this worker process"""
+        return {
+            'detect_cache': locale_service.cache_stats(),
+            'scripts': list(locale_service.scripts)
+        }
+
 @search_ns.route('/')
 class SearchUntemplated(Resource):
     @search_ns.expect(search_parser)
+    @search_ns.response(200, 'Success', search_response_model)
+    @search_ns.response(400, 'Invalid request', error_model)
+    @search_ns.response(422, 'Scan aborted by the scan budget (partial result)', search_response_model)
     @search_ns.doc('search_untemplated')
     def post(self):
         """Search for untemplated Korean elements in uploaded TSX file"""
@@ -425,21 +459,27 @@ class SearchUntemplated(Resource):
             # Get search results from locale service
             result = locale_service.search_untemplated(content)
             
+            record_scan('search', [search_record(uploaded_file.filename, content, result)])
+            with_search_suggestions(result, content)
+            with_search_session(result, content, args['session'])
+            
             # Add additional information
             result['filename'] = uploaded_file.filename
             result['template_type'] = template_type
             
             # Add debug information
-            korean_pattern = re.compile(r'[가-힣]+')
-            korean_matches = korean_pattern.findall(content)
+            korean_matches = locale_service.korean_pattern.findall(content)
             result['debug_info'] = {
                 'file_size': len(content),
                 'korean_segments_found': len(korean_matches),
                 'korean_segments': korean_matches[:5] if korean_matches else []
             }
             
-            return result, 200
+            return result, search_status(result)
             
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -449,6 +489,9 @@ class SearchUntemplated(Resource):
 @search_ns.route('/content')
 class SearchUntemplatedContent(Resource):
     @search_ns.expect(content_model)
+    @search_ns.response(200, 'Success', search_response_model)
+    @search_ns.response(400, 'Invalid request', error_model)
+    @search_ns.response(422, 'Scan aborted by the scan budget (partial result)', search_response_model)
     @search_ns.doc('search_untemplated_content')
     def post(self):
         """Search for untemplated Korean elements in TSX content (text input)"""
@@ -469,8 +512,13 @@ class SearchUntemplatedContent(Resource):
                 }, 400
             
             result = locale_service.search_untemplated(content)
-            return result, 200
+            record_scan('search', [search_record(content_path(data.get('filename'), content), content, result)])
+            with_search_suggestions(result, content)
+            return with_search_session(result, content, data.get('session') is True), search_status(result)
             
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -480,6 +528,11 @@ class SearchUntemplatedContent(Resource):
 @apply_ns.route('/')
 class ApplyTemplate(Resource):
     @apply_ns.expect(apply_parser)
+    @apply_ns.response(200, 'Success', apply_response_model)
+    @apply_ns.response(400, 'Invalid request', error_model)
+    @apply_ns.response(404, 'Unknown or expired search session', error_model)
+    @apply_ns.response(409, 'Content does not match the searched content of the session', error_model)
+    @apply_ns.response(422, 'Scan aborted by the scan budget (return_file=true)', error_model)
     @apply_ns.doc('apply_template')
     def post(self):
         """Apply template to uploaded TSX file"""
@@ -506,62 +559,126 @@ class ApplyTemplate(Resource):
                     'error': _  # _ contains error message in this case
                 }, 400
             
+            # The plan of a reviewed search, if one is given
+            try:
+                plan = session_plan(content, args.get('session'), args.get('element_ids'))
+            except (SessionNotFoundError, SessionMismatchError, ValueError) as e:
+                return session_error(e)
+            
+            if return_file and template_type == 'bt':
+                # Stream the download straight from the planned edits: the
+                # rewritten file is never staged in a temporary file
+                try:
+                    edits, replacements_count = plan if plan is not None else \
+                        locale_service.plan_template_edits(content)
+                except ScanBudgetExceeded as e:
+                    return {
+                        'success': False,
+                        'error': str(e)
+                    }, 422
+                record_scan('apply', [apply_record(uploaded_file.filename, content_hash(content), replacements_count)])
+                response = attachment_response(
+                    iter_encoded(locale_service.iter_edited(content, edits)),
+                    f"processed_{uploaded_file.filename}",
+                    'text/plain'
+                )
+                response.headers['X-Replacements-Count'] = str(replacements_count)
+                return response
+            
             # Apply template
-            result = locale_service.apply_template(content, template_type)
+            result = locale_service.apply_template(content, template_type, plan)
             
             if result['success']:
+                record_scan('apply', [apply_record(uploaded_file.filename, content_hash(content), result['replacements_count'])])
+                with_apply_suggestions(result, content)
+                
                 # Add file operation info to result
                 result['filename'] = uploaded_file.filename
                 result['template_type'] = template_type
                 
-                if return_file:
-                    # Return the processed file as download
-                    try:
-                        # Create temporary file with processed content
-                        temp_file = tempfile.NamedTemporaryFile(
-                            mode='w', 
-                            suffix='.tsx', 
-                            delete=False, 
-                            encoding='utf-8'
-                        )
-                        temp_file.write(result['updated_content'])
-                        temp_file.close()
-                        
-                        # Create response with file download
-                        response = make_response(send_file(
-                            temp_file.name,
-                            as_attachment=True,
-                            download_name=f"processed_{uploaded_file.filename}",
-                            mimetype='text/plain'
-                        ))
-                        
-                        # Clean up temp file after sending
-                        def remove_file(response):
-                            try:
-                                os.unlink(temp_file.name)
-                            except:
-                                pass
-                            return response
-                        
-                        response.call_on_close(lambda: os.unlink(temp_file.name))
-                        
-                        return response
-                        
-                    except Exception as file_error:
-                        return {
-                            'success': False,
-                            'error': f'Failed to create download file: {str(file_error)}'
-                        }, 500
-                else:
-                    # Return JSON response with updated content
-                    result['message'] += " (Use return_file=true to download the processed file)"
-                    return result, 200
+                # Return JSON response with updated content
+                result['message'] += " (Use return_file=true to download the processed file)"
+                return result, 200
             else:
                 return {
                     'success': False,
                     'error': result['error']
                 }, 400
                 
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Internal server error: {str(e)}'
+            }, 500
+
+@apply_ns.route('/zip')
+class ApplyTemplateZip(Resource):
+    @apply_ns.expect(apply_zip_parser)
+    @apply_ns.response(200, 'Zip archive of the processed files')
+    @apply_ns.response(400, 'Invalid request', error_model)
+    @apply_ns.response(422, 'Scan aborted by the scan budget', error_model)
+    @apply_ns.doc('apply_template_zip')
+    def post(self):
+        """Apply templates to several uploaded TSX files and stream them back as a zip archive"""
+        try:
+            args = apply_zip_parser.parse_args()
+            uploaded_files = args['files'] or []
+            
+            if not uploaded_files:
+                return {
+                    'success': False,
+                    'error': 'At least one file is required'
+                }, 400
+            if args['template_type'] != 'bt':
+                return {
+                    'success': False,
+                    'error': 'BVT Template is temporarily disabled. Only BT Template is available.'
+                }, 400
+            for uploaded_file in uploaded_files:
+                if not allowed_file(uploaded_file.filename):
+                    return {
+                        'success': False,
+                        'error': f'File type not allowed: {uploaded_file.filename}. Only TSX files are supported.'
+                    }, 400
+            
+            # Every upload is decoded and planned before the 200 headers are
+            # sent: an error in a later file must not truncate the archive
+            planned = []
+            for uploaded_file in uploaded_files:
+                try:
+                    content = read_upload_text(uploaded_file)
+                except UnicodeDecodeError:
+                    return {
+                        'success': False,
+                        'error': f'File must be UTF-8 encoded: {uploaded_file.filename}'
+                    }, 400
+                try:
+                    edits, replacements_count = locale_service.plan_template_edits(content)
+                except ScanBudgetExceeded as e:
+                    return {
+                        'success': False,
+                        'error': f'{uploaded_file.filename}: {e}'
+                    }, 422
+                planned.append((uploaded_file.filename, content, edits, replacements_count))
+            record_scan('apply', [
+                apply_record(filename, content_hash(content), replacements_count)
+                for filename, content, _, replacements_count in planned
+            ])
+            
+            def producer(content, edits):
+                # Only the encoding and compression of the planned output is streamed
+                return lambda: iter_encoded(locale_service.iter_edited(content, edits))
+            
+            names = unique_archive_names(filename for filename, _, _, _ in planned)
+            entries = [(name, producer(content, edits)) for name, (_, content, edits, _) in zip(names, planned)]
+            return attachment_response(iter_zip(entries), 'processed.zip', 'application/zip')
+            
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -571,6 +688,10 @@ class ApplyTemplate(Resource):
 @apply_ns.route('/content')
 class ApplyTemplateContent(Resource):
     @apply_ns.expect(apply_model)
+    @apply_ns.response(200, 'Success', apply_response_model)
+    @apply_ns.response(400, 'Invalid request', error_model)
+    @apply_ns.response(404, 'Unknown or expired search session', error_model)
+    @apply_ns.response(409, 'Content does not match the searched content of the session', error_model)
     @apply_ns.doc('apply_template_content')
     def post(self):
         """Apply template to TSX content (text input)"""
@@ -592,16 +713,26 @@ class ApplyTemplateContent(Resource):
                     'error': 'Content must be a string'
                 }, 400
             
-            result = locale_service.apply_template(content, template_type)
+            try:
+                plan = session_plan(content, data.get('session'), data.get('element_ids'))
+            except (SessionNotFoundError, SessionMismatchError, ValueError) as e:
+                return session_error(e)
+            
+            result = locale_service.apply_template(content, template_type, plan)
             
             if result['success']:
-                return result, 200
+                record_scan('apply', [apply_record(content_path(data.get('filename'), content),
+                                                   content_hash(content), result['replacements_count'])])
+                return with_apply_suggestions(result, content), 200
             else:
                 return {
                     'success': False,
                     'error': result['error']
                 }, 400
                 
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -611,11 +742,11 @@ class ApplyTemplateContent(Resource):
 @file_ns.route('/')
 class ProcessFile(Resource):
     @file_ns.expect(file_model)
-    @file_ns.marshal_with(search_response_model, code=200)
-    @file_ns.marshal_with(apply_response_model, code=200)
-    @file_ns.marshal_with(error_model, code=400)
-    @file_ns.marshal_with(error_model, code=404)
-    @file_ns.marshal_with(error_model, code=500)
+    # Documentation only: results are encoded directly, not marshalled field by field
+    @file_ns.response(200, 'Search result (operation=search) or ApplyResponse (operation=apply)', search_response_model)
+    @file_ns.response(400, 'Invalid request', error_model)
+    @file_ns.response(404, 'File not found', error_model)
+    @file_ns.response(500, 'Internal server error', error_model)
     @file_ns.doc('process_file')
     def post(self):
         """Process a file by file path (for server-side file processing)"""
@@ -638,6 +769,9 @@ class ProcessFile(Resource):
             
             if operation == 'search':
                 result = locale_service.search_untemplated(content)
+                record_scan('search', [search_record(file_path, content, result)])
+                with_search_suggestions(result, content)
+                return result, search_status(result)
             elif operation == 'apply':
                 result = locale_service.apply_template(content, template_type)
                 
@@ -653,14 +787,234 @@ class ProcessFile(Resource):
                         file.write(result['updated_content'])
                     
                     result['backup_created'] = backup_path
+                    record_scan('apply', [apply_record(file_path, content_hash(content), result['replacements_count'])])
+                    with_apply_suggestions(result, content)
             else:
                 api.abort(400, 'Invalid operation. Must be "search" or "apply"')
             
             return result
             
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
         except Exception as e:
             api.abort(500, f'Internal server error: {str(e)}')
 
+@export_ns.route('/')
+class ExportCatalog(Resource):
+    @export_ns.expect(export_parser)
+    @export_ns.doc('export_catalog')
+    def post(self):
+        """Export untemplated strings from uploaded TSX files as a JSON, CSV or XLIFF catalog"""
+        try:
+            args = export_parser.parse_args()
+            uploaded_files = args['files'] or []
+            export_format = args['format']
+            
+            if not uploaded_files:
+                return {
+                    'success': False,
+                    'error': 'At least one file is required'
+                }, 400
+            
+            for uploaded_file in uploaded_files:
+                if not allowed_file(uploaded_file.filename):
+                    return {
+                        'success': False,
+                        'error': f'File type not allowed: {uploaded_file.filename}. Only TSX files are supported.'
+                    }, 400
+                # Checked before the catalog starts streaming: a bad file later
+                # in the stream could only truncate the download
+                try:
+                    check_upload_text(uploaded_file)
+                except UnicodeDecodeError:
+                    return {
+                        'success': False,
+                        'error': f'File must be UTF-8 encoded: {uploaded_file.filename}'
+                    }, 400
+            
+            def iter_sources():
+                # Decode one upload at a time so only one file is held in memory
+                for uploaded_file in uploaded_files:
+                    yield uploaded_file.filename, read_upload_text(uploaded_file)
+            
+            extension = 'xlf' if export_format == 'xliff' else export_format
+            response = Response(
+                stream_with_context(iter_catalog(iter_sources(), export_format, locale_service)),
+                mimetype=CONTENT_TYPES[export_format]
+            )
+            response.headers['Content-Disposition'] = f'attachment; filename=catalog.{extension}'
+            return response
+            
+        except HTTPException:
+            # Let aborts and payload limit errors keep their status code
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Internal server error: {str(e)}'
+            }, 500
+
+@jobs_ns.route('/')
+class SubmitJob(Resource):
+    @jobs_ns.expect(job_parser)
+    @jobs_ns.response(202, 'Job accepted', job_model)
+    @jobs_ns.response(503, 'Job queue is full', error_model)
+    @jobs_ns.doc('submit_job')
+    def post(self):
+        """Submit a batch search or apply job and return its job ID"""
+        try:
+            args = job_parser.parse_args()
+            uploaded_files = args['files'] or []
+            
+            if not uploaded_files:
+                return {
+                    'success': False,
+                    'error': 'At least one file is required'
+                }, 400
+            
+            files = []
+            for uploaded_file in uploaded_files:
+                content, error = save_uploaded_file(uploaded_file, save_to_disk=False)
+                if content is None:
+                    return {
+                        'success': False,
+                        'error': f'{uploaded_file.filename}: {error}'
+                    }, 400
+                files.append((uploaded_file.filename, content))
+            
+            status = job_manager.submit(args['operation'], files, args['template_type'])
+            return status, 202
+            
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
+        except QueueFullError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 503, {'Retry-After': '5'}
+        except HTTPException:
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Internal server error: {str(e)}'
+            }, 500
+
+@jobs_ns.route('/<string:job_id>')
+class JobStatus(Resource):
+    @jobs_ns.response(200, 'Success', job_model)
+    @jobs_ns.response(404, 'Job not found', error_model)
+    @jobs_ns.doc('job_status')
+    def get(self, job_id):
+        """Get the status and progress of a job"""
+        status = job_manager.get_status(job_id)
+        if status is None:
+            return {
+                'success': False,
+                'error': 'Job not found or expired'
+            }, 404
+        return status, 200
+
+@jobs_ns.route('/<string:job_id>/result')
+class JobResult(Resource):
+    @jobs_ns.response(200, 'Job result')
+    @jobs_ns.response(404, 'Job not found', error_model)
+    @jobs_ns.response(409, 'Job not finished', error_model)
+    @jobs_ns.doc('job_result')
+    def get(self, job_id):
+        """Fetch the result of a completed job"""
+        status = job_manager.get_status(job_id)
+        if status is None:
+            return {
+                'success': False,
+                'error': 'Job not found or expired'
+            }, 404
+        if status['status'] == 'failed':
+            return {
+                'success': False,
+                'error': status['error']
+            }, 500
+        if status['status'] != 'completed':
+            return {
+                'success': False,
+                'error': f'Job is {status["status"]}'
+            }, 409
+        
+        # Stream the stored result from disk
+        return send_file(job_manager.result_path(job_id), mimetype='application/json')
+
+def require_scan_store():
+    if scan_store is None:
+        api.abort(404, 'Scan history is disabled (LOCALE_TOOL_STORE=0)')
+
+@history_ns.route('/strings')
+class HistoryStrings(Resource):
+    @history_ns.expect(history_strings_parser)
+    @history_ns.doc('history_strings')
+    def get(self):
+        """List the files whose latest search contains an untemplated string"""
+        require_scan_store()
+        args = history_strings_parser.parse_args()
+        files = scan_store.files_using(args['text'], args['tag'])
+        return {
+            'success': True,
+            'text': args['text'],
+            'count': sum(f['count'] for f in files),
+            'files': files
+        }, 200
+
+@history_ns.route('/trend')
+class HistoryTrend(Resource):
+    @history_ns.expect(history_trend_parser)
+    @history_ns.doc('history_trend')
+    def get(self):
+        """Untemplated counts of recent searches, oldest first"""
+        require_scan_store()
+        args = history_trend_parser.parse_args()
+        return {
+            'success': True,
+            'path': args['path'],
+            'points': scan_store.untemplated_trend(args['path'], args['limit'])
+        }, 200
+
+@history_ns.route('/file')
+class HistoryFile(Resource):
+    @history_ns.expect(history_file_parser)
+    @history_ns.doc('history_file')
+    def get(self):
+        """Recent searches and applies of one file, newest first"""
+        require_scan_store()
+        args = history_file_parser.parse_args()
+        return {
+            'success': True,
+            'path': args['path'],
+            'scans': scan_store.file_history(args['path'], args['limit'])
+        }, 200
+
+def warm_up(freeze: bool = False) -> Dict:
+    """Warm the engine and the Swagger schema before serving traffic
+    
+    Called by gunicorn in the master process when the app is preloaded,
+    so the warmed state is shared by every forked worker. With freeze=True
+    the garbage collector is frozen afterwards to keep that state shared.
+    """
+    start_time = time.time()
+    result = warm_up_engine(locale_service)
+    result['catalog_entries'] = len(suggestion_index)
+    
+    # Flask-RESTX builds the Swagger spec lazily on the first /swagger.json
+    with app.test_request_context():
+        api.__schema__
+    
+    if freeze:
+        freeze_shared_state()
+    result['duration'] = time.time() - start_time
+    return result
+
 if __name__ == '__main__':
     # Get port from environment variable (Railway sets this)
     port = int(os.environ.get('PORT', 5000))
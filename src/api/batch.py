@@ -0,0 +1,275 @@
+"""
+Parallel multi-file apply with a single global W-ID allocation.
+
+Files are scanned by a pool of worker processes. Each worker runs the normal
+`apply_template` rewrite, which emits `bt("W#", ...)` placeholders. A single
+writer stage in the parent process then walks the results in sorted path
+order and replaces every placeholder with a real ID, so the same text gets
+the same ID across all files and the output does not depend on how the
+workers were scheduled.
+"""
+
+import os
+import re
+import time
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from locale_service import LineIndex, LocaleService, ScanBudgetExceeded
+from scan_store import content_hash
+
+# Placeholder emitted by LocaleService.apply_template
+PLACEHOLDER_PATTERN = re.compile(r'bt\("W#",\s*"([^"]*)"\)')
+
+# Already allocated IDs, e.g. bt("W1152", "저장")
+EXISTING_ID_PATTERN = re.compile(r'bt\("W(\d+)",\s*"([^"]*)"\)')
+
+# Directories that never contain project sources
+SKIP_DIRS = {'node_modules', '.git', 'build', 'dist', '__pycache__'}
+
+# One service per worker process
+_service = None
+
+
+def _get_service() -> LocaleService:
+    global _service
+    if _service is None:
+        _service = LocaleService()
+    return _service
+
+
+def find_tsx_files(root: str) -> List[str]:
+    """Return all TSX files under root, sorted for deterministic processing"""
+    if os.path.isfile(root):
+        return [root]
+
+    tsx_files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.endswith('.tsx'):
+                tsx_files.append(os.path.join(dirpath, filename))
+    return sorted(tsx_files)
+
+
+def classify_elements(content: str, service: Optional[LocaleService] = None) -> Tuple[List[Dict], int]:
+    """Every Korean element of content with a 'status', and the number untemplated
+
+    Raises ScanBudgetExceeded when the scan takes more CPU time than the
+    scan budget.
+    """
+    service = service or _get_service()
+    elements = service.find_tsx_elements_with_korean(content)
+    line_index = LineIndex(content)
+    count = 0
+    for element in elements:
+        line_index.annotate(element)
+        if not service.has_any_template(element['full_match']):
+            element['status'] = 'Untemplated'
+            count += 1
+        else:
+            # Partially templated: apply wraps the text left outside its templates
+            texts = service.untemplated_texts(element)
+            if texts:
+                element['status'] = 'Untemplated'
+                element['korean_texts'] = texts
+                element['partially_templated'] = True
+                count += 1
+            else:
+                element['status'] = 'Templated'
+    return elements, count
+
+
+def search_file(path: str) -> Dict:
+    """Classify every Korean element of a single file (runs in a worker process)
+
+    Unlike search_untemplated, already templated elements are included with
+    a 'status' of 'Templated' so callers can show the full picture.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            content = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {'path': path, 'success': False, 'error': str(e)}
+
+    try:
+        elements, count = classify_elements(content)
+    except ScanBudgetExceeded as e:
+        return {'path': path, 'success': False, 'error': str(e)}
+
+    return {
+        'path': path,
+        'success': True,
+        'mtime': os.path.getmtime(path),
+        'count': count,
+        'elements': elements
+    }
+
+
+def scan_file(path: str) -> Dict:
+    """Apply templates to a single file in memory (runs in a worker process)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            content = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {'path': path, 'success': False, 'error': str(e)}
+
+    service = _get_service()
+    cache_before = service.cache_stats()
+    result = service.apply_template(content, 'bt')
+    cache_after = service.cache_stats()
+    cache_delta = {
+        'hits': cache_after['hits'] - cache_before['hits'],
+        'misses': cache_after['misses'] - cache_before['misses']
+    }
+    if not result['success']:
+        return {'path': path, 'success': False, 'error': result['error']}
+
+    changed = result['replacements_count'] > 0
+    return {
+        'path': path,
+        'success': True,
+        'bytes': len(content.encode('utf-8')),
+        'content_hash': content_hash(content),
+        'replacements_count': result['replacements_count'],
+        'cache': cache_delta,
+        'existing_ids': [(int(num), text) for num, text in EXISTING_ID_PATTERN.findall(content)],
+        # Only ship content back to the parent when something changed
+        'updated_content': result['updated_content'] if changed else None,
+    }
+
+
+class WIdAllocator:
+    """Single-writer allocator mapping Korean text to a global W-ID"""
+
+    def __init__(self, start_id: int = 1):
+        self.ids: Dict[str, str] = {}
+        self.next_id = start_id
+        self.allocated = 0
+
+    def seed(self, existing_ids: Iterable[Tuple[int, str]]):
+        """Reuse IDs that are already present in the scanned files"""
+        for num, text in existing_ids:
+            self.ids.setdefault(text, f'W{num}')
+            self.next_id = max(self.next_id, num + 1)
+
+    def allocate(self, text: str) -> str:
+        w_id = self.ids.get(text)
+        if w_id is None:
+            w_id = f'W{self.next_id}'
+            self.ids[text] = w_id
+            self.next_id += 1
+            self.allocated += 1
+        return w_id
+
+    def assign(self, content: str) -> Tuple[str, List[str]]:
+        """Replace every W# placeholder in content with an allocated ID"""
+        used = []
+
+        def replace(match):
+            text = match.group(1)
+            w_id = self.allocate(text)
+            used.append(w_id)
+            return f'bt("{w_id}", "{text}")'
+
+        return PLACEHOLDER_PATTERN.sub(replace, content), used
+
+
+def apply_batch(paths: List[str], workers: Optional[int] = None, start_id: int = 1,
+                write: bool = False, include_content: bool = False, assign_ids: bool = True,
+                progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Apply BT templates to many files with one global W-ID allocation
+
+    Args:
+        paths: TSX files to process
+        workers: Number of scan processes (default: CPU count, 1 = in-process)
+        start_id: Lowest W number to allocate for new strings
+        write: Write updated files back to disk, with a `.backup` copy
+        include_content: Include updated content in the per-file results
+        assign_ids: Replace W# placeholders with allocated IDs (False keeps W#)
+        progress: Optional callback invoked with each per-file scan result
+    """
+    start_time = time.time()
+    paths = sorted(set(paths))
+    workers = workers or os.cpu_count() or 1
+
+    # Scan stage: parallel, results come back in submission (sorted) order
+    if workers == 1 or len(paths) <= 1:
+        scanned = []
+        for path in paths:
+            scanned.append(scan_file(path))
+            if progress:
+                progress(scanned[-1])
+    else:
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            scanned = []
+            for scan_result in executor.map(scan_file, paths, chunksize=chunksize):
+                scanned.append(scan_result)
+                if progress:
+                    progress(scan_result)
+    scan_duration = time.time() - start_time
+
+    # Writer stage: single pass in sorted path order
+    allocator = WIdAllocator(start_id)
+    for scan_result in scanned:
+        if scan_result['success']:
+            allocator.seed(scan_result['existing_ids'])
+
+    files = []
+    errors = []
+    replacements_count = 0
+    cache_hits = cache_misses = 0
+    for scan_result in scanned:
+        if not scan_result['success']:
+            errors.append({'path': scan_result['path'], 'error': scan_result['error']})
+            continue
+        cache_hits += scan_result['cache']['hits']
+        cache_misses += scan_result['cache']['misses']
+
+        file_result = {
+            'path': scan_result['path'],
+            'content_hash': scan_result['content_hash'],
+            'replacements_count': scan_result['replacements_count'],
+            'ids': [],
+        }
+        if scan_result['updated_content'] is not None:
+            if assign_ids:
+                updated_content, used = allocator.assign(scan_result['updated_content'])
+                file_result['ids'] = used
+            else:
+                updated_content = scan_result['updated_content']
+            replacements_count += scan_result['replacements_count']
+
+            if write:
+                backup_path = scan_result['path'] + '.backup'
+                shutil.copy2(scan_result['path'], backup_path)
+                with open(scan_result['path'], 'w', encoding='utf-8') as file:
+                    file.write(updated_content)
+                file_result['backup_created'] = backup_path
+            if include_content:
+                file_result['updated_content'] = updated_content
+        files.append(file_result)
+
+    duration = time.time() - start_time
+    files_changed = sum(1 for f in files if f['replacements_count'])
+
+    return {
+        'success': not errors,
+        'files_scanned': len(paths),
+        'files_changed': files_changed,
+        'replacements_count': replacements_count,
+        'ids_allocated': allocator.allocated,
+        'next_id': allocator.next_id,
+        'files': files,
+        'errors': errors,
+        'cache': {
+            'hits': cache_hits,
+            'misses': cache_misses,
+            'hit_rate': cache_hits / (cache_hits + cache_misses) if cache_hits + cache_misses else 0.0
+        },
+        'scan_duration': scan_duration,
+        'duration': duration,
+        'message': f'Applied {replacements_count} templates across {files_changed} files in {duration:.2f}s'
+    }
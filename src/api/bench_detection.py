@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for script detection cost as more scripts are enabled.
+
+Compares the combined range-table pattern used by LocaleService (one scan,
+whatever the number of scripts) with a naive approach that runs one regex
+per script. Usage:
+
+    python bench_detection.py [--lines 20000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from scripts import SCRIPT_RANGES, ScriptTable, build_char_class
+
+SCRIPT_SETS = [
+    ('hangul',),
+    ('hangul', 'kana'),
+    ('hangul', 'kana', 'han'),
+    ('hangul', 'kana', 'han', 'thai'),
+]
+
+SAMPLES = ['확인', '취소', 'ㅋㅋ', '保存する', 'キャンセル', '搜索', 'ยืนยัน', 'Save', 'Cancel']
+
+
+def build_corpus(lines: int) -> str:
+    rng = random.Random(0)
+    rows = []
+    for i in range(lines):
+        text = ' '.join(rng.choice(SAMPLES) for _ in range(3))
+        rows.append(f'<span className="row-{i}" title="{rng.choice(SAMPLES)}">{text}</span>')
+    return '\n'.join(rows)
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark script detection')
+    parser.add_argument('--lines', type=int, default=20000, help='Number of TSX lines in the corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.lines)
+    print(f'Corpus: {args.lines} lines, {len(corpus.encode("utf-8")) / 1024:.0f} KiB')
+    print(f'{"scripts":<28} {"ranges":>6} {"combined ms":>12} {"per-script ms":>14}')
+
+    for scripts in SCRIPT_SETS:
+        table = ScriptTable(scripts)
+        per_script = [re.compile(build_char_class([script]) + '+') for script in scripts]
+
+        combined = best_of(args.repeat, lambda: table.pattern.findall(corpus))
+        naive = best_of(args.repeat, lambda: [pattern.findall(corpus) for pattern in per_script])
+
+        ranges = sum(len(SCRIPT_RANGES[script]) for script in scripts)
+        print(f'{",".join(scripts):<28} {ranges:>6} {combined * 1000:>12.2f} {naive * 1000:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
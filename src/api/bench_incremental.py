@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for keystroke-rate edits in the language server.
+
+Types a word character by character into a generated TSX file and compares
+a full rescan per keystroke with the incremental scan, both with and
+without building the diagnostics that are published. Usage:
+
+    python bench_incremental.py [--lines 10000] [--keystrokes 200]
+"""
+
+import argparse
+import time
+
+from incremental import IncrementalScan
+from locale_service import LocaleService
+from lsp_server import LanguageServer, TextDocument
+
+
+def build_document(lines: int) -> str:
+    rows = []
+    for i in range(lines // 4):
+        rows.append(f'<div className="row-{i}">')
+        rows.append(f'  <button title="버튼 {i}">확인 {i}</button>')
+        rows.append(f'  <span>{{bt("W{i + 1}", "저장")}}</span>')
+        rows.append('</div>')
+    return '\n'.join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental rescans')
+    parser.add_argument('--lines', type=int, default=10000, help='Lines in the document')
+    parser.add_argument('--keystrokes', type=int, default=200, help='Characters typed')
+    args = parser.parse_args()
+
+    service = LocaleService()
+    content = build_document(args.lines)
+    position = content.index('확인', len(content) // 2)
+    typed = ('새 라벨 ' * args.keystrokes)[:args.keystrokes]
+    print(f'Document: {content.count(chr(10)) + 1} lines, {len(content) / 1024:.0f} KiB')
+
+    text = content
+    start = time.perf_counter()
+    for i, char in enumerate(typed):
+        text = text[:position + i] + char + text[position + i:]
+        service.search_untemplated(text)
+    full = (time.perf_counter() - start) / len(typed)
+
+    scan = IncrementalScan(service, content)
+    start = time.perf_counter()
+    for i, char in enumerate(typed):
+        scan.edit(position + i, position + i, char)
+    incremental = (time.perf_counter() - start) / len(typed)
+    assert scan.elements() == service.find_tsx_elements_with_korean(text)
+
+    server = LanguageServer(lambda message: None, service)
+    document = TextDocument('file:///bench.tsx', content, 1, service)
+    server.documents[document.uri] = document
+    start = time.perf_counter()
+    for i, char in enumerate(typed):
+        document.scan.edit(position + i, position + i, char)
+        document._line_index = None
+        server.pending.add(document.uri)
+        server.publish_pending()
+    published = (time.perf_counter() - start) / len(typed)
+
+    print(f'{"per keystroke":<36} {"ms":>9}')
+    print(f'{"full rescan (search_untemplated)":<36} {full * 1000:>9.2f}')
+    print(f'{"incremental scan":<36} {incremental * 1000:>9.2f}')
+    print(f'{"incremental scan + diagnostics":<36} {published * 1000:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
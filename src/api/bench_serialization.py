@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for encoding large search results.
+
+Compares Flask-RESTX marshalling through `search_response_model` (what the
+stacked `marshal_with` decorators did) and the default JSON encoding with
+the single-pass encoder used for API responses. Usage:
+
+    python bench_serialization.py [--elements 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+
+from flask_restx import marshal
+
+from app import search_response_model
+from locale_service import LocaleService
+from serialization import _encoder, encode_json, orjson
+
+
+def build_result(elements: int):
+    rows = [
+        f'<div className="row-{i}"><button title="버튼 {i}">확인 {i}</button></div>'
+        for i in range(elements // 2 + 1)
+    ]
+    result = LocaleService().search_untemplated('\n'.join(rows))
+    result['elements'] = result['elements'][:elements]
+    result['count'] = len(result['elements'])
+    return result
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark result serialization')
+    parser.add_argument('--elements', type=int, default=10000, help='Number of elements in the result')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    result = build_result(args.elements)
+    print(f'Result: {result["count"]} elements')
+
+    candidates = [
+        ('marshal + json.dumps', lambda: json.dumps(marshal(result, search_response_model)).encode('utf-8')),
+        ('json.dumps (RESTX default)', lambda: json.dumps(result).encode('utf-8')),
+        ('stdlib single pass', lambda: _encoder.encode(result).encode('utf-8')),
+    ]
+    if orjson is not None:
+        candidates.append(('orjson', lambda: orjson.dumps(result)))
+
+    print(f'{"encoder":<28} {"ms":>9} {"KiB":>9}')
+    for name, func in candidates:
+        duration = best_of(args.repeat, func)
+        print(f'{name:<28} {duration * 1000:>9.2f} {len(func()) / 1024:>9.0f}')
+    print(f'encode_json uses: {"orjson" if orjson is not None else "stdlib single pass"}')
+    assert json.loads(encode_json(result)) == result
+
+
+if __name__ == '__main__':
+    main()
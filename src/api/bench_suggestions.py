@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for fuzzy suggestions against a large catalog.
+
+Builds a synthetic catalog of Korean UI strings and looks up spacing and
+particle variants of some of them, comparing a brute-force Dice scan over
+every entry with the n-gram index. Usage:
+
+    python bench_suggestions.py [--entries 200000] [--queries 500]
+"""
+
+import argparse
+import random
+import time
+
+from suggestions import SuggestionIndex, ngrams
+
+# Common syllables, words are drawn from them so the catalog has a
+# realistic bigram distribution (a few very frequent endings, many rare words)
+SYLLABLES = list('가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후'
+                 '기니디리미비시이지치키티피히개내대래매배새애재채캐태패해게네데레메베세에제체케테페헤'
+                 '강남당랑망방상앙장창캉탕팡항공농동롱몽봉송옹종총콩통퐁홍관권금눈문분순운준춘'
+                 '결경계고관광교구국군권귀규극근글금기김나내년노녹논농뇌능다단달담답당대더도독돌동두등'
+                 '록료류륙률리림립마막만말망매맥면명모목몰못무문물미민밀바박반발방배백번벌범법벽변별병보복본')
+PARTICLES = ['', '을', '를', '이', '가', '의', '에', '은', '는']
+ENDINGS = ['하기', '합니다', '하시겠습니까?', '되었습니다', '할 수 없습니다', '완료', '중', '실패', '']
+
+
+def random_string(rng: random.Random) -> str:
+    words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice(PARTICLES)
+             for _ in range(rng.randint(1, 4))]
+    return ' '.join(words) + ' ' + rng.choice(ENDINGS)
+
+
+def variant(rng: random.Random, text: str) -> str:
+    """Same string with different spacing or one particle changed"""
+    if rng.random() < 0.5:
+        return text.replace(' ', '', 1)
+    for particle in ('을', '를', '은', '는'):
+        if particle in text:
+            return text.replace(particle, rng.choice(PARTICLES), 1)
+    return text + '.'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fuzzy suggestions')
+    parser.add_argument('--entries', type=int, default=200000, help='Catalog size')
+    parser.add_argument('--queries', type=int, default=500, help='Lookups per measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(45)
+    texts = [random_string(rng) for _ in range(args.entries)]
+    queries = [variant(rng, rng.choice(texts)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = SuggestionIndex()
+    for number, text in enumerate(texts, 1):
+        index.add(f'W{number}', text)
+    print(f'Indexed {len(index)} entries in {time.perf_counter() - start:.2f}s')
+
+    brute_queries = queries[:max(1, args.queries // 20)]
+    start = time.perf_counter()
+    for query in brute_queries:
+        grams = ngrams(query)
+        scores = [2 * len(grams & other) / (len(grams) + len(other)) for other in index.grams]
+        sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:3]
+    brute = (time.perf_counter() - start) / len(brute_queries)
+
+    start = time.perf_counter()
+    found = sum(bool(index.suggest(query)) for query in queries)
+    indexed = (time.perf_counter() - start) / len(queries)
+
+    print(f'{"per lookup":<24} {"ms":>9}')
+    print(f'{"brute force":<24} {brute * 1000:>9.2f}')
+    print(f'{"n-gram index":<24} {indexed * 1000:>9.2f}')
+    print(f'{found}/{len(queries)} variants matched an existing entry')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Export untemplated strings as a translation catalog (JSON, CSV or XLIFF).
+
+Search hits are streamed file by file into a temporary on-disk SQLite
+database that deduplicates strings and collects their source locations.
+The catalog is then written incrementally from an ordered query, so memory
+stays flat no matter how many strings or files are exported.
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from locale_service import LocaleService
+
+EXPORT_FORMATS = ('json', 'csv', 'xliff')
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'xliff': 'application/xliff+xml',
+}
+
+
+class CatalogBuilder:
+    """Deduplicating catalog of search hits backed by a temporary SQLite file"""
+
+    def __init__(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.catalog.db')
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript('''
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE strings (id INTEGER PRIMARY KEY, text TEXT UNIQUE NOT NULL);
+            CREATE TABLE locations (
+                string_id INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                tag TEXT,
+                start INTEGER,
+                end INTEGER,
+                line INTEGER,
+                column INTEGER
+            );
+        ''')
+        self.files = 0
+        self.hits = 0
+
+    def add_search_result(self, path: str, result: Dict):
+        """Add the elements of one search_untemplated result in a single transaction"""
+        rows = []
+        with self.conn:
+            for element in result['elements']:
+                for text in element['korean_texts']:
+                    self.conn.execute('INSERT OR IGNORE INTO strings (text) VALUES (?)', (text,))
+                    rows.append((path, element['tag'], element['start'], element['end'],
+                                 element['line'], element['column'], text))
+            self.conn.executemany(
+                'INSERT INTO locations (string_id, path, tag, start, end, line, column) '
+                'SELECT id, ?, ?, ?, ?, ?, ? FROM strings WHERE text = ?',
+                rows
+            )
+        self.files += 1
+        self.hits += len(rows)
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Yield catalog entries in first-seen order, one string at a time"""
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_locations_string ON locations (string_id)')
+        cursor = self.conn.execute('''
+            SELECT s.id, s.text, l.path, l.tag, l.start, l.end, l.line, l.column
+            FROM strings s JOIN locations l ON l.string_id = s.id
+            ORDER BY s.id, l.rowid
+        ''')
+        entry = None
+        for string_id, text, path, tag, start, end, line, column in cursor:
+            if entry is None or entry['id'] != string_id:
+                if entry is not None:
+                    yield entry
+                entry = {'id': string_id, 'source': text, 'locations': []}
+            entry['locations'].append({
+                'path': path, 'tag': tag, 'start': start, 'end': end, 'line': line, 'column': column
+            })
+        if entry is not None:
+            yield entry
+
+    def close(self):
+        self.conn.close()
+        try:
+            os.unlink(self.db_path)
+        except OSError:
+            pass
+
+
+def iter_json(entries: Iterable[Dict]) -> Iterator[str]:
+    yield '{"strings": ['
+    first = True
+    for entry in entries:
+        entry = dict(entry, occurrences=len(entry['locations']))
+        yield ('\n  ' if first else ',\n  ') + json.dumps(entry, ensure_ascii=False)
+        first = False
+    yield '\n]}\n'
+
+
+def iter_csv(entries: Iterable[Dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['id', 'source', 'occurrences', 'locations'])
+    for entry in entries:
+        locations = ';'.join(f"{loc['path']}:{loc['line']}:{loc['column']}" for loc in entry['locations'])
+        writer.writerow([entry['id'], entry['source'], len(entry['locations']), locations])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_xliff(entries: Iterable[Dict], source_language: str = 'ko') -> Iterator[str]:
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">\n'
+           f'  <file original="locale_tool" source-language={quoteattr(source_language)} datatype="plaintext">\n'
+           '    <body>\n')
+    for entry in entries:
+        parts = [f'      <trans-unit id="{entry["id"]}">\n',
+                 f'        <source>{escape(entry["source"])}</source>\n']
+        for loc in entry['locations']:
+            parts.append('        <context-group purpose="location">\n'
+                         f'          <context context-type="sourcefile">{escape(loc["path"])}</context>\n'
+                         f'          <context context-type="linenumber">{loc["line"]}</context>\n'
+                         f'          <context context-type="x-offset">{loc["start"]}-{loc["end"]}</context>\n'
+                         '        </context-group>\n')
+        parts.append('      </trans-unit>\n')
+        yield ''.join(parts)
+    yield '    </body>\n  </file>\n</xliff>\n'
+
+
+SERIALIZERS = {
+    'json': iter_json,
+    'csv': iter_csv,
+    'xliff': iter_xliff,
+}
+
+
+def iter_catalog(sources: Iterable[Tuple[str, str]], fmt: str = 'json',
+                 service: Optional[LocaleService] = None) -> Iterator[str]:
+    """Search (path, content) pairs and stream the deduplicated catalog
+
+    Content is consumed lazily, so callers can pass a generator that reads
+    one file at a time.
+    """
+    if fmt not in SERIALIZERS:
+        raise ValueError(f'Invalid export format. Must be one of: {", ".join(EXPORT_FORMATS)}')
+
+    service = service or LocaleService()
+    builder = CatalogBuilder()
+    try:
+        for path, content in sources:
+            builder.add_search_result(path, service.search_untemplated(content))
+        yield from SERIALIZERS[fmt](builder.iter_entries())
+    finally:
+        builder.close()
+
+
+def iter_file_sources(paths: List[str]) -> Iterator[Tuple[str, str]]:
+    """Read files lazily, one at a time"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            yield path, file.read()
+
+
+def export_catalog(paths: List[str], output, fmt: str = 'json',
+                   service: Optional[LocaleService] = None) -> int:
+    """Write a catalog for the given files to a text file object, returning characters written"""
+    written = 0
+    for chunk in iter_catalog(iter_file_sources(paths), fmt, service):
+        output.write(chunk)
+        written += len(chunk)
+    return written
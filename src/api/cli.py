@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Command line interface for the locale tool
+
+Examples:
+    python src/api/cli.py search path/to/src
+    python src/api/cli.py apply path/to/src --workers 8 --start-id 20000 --write
+    python src/api/cli.py export path/to/src --format xliff -o strings.xlf
+    python src/api/cli.py changed --base origin/main
+    python src/api/cli.py history strings 확인
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from batch import apply_batch, find_tsx_files
+from catalog_export import EXPORT_FORMATS, export_catalog
+from git_scan import GitError, scan_changed
+from locale_service import LocaleService
+from scan_store import STORE_ENABLED, STORE_PATH, ScanStore, apply_record, search_record
+
+
+def collect_paths(targets):
+    """Expand files and directories into a sorted list of TSX files"""
+    paths = []
+    for target in targets:
+        paths.extend(find_tsx_files(target))
+    return sorted(set(paths))
+
+
+def open_store(args):
+    """The scan history store, or None when recording is disabled"""
+    if args.no_store or not STORE_ENABLED:
+        return None
+    return ScanStore(args.store)
+
+
+def cmd_search(args):
+    service = LocaleService()
+    store = open_store(args)
+    records = []
+    total = 0
+    errors = 0
+    for path in collect_paths(args.paths):
+        with open(path, 'r', encoding='utf-8') as file:
+            content = file.read()
+        result = service.search_untemplated(content)
+        if store is not None:
+            records.append(search_record(os.path.abspath(path), content, result))
+        total += result['count']
+        for element in result['elements']:
+            print(f"{path}:{element['line']}:{element['column']}: {', '.join(element['korean_texts'])}")
+        if not result['success']:
+            errors += 1
+            print(f"{path}: ERROR {result['error']}", file=sys.stderr)
+    if store is not None:
+        store.record_scan('search', records, source='cli')
+    print(f"Found {total} untemplated Korean elements", file=sys.stderr)
+    print(f"Detection cache hit rate: {service.cache_stats()['hit_rate']:.1%}", file=sys.stderr)
+    if errors:
+        return 2
+    return 1 if total else 0
+
+
+def cmd_apply(args):
+    paths = collect_paths(args.paths)
+    result = apply_batch(paths, workers=args.workers, start_id=args.start_id, write=args.write)
+
+    store = open_store(args)
+    if store is not None and args.write:
+        store.record_scan('apply', [
+            apply_record(os.path.abspath(f['path']), f['content_hash'], f['replacements_count'])
+            for f in result['files']
+        ], source='cli')
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        for file_result in result['files']:
+            if file_result['replacements_count']:
+                print(f"{file_result['path']}: {file_result['replacements_count']} replacements")
+        for error in result['errors']:
+            print(f"{error['path']}: ERROR {error['error']}", file=sys.stderr)
+        print(result['message'])
+        print(f"Allocated {result['ids_allocated']} new IDs (next ID: W{result['next_id']})")
+        print(f"Detection cache hit rate: {result['cache']['hit_rate']:.1%} "
+              f"({result['cache']['hits']} hits, {result['cache']['misses']} misses)")
+        if not args.write:
+            print("Dry run - use --write to update files")
+    return 0 if result['success'] else 1
+
+
+def cmd_export(args):
+    paths = collect_paths(args.paths)
+    if args.output == '-':
+        export_catalog(paths, sys.stdout, args.format)
+    else:
+        newline = '' if args.format == 'csv' else None
+        with open(args.output, 'w', encoding='utf-8', newline=newline) as output:
+            export_catalog(paths, output, args.format)
+        print(f"Exported {args.format.upper()} catalog for {len(paths)} files to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_changed(args):
+    try:
+        result = scan_changed(args.base, args.repo, args.head)
+    except GitError as e:
+        print(f"git error: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        for file_result in result['files']:
+            for element in file_result['new_elements']:
+                print(f"{file_result['path']}:{element['line']}:{element['column']}: {', '.join(element['korean_texts'])}")
+            if 'error' in file_result:
+                print(f"{file_result['path']}: ERROR {file_result['error']}", file=sys.stderr)
+        print(result['message'], file=sys.stderr)
+    if not result['success']:
+        # A truncated scan must not pass the gate
+        return 2
+    return 1 if result['new_count'] else 0
+
+
+def cmd_history(args):
+    if args.query in ('strings', 'file') and not args.value:
+        print(f"history {args.query} requires a {'text' if args.query == 'strings' else 'path'}", file=sys.stderr)
+        return 2
+
+    store = ScanStore(args.store)
+    if args.query == 'strings':
+        files = store.files_using(args.value, args.tag)
+        output = {'text': args.value, 'count': sum(f['count'] for f in files), 'files': files}
+    elif args.query == 'trend':
+        output = {'path': args.value, 'points': store.untemplated_trend(args.value, args.limit)}
+    else:
+        output = {'path': args.value, 'scans': store.file_history(args.value, args.limit)}
+
+    if args.json:
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    elif args.query == 'strings':
+        for file_entry in output['files']:
+            for location in file_entry['locations']:
+                print(f"{file_entry['path']}:{location['line']}:{location['column']}: {location['tag']}")
+        print(f"{output['count']} untemplated uses in {len(output['files'])} files", file=sys.stderr)
+    elif args.query == 'trend':
+        for point in output['points']:
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(point['created_at']))
+            print(f"{when}  {point['untemplated_count']}")
+    else:
+        for scan in output['scans']:
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(scan['created_at']))
+            count = scan['replacements_count'] if scan['operation'] == 'apply' else scan['untemplated_count']
+            print(f"{when}  {scan['operation']:<6}  {count:>5}  {scan['content_hash'][:12]}")
+    return 0
+
+
+def add_store_arguments(parser):
+    parser.add_argument('--store', default=STORE_PATH, help='Scan history database (default: %(default)s)')
+    parser.add_argument('--no-store', action='store_true', help='Do not record this run in the scan history')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Locale Tool - BT/BVT Template Updater')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help='Report untemplated Korean elements')
+    search_parser.add_argument('paths', nargs='+', help='TSX files or directories')
+    add_store_arguments(search_parser)
+    search_parser.set_defaults(func=cmd_search)
+
+    apply_parser = subparsers.add_parser('apply', help='Apply BT templates with global W-ID allocation')
+    apply_parser.add_argument('paths', nargs='+', help='TSX files or directories')
+    apply_parser.add_argument('--workers', type=int, default=None, help='Number of scan processes (default: CPU count)')
+    apply_parser.add_argument('--start-id', type=int, default=1, help='Lowest W number to allocate')
+    apply_parser.add_argument('--write', action='store_true', help='Write changes back to the files (creates .backup copies)')
+    apply_parser.add_argument('--json', action='store_true', help='Print the full result as JSON')
+    add_store_arguments(apply_parser)
+    apply_parser.set_defaults(func=cmd_apply)
+
+    export_parser = subparsers.add_parser('export', help='Export untemplated strings as a translation catalog')
+    export_parser.add_argument('paths', nargs='+', help='TSX files or directories')
+    export_parser.add_argument('--format', choices=EXPORT_FORMATS, default='json', help='Catalog format')
+    export_parser.add_argument('-o', '--output', default='-', help='Output file (default: stdout)')
+    export_parser.set_defaults(func=cmd_export)
+
+    changed_parser = subparsers.add_parser('changed', help='Scan only TSX files changed since a git ref')
+    changed_parser.add_argument('--base', required=True, help='Base commit, branch or tag to compare against')
+    changed_parser.add_argument('--head', default=None, help='Head ref to scan (default: working tree)')
+    changed_parser.add_argument('--repo', default='.', help='Path inside the git repository')
+    changed_parser.add_argument('--json', action='store_true', help='Print the full result as JSON')
+    changed_parser.set_defaults(func=cmd_changed)
+
+    history_parser = subparsers.add_parser('history', help='Query the stored search and apply history')
+    history_parser.add_argument('query', choices=('strings', 'trend', 'file'),
+                                help='strings TEXT: files using a string; trend [PATH]: untemplated counts; '
+                                     'file PATH: scans of one file')
+    history_parser.add_argument('value', nargs='?', default=None, help='Korean text or file path')
+    history_parser.add_argument('--tag', default=None, help='Only hits with this tag (strings)')
+    history_parser.add_argument('--limit', type=int, default=50, help='Number of entries (trend, file)')
+    history_parser.add_argument('--store', default=STORE_PATH, help='Scan history database (default: %(default)s)')
+    history_parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    history_parser.set_defaults(func=cmd_history)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Compressed transport for the Flask API.
+
+Requests sent with `Content-Encoding: gzip` (or `deflate`, or `br` when the
+optional `brotli` package is installed) are decompressed on the fly at the
+WSGI layer, so Flask parses the body as if it had been sent uncompressed.
+
+Responses are compressed according to `Accept-Encoding`. Buffered JSON
+responses are compressed in one shot; streamed responses (catalog exports,
+file downloads) are compressed chunk by chunk as they are sent, without
+building a full-size copy of the body.
+"""
+
+import os
+import zlib
+
+from flask import request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Raised by the decompressors on a malformed body
+DECOMPRESS_ERRORS = (zlib.error,) + ((brotli.error,) if brotli is not None else ())
+
+from payload_limits import MAX_CONTENT_LENGTH, payload_limit_for
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = int(os.environ.get('LOCALE_TOOL_COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL = int(os.environ.get('LOCALE_TOOL_COMPRESS_LEVEL', 6))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'application/xliff+xml',
+    'text/plain',
+    'text/csv',
+    'text/html',
+    'text/xml',
+}
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _decompressor(encoding):
+    """Return (decompress, flush) callables for a Content-Encoding, or None"""
+    if encoding in ('gzip', 'x-gzip'):
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        return decompressor.decompress, decompressor.flush
+    if encoding == 'deflate':
+        decompressor = zlib.decompressobj()
+        return decompressor.decompress, decompressor.flush
+    if encoding == 'br' and brotli is not None:
+        decompressor = brotli.Decompressor()
+        return decompressor.process, lambda: b''
+    return None
+
+
+class DecompressingStream:
+    """File-like wrapper that decompresses a WSGI input stream while it is read
+
+    The decompressed size is capped, so a small compressed body cannot
+    expand past the configured payload limit.
+    """
+
+    def __init__(self, stream, decompressor, limit):
+        self.stream = stream
+        self.decompress, self.flush = decompressor
+        self.limit = limit
+        # Appended to and consumed from the front in place, so reading a
+        # large body stays linear
+        self.buffer = bytearray()
+        self.total = 0
+        self.eof = False
+
+    def _fill(self, size):
+        while not self.eof and (size < 0 or len(self.buffer) < size):
+            chunk = self.stream.read(READ_CHUNK_SIZE)
+            try:
+                if not chunk:
+                    self.eof = True
+                    self.buffer += self.flush()
+                    break
+                data = self.decompress(chunk)
+            except DECOMPRESS_ERRORS as e:
+                raise BadRequest(f'Malformed compressed request body: {e}')
+            self.total += len(data)
+            if self.total > self.limit:
+                raise RequestEntityTooLarge(f'Decompressed payload exceeds the {self.limit} byte limit')
+            self.buffer += data
+
+    def _take(self, size):
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read(self, size=-1):
+        if size is None:
+            size = -1
+        self._fill(size)
+        return self._take(len(self.buffer) if size < 0 else size)
+
+    def readline(self, size=-1):
+        while b'\n' not in self.buffer and not self.eof:
+            self._fill(len(self.buffer) + READ_CHUNK_SIZE)
+        end = self.buffer.find(b'\n') + 1 or len(self.buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        return self._take(end)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                break
+            yield line
+
+
+class DecompressRequestMiddleware:
+    """WSGI middleware that transparently decodes compressed request bodies"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding and encoding != 'identity':
+            decompressor = _decompressor(encoding)
+            if decompressor is None:
+                start_response('415 Unsupported Media Type', [('Content-Type', 'application/json')])
+                return [b'{"success": false, "error": "Unsupported Content-Encoding"}']
+
+            limit = payload_limit_for(environ.get('PATH_INFO', '')) or MAX_CONTENT_LENGTH
+            environ['wsgi.input'] = DecompressingStream(environ['wsgi.input'], decompressor, limit)
+            # The decoded length is unknown until the stream has been read
+            environ.pop('CONTENT_LENGTH', None)
+            environ.pop('HTTP_CONTENT_ENCODING', None)
+            environ['wsgi.input_terminated'] = True
+        return self.wsgi_app(environ, start_response)
+
+
+def _negotiate_encoding(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+class _Compressor:
+    """Streaming compressor with a common interface for gzip and brotli"""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=min(COMPRESS_LEVEL, 11))
+            self.compress = self.compressor.process
+        else:
+            self.compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress = self.compressor.compress
+
+    def flush(self):
+        if hasattr(self.compressor, 'finish'):
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def _iter_compressed(chunks, encoding):
+    compressor = _Compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """after_request hook: compress the response body based on Accept-Encoding"""
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    encoding = _negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+
+    if response.is_streamed or response.direct_passthrough:
+        # Wrap the body iterator (a generator or send_file's file wrapper)
+        response.response = _iter_compressed(response.response, encoding)
+        response.direct_passthrough = False
+        response.headers.pop('Content-Length', None)
+        response.headers.pop('Accept-Ranges', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        compressor = _Compressor(encoding)
+        response.set_data(compressor.compress(body) + compressor.flush())
+
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_compression(app):
+    """Install request decompression and response compression on the Flask app"""
+    app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app)
+    app.after_request(compress_response)
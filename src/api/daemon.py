@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Local scan daemon and its thin client.
+
+Pre-commit hooks and editor integrations scan one or two files at a time,
+and a fresh Python process spends most of its time importing and warming up
+the engine. The daemon keeps a warmed LocaleService (compiled patterns and
+the detect cache) in memory and answers requests over a Unix domain socket;
+the client only imports the standard library and starts the daemon on first
+use.
+
+Protocol: one JSON object per line in each direction. Every request carries
+an "op" and the client's engine version; a daemon started from older engine
+sources answers {"ok": false, "restart": true} and exits, and the client
+starts a fresh one.
+
+Examples:
+    python src/api/daemon.py check src/pages/Home.tsx
+    python src/api/daemon.py status
+    python src/api/daemon.py stop
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+SOCKET_PATH = os.environ.get(
+    'LOCALE_TOOL_SOCKET',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'daemon.sock')
+)
+# Seconds without requests before the daemon exits (0 = never)
+IDLE_TIMEOUT = int(os.environ.get('LOCALE_TOOL_DAEMON_IDLE_TIMEOUT', 1800))
+START_TIMEOUT = float(os.environ.get('LOCALE_TOOL_DAEMON_START_TIMEOUT', 10))
+REQUEST_TIMEOUT = float(os.environ.get('LOCALE_TOOL_DAEMON_TIMEOUT', 60))
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+# Sources whose changes require a new daemon
+ENGINE_SOURCES = ('daemon.py', 'locale_service.py', 'scripts.py', 'warmup.py')
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached or started"""
+
+
+def engine_version() -> str:
+    """Fingerprint of the engine sources and detection settings"""
+    parts = [os.environ.get('LOCALE_TOOL_SCRIPTS', '')]
+    for name in ENGINE_SOURCES:
+        try:
+            parts.append(f'{name}:{os.stat(os.path.join(API_DIR, name)).st_mtime_ns}')
+        except OSError:
+            parts.append(f'{name}:-')
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class ScanDaemon:
+    """Request dispatcher holding the warmed engine"""
+
+    def __init__(self, service=None, version: Optional[str] = None):
+        from locale_service import LocaleService
+
+        self.service = service or LocaleService()
+        self.version = version or engine_version()
+        self.started_at = time.time()
+        self.last_request = self.started_at
+        self.requests = 0
+        self.stop_requested = threading.Event()
+
+    def handle(self, request: Dict) -> Dict:
+        self.last_request = time.time()
+        self.requests += 1
+
+        if request.get('version') not in (None, self.version):
+            self.stop_requested.set()
+            return {'ok': False, 'restart': True, 'error': 'Daemon runs outdated engine sources'}
+
+        handler = getattr(self, f"op_{request.get('op')}", None)
+        if handler is None:
+            return {'ok': False, 'error': f"Unknown op: {request.get('op')!r}"}
+        try:
+            return {'ok': True, 'result': handler(request)}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def op_ping(self, request: Dict) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'version': self.version,
+            'uptime': time.time() - self.started_at,
+            'requests': self.requests,
+            'scripts': list(self.service.scripts),
+            'detect_cache': self.service.cache_stats()
+        }
+
+    def op_search(self, request: Dict) -> Dict:
+        """Search the given paths, or one in-memory document (content + path)"""
+        if 'content' in request:
+            documents = [(request.get('path', '<content>'), request['content'])]
+        else:
+            documents = request.get('paths', [])
+
+        files = []
+        errors = []
+        total = 0
+        for document in documents:
+            if isinstance(document, str):
+                path = document
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except (OSError, UnicodeDecodeError) as e:
+                    errors.append({'path': path, 'error': str(e)})
+                    continue
+            else:
+                path, content = document
+            result = self.service.search_untemplated(content)
+            total += result['count']
+            files.append({'path': path, 'count': result['count'], 'elements': result['elements']})
+            if not result['success']:
+                errors.append({'path': path, 'error': result['error']})
+        return {'count': total, 'files': files, 'errors': errors}
+
+    def op_apply(self, request: Dict) -> Dict:
+        return self.service.apply_template(request['content'], request.get('template_type', 'bt'))
+
+    def op_shutdown(self, request: Dict) -> Dict:
+        self.stop_requested.set()
+        return {'pid': os.getpid()}
+
+
+def _serve_connection(daemon: ScanDaemon, conn: socket.socket):
+    with conn, conn.makefile('rb') as reader, conn.makefile('wb') as writer:
+        while not daemon.stop_requested.is_set():
+            line = reader.readline(MAX_MESSAGE_SIZE + 1)
+            if not line:
+                break
+            if len(line) > MAX_MESSAGE_SIZE:
+                response = {'ok': False, 'error': 'Message too large'}
+            else:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'ok': False, 'error': 'Invalid JSON'}
+                else:
+                    response = daemon.handle(request)
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            writer.flush()
+            if len(line) > MAX_MESSAGE_SIZE:
+                break
+
+
+def serve(socket_path: str = SOCKET_PATH, idle_timeout: int = IDLE_TIMEOUT,
+          daemon: Optional[ScanDaemon] = None, ready: Optional[threading.Event] = None) -> int:
+    """Run the daemon until shutdown or idle timeout
+
+    Only one daemon serves a socket path: the others exit right away, which
+    makes concurrent auto-starts from several clients harmless.
+    """
+    import fcntl
+
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    lock_file = open(socket_path + '.lock', 'w')
+    # The lock holder is the only daemon serving the path; a daemon that is
+    # exiting after a restart request releases it shortly
+    deadline = time.monotonic() + START_TIMEOUT / 2
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                lock_file.close()
+                return 0
+            time.sleep(0.05)
+
+    try:
+        if daemon is None:
+            from warmup import warm_up_engine
+
+            daemon = ScanDaemon()
+            warm_up_engine(daemon.service)
+
+        # A socket file left by a crashed daemon
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previous_umask = os.umask(0o177)
+        try:
+            server.bind(socket_path)
+        finally:
+            os.umask(previous_umask)
+        server.listen(16)
+        server.settimeout(1.0)
+        if ready is not None:
+            ready.set()
+
+        with server:
+            while not daemon.stop_requested.is_set():
+                if idle_timeout and time.time() - daemon.last_request > idle_timeout:
+                    break
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=_serve_connection, args=(daemon, conn), daemon=True).start()
+    finally:
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+        lock_file.close()
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def _send(socket_path: str, payload: Dict) -> Dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(REQUEST_TIMEOUT)
+        conn.connect(socket_path)
+        conn.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+        with conn.makefile('rb') as reader:
+            line = reader.readline()
+    if not line:
+        raise DaemonError('Daemon closed the connection')
+    return json.loads(line)
+
+
+def _ping(socket_path: str) -> bool:
+    try:
+        _send(socket_path, {'op': 'ping'})
+        return True
+    except (OSError, ValueError, DaemonError):
+        return False
+
+
+def start_daemon(socket_path: str = SOCKET_PATH):
+    """Start a detached daemon and wait until it accepts connections
+
+    Clients starting at the same time take turns, so only the first one
+    spawns a daemon and the others find it running.
+    """
+    import fcntl
+
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    with open(socket_path + '.start', 'w') as start_lock:
+        fcntl.flock(start_lock, fcntl.LOCK_EX)
+        if _ping(socket_path):
+            return
+        with open(socket_path + '.log', 'ab') as log:
+            subprocess.Popen(
+                [sys.executable, os.path.join(API_DIR, 'daemon.py'), '--socket', socket_path, 'serve'],
+                cwd=API_DIR, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                start_new_session=True, close_fds=True
+            )
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if _ping(socket_path):
+                return
+            time.sleep(0.02)
+    raise DaemonError(f'Daemon did not start within {START_TIMEOUT:g}s (see {socket_path}.log)')
+
+
+def _wait_for_exit(socket_path: str):
+    """Wait for an exiting daemon to remove its socket"""
+    deadline = time.monotonic() + START_TIMEOUT
+    while os.path.exists(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def call(op: str, socket_path: str = SOCKET_PATH, autostart: bool = True, **params) -> Dict:
+    """Send one request to the daemon, starting or restarting it when needed"""
+    payload = dict(params, op=op, version=engine_version())
+    for _ in range(3):
+        try:
+            response = _send(socket_path, payload)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not autostart:
+                raise DaemonError('Daemon is not running')
+            start_daemon(socket_path)
+            continue
+        except (ConnectionResetError, DaemonError):
+            # Connected while the daemon was shutting down
+            if not autostart:
+                raise DaemonError('Daemon is shutting down')
+            _wait_for_exit(socket_path)
+            start_daemon(socket_path)
+            continue
+        except (OSError, ValueError) as e:
+            raise DaemonError(f'Daemon request failed: {e}')
+
+        if response.get('restart') and autostart:
+            # The outdated daemon exits on its own
+            _wait_for_exit(socket_path)
+            start_daemon(socket_path)
+            continue
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Daemon request failed'))
+        return response['result']
+    raise DaemonError('Daemon could not be restarted')
+
+
+def search_in_process(paths: List[str]) -> Dict:
+    """Fallback used when the daemon is unavailable"""
+    return ScanDaemon().op_search({'paths': paths})
+
+
+def cmd_check(args) -> int:
+    # The daemon runs in another directory; report paths as they were given
+    names = {os.path.abspath(path): path for path in args.paths}
+    paths = list(names)
+    try:
+        result = call('search', args.socket, autostart=not args.no_start, paths=paths)
+    except DaemonError as e:
+        if args.no_fallback:
+            print(f'locale daemon: {e}', file=sys.stderr)
+            return 2
+        result = search_in_process(paths)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        for file_result in result['files']:
+            path = names.get(file_result['path'], file_result['path'])
+            for element in file_result['elements']:
+                print(f"{path}:{element['line']}:{element['column']}: {', '.join(element['korean_texts'])}")
+        for error in result['errors']:
+            print(f"{names.get(error['path'], error['path'])}: ERROR {error['error']}", file=sys.stderr)
+        if result['count']:
+            print(f"Found {result['count']} untemplated Korean elements", file=sys.stderr)
+    if result['errors']:
+        return 2
+    return 1 if result['count'] else 0
+
+
+def cmd_status(args) -> int:
+    try:
+        status = call('ping', args.socket, autostart=False)
+    except DaemonError as e:
+        print(f'locale daemon: {e}', file=sys.stderr)
+        return 1
+    print(f"pid {status['pid']}, up {status['uptime']:.0f}s, {status['requests']} requests, "
+          f"detect cache {status['detect_cache']['size']} strings "
+          f"({status['detect_cache']['hit_rate']:.1%} hit rate)")
+    return 0
+
+
+def cmd_stop(args) -> int:
+    try:
+        _send(args.socket, {'op': 'shutdown'})
+    except (OSError, ValueError, DaemonError):
+        print('locale daemon: not running', file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_serve(args) -> int:
+    return serve(args.socket, args.idle_timeout)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Locale Tool - local scan daemon')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Unix socket path (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help='Report untemplated Korean elements in files')
+    check_parser.add_argument('paths', nargs='+', help='TSX files')
+    check_parser.add_argument('--json', action='store_true', help='Print the full result as JSON')
+    check_parser.add_argument('--no-start', action='store_true', help='Do not start the daemon if it is not running')
+    check_parser.add_argument('--no-fallback', action='store_true',
+                              help='Fail instead of scanning in-process when the daemon is unavailable')
+    check_parser.set_defaults(func=cmd_check)
+
+    status_parser = subparsers.add_parser('status', help='Show whether the daemon is running')
+    status_parser.set_defaults(func=cmd_status)
+
+    stop_parser = subparsers.add_parser('stop', help='Stop the daemon')
+    stop_parser.set_defaults(func=cmd_stop)
+
+    serve_parser = subparsers.add_parser('serve', help='Run the daemon in the foreground')
+    serve_parser.add_argument('--idle-timeout', type=int, default=IDLE_TIMEOUT,
+                              help='Exit after this many idle seconds, 0 = never (default: %(default)s)')
+    serve_parser.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
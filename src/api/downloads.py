@@ -0,0 +1,105 @@
+"""
+Streamed downloads of rewritten files.
+
+A single file is streamed straight from the apply rewrite (untouched slices
+and replacements) in UTF-8 chunks, so no temporary file is written and
+nothing is left behind if the client disconnects. Several files are
+streamed as one zip archive that is built on the fly: each entry is
+compressed and sent as it is produced, without staging the archive on disk.
+"""
+
+import os
+import time
+import zipfile
+from typing import Callable, Iterable, Iterator, Tuple
+
+from flask import Response, stream_with_context
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_encoded(parts: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join text pieces into UTF-8 chunks of roughly chunk_size bytes"""
+    buffer = []
+    size = 0
+    for part in parts:
+        if not part:
+            continue
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+class _StreamBuffer:
+    """Write-only, unseekable file object whose contents are drained by the generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def unique_archive_names(filenames: Iterable[str], prefix: str = 'processed_') -> Iterator[str]:
+    """Safe, unique entry names (no directories, duplicates numbered)"""
+    seen = set()
+    for filename in filenames:
+        base = prefix + (os.path.basename(filename.replace('\\', '/')) or 'file.tsx')
+        name = base
+        counter = 1
+        while name in seen:
+            root, extension = os.path.splitext(base)
+            name = f'{root}_{counter}{extension}'
+            counter += 1
+        seen.add(name)
+        yield name
+
+
+def iter_zip(entries: Iterable[Tuple[str, Callable[[], Iterable[bytes]]]]) -> Iterator[bytes]:
+    """Stream a zip archive of (name, chunk producer) entries
+
+    Producers are called one at a time, so only the entry being compressed
+    is held in memory.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, produce in entries:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as entry:
+                for chunk in produce():
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    # Central directory
+    yield buffer.drain()
+
+
+def attachment_response(chunks: Iterable[bytes], download_name: str, mimetype: str) -> Response:
+    """Streamed attachment response (the request context is kept for the generator)"""
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response
@@ -0,0 +1,139 @@
+"""
+Git-aware incremental scanning.
+
+Asks the local git repository which `*.tsx` files changed since a base ref
+and runs `search_untemplated` on those files only. Hits are then matched
+against the changed hunks, so a pre-merge check can report just the
+untemplated strings that the change introduced.
+"""
+
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+from locale_service import LocaleService
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+class GitError(Exception):
+    """Raised when a git command fails"""
+
+
+def _git(repo: str, *args: str) -> str:
+    try:
+        completed = subprocess.run(
+            ['git', '-c', 'core.quotePath=false', *args],
+            cwd=repo, capture_output=True, check=True
+        )
+    except FileNotFoundError:
+        raise GitError('git executable not found')
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode('utf-8', 'replace').strip() or f'git {args[0]} failed')
+    return completed.stdout.decode('utf-8', 'replace')
+
+
+def repo_root(path: str = '.') -> str:
+    return _git(path, 'rev-parse', '--show-toplevel').strip()
+
+
+def changed_hunks(base: str, repo: str = '.', head: Optional[str] = None) -> Dict[str, List[Tuple[int, int]]]:
+    """Map each changed TSX file to the (first, last) line ranges added or modified
+
+    Compares `base` with `head`, or with the working tree when head is None;
+    untracked (not ignored) files of the working tree are new in their
+    entirety. Deleted files are ignored. Paths are relative to the
+    repository root.
+    """
+    refs = [base] + ([head] if head else [])
+    diff = _git(repo, 'diff', '-U0', '--no-color', '--no-ext-diff', '--diff-filter=ACMR',
+                *refs, '--', '*.tsx')
+
+    hunks: Dict[str, List[Tuple[int, int]]] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith('+++ '):
+            # git ends the header with a TAB when the path contains a space
+            target = line[4:].removesuffix('\t')
+            current = target[2:] if target.startswith('b/') else None
+            if current is not None:
+                hunks.setdefault(current, [])
+        elif line.startswith('@@') and current is not None:
+            match = HUNK_HEADER.match(line)
+            if match:
+                first = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                if count > 0:
+                    hunks[current].append((first, first + count - 1))
+
+    if head is None:
+        untracked = _git(repo, 'ls-files', '--others', '--exclude-standard', '--full-name', '-z', '--', '*.tsx')
+        if untracked:
+            root = repo_root(repo)
+            for relative_path in untracked.split('\0'):
+                if not relative_path:
+                    continue
+                try:
+                    with open(os.path.join(root, relative_path), 'r', encoding='utf-8', errors='replace') as f:
+                        line_count = sum(1 for _ in f)
+                except OSError:
+                    continue
+                hunks[relative_path] = [(1, line_count)] if line_count else []
+    return hunks
+
+
+def _in_hunks(first: int, last: int, ranges: List[Tuple[int, int]]) -> bool:
+    return any(first <= hunk_last and last >= hunk_first for hunk_first, hunk_last in ranges)
+
+
+def scan_changed(base: str, repo: str = '.', head: Optional[str] = None,
+                 service: Optional[LocaleService] = None) -> Dict:
+    """Search only the TSX files changed since base and flag hits inside changed hunks"""
+    start_time = time.time()
+    service = service or LocaleService()
+    root = repo_root(repo)
+    hunks = changed_hunks(base, root, head)
+
+    files = []
+    new_elements_count = 0
+    total_count = 0
+    for relative_path in sorted(hunks):
+        if head:
+            content = _git(root, 'show', f'{head}:{relative_path}')
+        else:
+            with open(os.path.join(root, relative_path), 'r', encoding='utf-8') as f:
+                content = f.read()
+
+        result = service.search_untemplated(content)
+        new_elements = [
+            element for element in result['elements']
+            if _in_hunks(element['line'], element['end_line'], hunks[relative_path])
+        ]
+
+        total_count += result['count']
+        new_elements_count += len(new_elements)
+        file_result = {
+            'path': relative_path,
+            'count': result['count'],
+            'new_count': len(new_elements),
+            'new_elements': new_elements
+        }
+        if not result['success']:
+            # Scan aborted by the scan budget: the hits are partial
+            file_result['error'] = result['error']
+        files.append(file_result)
+
+    duration = time.time() - start_time
+    return {
+        'success': not any('error' in file_result for file_result in files),
+        'base': base,
+        'head': head,
+        'files_scanned': len(files),
+        'count': total_count,
+        'new_count': new_elements_count,
+        'files': files,
+        'duration': duration,
+        'message': f'Found {new_elements_count} new untemplated Korean elements in {len(files)} changed files'
+    }
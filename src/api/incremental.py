@@ -0,0 +1,214 @@
+"""
+Incremental element scan of an edited document.
+
+Editors send a change for every keystroke; rescanning a 10k-line file each
+time is wasteful because an edit only changes matches near it. The scan
+keeps the raw matches of every element pattern and, for an edit, rescans
+from a restart point before the edit until the new matches line up again
+with the old ones after it:
+
+* Restart point: the earliest position where a regex attempt could read
+  into the edited range. It follows from the shape of each pattern (see
+  `restart_point`). Matches that start before it are kept unchanged.
+* Resync: once a new match starts after the edit at the (shifted) position
+  of an old match with the same extent, every later match is the same as
+  before, shifted by the length difference, because the patterns only look
+  forward.
+
+The result is always identical to a full `find_tsx_elements_with_korean`
+scan of the new content.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple, Union
+
+from locale_service import LocaleService
+
+_is_word_char = re.compile(r'\w').match
+
+# Text every match of a pattern starts with; positions without it are skipped
+_CANDIDATES = {
+    'simple': re.compile(r'<\w'),
+    'self_closing': re.compile(r'<\w'),
+    'attribute': re.compile(r'\w')
+}
+
+# (start, end, element, untemplated) of one pattern match; element is None
+# when the match holds no Korean text. untemplated is True, False, or for a
+# partially templated element the texts apply still wraps. Element offsets
+# are fixed up on output.
+Entry = Tuple[int, int, Optional[Dict], Union[bool, List[str]]]
+
+
+def _word_run_start(content: str, end: int) -> int:
+    """Start of the run of word characters ending at end"""
+    start = end
+    while start > 0 and _is_word_char(content[start - 1]):
+        start -= 1
+    return start
+
+
+def restart_point(kind: str, content: str, position: int) -> int:
+    """Earliest start of a match attempt that can read content[position]
+
+    Bounds for the element patterns of LocaleService:
+
+    * simple `<(\\w+)([^>]*?)>([^<]*)</\\1>`: an attempt reads up to the
+      first `>`, then up to the next `<` and its closing tag. Reaching
+      position means that this `<` is the last or second-to-last `<` before
+      it, so the attempt starts after the `>` preceding that one.
+    * self_closing `<(\\w+)([^>]*?)/>`: an attempt ends at the first `>`, so
+      it starts after the last `>` before position.
+    * attribute `(\\w+)=["']...["']`: an attempt ends at the quote after
+      its opening quote, so the opening quote is the last quote before
+      position (or the attempt is still in its `name=` prefix).
+    """
+    if kind == 'simple':
+        last_lt = content.rfind('<', 0, position)
+        if last_lt > 0:
+            last_lt = content.rfind('<', 0, last_lt)
+        if last_lt <= 0:
+            return 0
+        return content.rfind('>', 0, last_lt) + 1
+
+    if kind == 'self_closing':
+        return content.rfind('>', 0, position) + 1
+
+    quote = max(content.rfind('"', 0, position), content.rfind("'", 0, position))
+    prefix_end = position - 1 if position > 0 and content[position - 1] in '="\'' else position
+    if prefix_end > 0 and content[prefix_end - 1] == '=':
+        prefix_end -= 1
+    start = _word_run_start(content, prefix_end)
+    if quote > 0 and content[quote - 1] == '=':
+        start = min(start, _word_run_start(content, quote - 1))
+    return start
+
+
+class IncrementalScan:
+    """Element matches of one document, kept up to date under edits
+
+    The matches of each pattern are kept in a gap buffer split at the last
+    edit: `head` holds the matches before it with absolute offsets, `tail`
+    the matches after it, nearest last, with offsets counted from the end
+    of the document. Edits do not move the matches after them, so typing in
+    one place touches only the few matches around the cursor.
+    """
+
+    def __init__(self, service: LocaleService, content: str = ''):
+        self.service = service
+        self.matchers = service.element_matchers()
+        self.content = content
+        self.head: Dict[str, List[Entry]] = {}
+        self.tail: Dict[str, List[Entry]] = {}
+        self.rescan()
+
+    def rescan(self, content: Optional[str] = None):
+        """Scan the whole document"""
+        if content is not None:
+            self.content = content
+        for kind, pattern in self.matchers:
+            self.head[kind] = [self._entry(kind, match) for match in pattern.finditer(self.content)]
+            self.tail[kind] = []
+
+    def _entry(self, kind: str, match: re.Match) -> Entry:
+        element = self.service.element_from_match(kind, match)
+        untemplated = False
+        if element is not None:
+            if not self.service.has_any_template(element['full_match']):
+                untemplated = True
+            else:
+                # Partially templated: the texts apply wraps, as search reports them
+                untemplated = self.service.untemplated_texts(element) or False
+        return match.start(), match.end(), element, untemplated
+
+    def _move_gap(self, kind: str, restart: int):
+        """Leave exactly the matches that start before restart in head"""
+        head = self.head[kind]
+        tail = self.tail[kind]
+        length = len(self.content)
+        while head and head[-1][0] >= restart:
+            start, end, element, untemplated = head.pop()
+            tail.append((length - start, length - end, element, untemplated))
+        while tail and length - tail[-1][0] < restart:
+            start, end, element, untemplated = tail.pop()
+            head.append((length - start, length - end, element, untemplated))
+
+    @staticmethod
+    def _resume_point(tail: List[Entry], old_length: int, position: int) -> int:
+        """First old offset >= position that the old scan tried (not inside an old match)"""
+        index = bisect_left(tail, (old_length - position + 1,))
+        if index < len(tail) and old_length - tail[index][1] > position:
+            return old_length - tail[index][1]
+        return position
+
+    def edit(self, start: int, end: int, text: str):
+        """Replace content[start:end] with text and update the matches"""
+        old_length = len(self.content)
+        content = self.content[:start] + text + self.content[end:]
+        delta = len(text) - (end - start)
+        restarts = [restart_point(kind, content, start) for kind, _ in self.matchers]
+        # Gap moves use the offsets of the old content
+        for (kind, _), restart in zip(self.matchers, restarts):
+            self._move_gap(kind, restart)
+        self.content = content
+
+        for (kind, pattern), restart in zip(self.matchers, restarts):
+            head = self.head[kind]
+            tail = self.tail[kind]
+            candidate = _CANDIDATES[kind]
+            # Matches before the restart point never read the edited range
+            position = max(restart, head[-1][1]) if head else restart
+
+            # Past the edit, both scans are in step again at the first
+            # position that each of them tries (one not inside a match)
+            resume = self._resume_point(tail, old_length, end) + delta
+            while position < resume:
+                found = candidate.search(content, position, resume + 1)
+                if found is None or found.start() >= resume:
+                    break
+                match = pattern.match(content, found.start())
+                if match is None:
+                    position = found.start() + 1
+                    continue
+                head.append(self._entry(kind, match))
+                position = match.end()
+                if position > resume:
+                    resume = self._resume_point(tail, old_length, position - delta) + delta
+
+            # Old matches from the resume point on are unchanged
+            del tail[bisect_left(tail, (len(content) - resume + 1,)):]
+
+    def _entries(self, kind: str):
+        """All matches of one pattern in document order, with absolute offsets"""
+        length = len(self.content)
+        yield from self.head[kind]
+        for start, end, element, untemplated in reversed(self.tail[kind]):
+            yield length - start, length - end, element, untemplated
+
+    def elements(self, untemplated_only: bool = False) -> List[Dict]:
+        """Elements with Korean text, in find_tsx_elements_with_korean order"""
+        elements = []
+        untemplated_ids = {}
+        for kind, _ in self.matchers:
+            for start, end, element, untemplated in self._entries(kind):
+                if element is None:
+                    continue
+                if element['start'] != start:
+                    element = dict(element, start=start, end=end)
+                if untemplated:
+                    untemplated_ids[id(element)] = untemplated
+                elements.append(element)
+        # Overlapping hits are resolved on the whole document, as a full scan does
+        elements = self.service.dedupe_elements(elements)
+        if untemplated_only:
+            elements = [
+                element if untemplated_ids[id(element)] is True
+                else dict(element, korean_texts=untemplated_ids[id(element)], partially_templated=True)
+                for element in elements if id(element) in untemplated_ids
+            ]
+        return elements
+
+    def untemplated(self) -> List[Dict]:
+        """Elements without templates, as search_untemplated reports them (without line/column)"""
+        return self.elements(untemplated_only=True)
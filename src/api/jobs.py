@@ -0,0 +1,356 @@
+"""
+Asynchronous job subsystem for long-running batch scans and applies.
+
+A job is submitted with a list of files and returns immediately with a job
+ID. Jobs are executed by a small pool of worker threads fed from a bounded
+queue; when the queue is full new submissions are rejected instead of
+piling up. Inputs, status and results live on disk under JOBS_DIR, so any
+server process can report on a job, and finished jobs are evicted after a
+TTL by a background janitor thread.
+
+Queued and running jobs live in the memory of the process that accepted
+them, which a gunicorn worker restart or crash loses. Their status records
+the owner's pid and a heartbeat the owner refreshes while it holds them: a
+job whose heartbeat is older than JOB_STALE_AFTER is reported as failed
+and then evicted like any other finished job.
+"""
+
+import json
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from batch import apply_batch
+from locale_service import LocaleService
+from scan_store import ScanStore, apply_record, search_record
+
+JOBS_DIR = os.environ.get(
+    'LOCALE_TOOL_JOBS_DIR',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'jobs')
+)
+JOB_WORKERS = int(os.environ.get('LOCALE_TOOL_JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('LOCALE_TOOL_JOB_QUEUE_SIZE', 16))
+JOB_RESULT_TTL = int(os.environ.get('LOCALE_TOOL_JOB_RESULT_TTL', 3600))
+# Scan processes used by a single apply job (1 = run in the job thread)
+JOB_SCAN_WORKERS = int(os.environ.get('LOCALE_TOOL_JOB_SCAN_WORKERS', 1))
+# Seconds without a heartbeat after which a queued or running job is orphaned
+JOB_STALE_AFTER = int(os.environ.get('LOCALE_TOOL_JOB_STALE_AFTER', 300))
+
+JOB_OPERATIONS = ('search', 'apply')
+JOB_ACTIVE_STATES = ('queued', 'running')
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+class JobManager:
+    """Bounded in-process job queue with on-disk status and results"""
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, workers: int = JOB_WORKERS,
+                 queue_size: int = JOB_QUEUE_SIZE, ttl: int = JOB_RESULT_TTL,
+                 service: Optional[LocaleService] = None, store: Optional[ScanStore] = None,
+                 stale_after: int = JOB_STALE_AFTER):
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.service = service or LocaleService()
+        self.store = store
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.status_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.threads: List[threading.Thread] = []
+        self.running_count = 0
+        # Status of the queued and running jobs owned by this process, by job ID
+        self.active: Dict[str, Dict] = {}
+
+    # Paths
+
+    def _job_dir(self, job_id: str) -> str:
+        if not JOB_ID_PATTERN.match(job_id):
+            raise KeyError(job_id)
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), 'status.json')
+
+    def result_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), 'result.json')
+
+    # Threads are started lazily so importing the app never spawns threads
+    # (important when gunicorn preloads the app before forking workers)
+
+    def start(self):
+        with self.start_lock:
+            if self.threads:
+                return
+            os.makedirs(self.jobs_dir, exist_ok=True)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'locale-job-{i}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+            janitor = threading.Thread(target=self._janitor_loop, name='locale-job-janitor', daemon=True)
+            janitor.start()
+            self.threads.append(janitor)
+
+    # Status
+
+    def _write_status(self, job_id: str, status: Dict):
+        path = self._status_path(job_id)
+        tmp_path = path + '.tmp'
+        with self.status_lock:
+            status['heartbeat_at'] = time.time()
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def get_status(self, job_id: str) -> Optional[Dict]:
+        """Return the status of a job, or None if it is unknown or expired"""
+        try:
+            path = self._status_path(job_id)
+            with open(path, 'r', encoding='utf-8') as f:
+                status = json.load(f)
+            heartbeat_at = status.get('heartbeat_at') or os.path.getmtime(path)
+        except (KeyError, OSError, ValueError):
+            return None
+        if status['status'] in JOB_ACTIVE_STATES and job_id not in self.active \
+                and heartbeat_at + self.stale_after < time.time():
+            # Its owner stopped (worker restart or crash) and the job is lost
+            status['status'] = 'failed'
+            status['error'] = f"Job failed: worker process {status.get('owner_pid')} stopped"
+            status['finished_at'] = time.time()
+            status['expires_at'] = status['finished_at'] + self.ttl
+            try:
+                self._write_status(job_id, status)
+            except OSError:
+                pass
+        return status
+
+    def _heartbeat(self):
+        """Refresh the heartbeat of the jobs owned by this process"""
+        with self.status_lock:
+            active = list(self.active.items())
+        for job_id, status in active:
+            try:
+                self._write_status(job_id, status)
+            except OSError:
+                pass
+
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    # Submission
+
+    def submit(self, operation: str, files: List[Tuple[str, str]], template_type: str = 'bt') -> Dict:
+        """Queue a job for the given (filename, content) pairs
+
+        Raises:
+            ValueError: If the operation or template type is not supported
+            QueueFullError: If the queue is full
+        """
+        if operation not in JOB_OPERATIONS:
+            raise ValueError(f'Invalid operation. Must be one of: {", ".join(JOB_OPERATIONS)}')
+        if operation == 'apply' and template_type != 'bt':
+            raise ValueError('BVT Template is temporarily disabled. Only BT Template is available.')
+        if self.queue.full():
+            raise QueueFullError('Job queue is full, please retry later')
+
+        self.start()
+        job_id = uuid.uuid4().hex
+        input_dir = os.path.join(self._job_dir(job_id), 'input')
+        os.makedirs(input_dir)
+
+        # Inputs are written to disk so the request can release its memory
+        bytes_total = 0
+        filenames = []
+        for index, (filename, content) in enumerate(files):
+            data = content.encode('utf-8')
+            with open(os.path.join(input_dir, f'{index:06d}.tsx'), 'wb') as f:
+                f.write(data)
+            bytes_total += len(data)
+            filenames.append(filename)
+
+        now = time.time()
+        status = {
+            'job_id': job_id,
+            'operation': operation,
+            'template_type': template_type,
+            'status': 'queued',
+            'filenames': filenames,
+            'files_total': len(filenames),
+            'files_done': 0,
+            'bytes_total': bytes_total,
+            'bytes_processed': 0,
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'expires_at': None,
+            'error': None,
+            'owner_pid': os.getpid(),
+            'heartbeat_at': now
+        }
+        self._write_status(job_id, status)
+
+        with self.status_lock:
+            self.active[job_id] = status
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            with self.status_lock:
+                self.active.pop(job_id, None)
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+            raise QueueFullError('Job queue is full, please retry later')
+        return status
+
+    # Execution
+
+    def _worker_loop(self):
+        while True:
+            job_id = self.queue.get()
+            try:
+                self._run_job(job_id)
+            finally:
+                self.queue.task_done()
+
+    def _run_job(self, job_id: str):
+        with self.status_lock:
+            status = self.active.get(job_id)
+        if status is None:
+            status = self.get_status(job_id)
+        if status is None:
+            return
+
+        with self.status_lock:
+            self.running_count += 1
+            self.active[job_id] = status
+        status['status'] = 'running'
+        status['started_at'] = time.time()
+        self._write_status(job_id, status)
+
+        try:
+            input_dir = os.path.join(self._job_dir(job_id), 'input')
+            paths = [os.path.join(input_dir, f'{i:06d}.tsx') for i in range(status['files_total'])]
+            if status['operation'] == 'search':
+                result = self._run_search(job_id, status, paths)
+            else:
+                result = self._run_apply(job_id, status, paths)
+
+            tmp_path = self.result_path(job_id) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, self.result_path(job_id))
+            shutil.rmtree(input_dir, ignore_errors=True)
+            status['status'] = 'completed'
+        except Exception as e:
+            status['status'] = 'failed'
+            status['error'] = f'Job failed: {str(e)}'
+        finally:
+            with self.status_lock:
+                self.running_count -= 1
+
+        status['finished_at'] = time.time()
+        status['expires_at'] = status['finished_at'] + self.ttl
+        self._write_status(job_id, status)
+        with self.status_lock:
+            self.active.pop(job_id, None)
+
+    def _progress(self, job_id: str, status: Dict, bytes_done: int):
+        status['files_done'] += 1
+        status['bytes_processed'] += bytes_done
+        self._write_status(job_id, status)
+
+    def _run_search(self, job_id: str, status: Dict, paths: List[str]) -> Dict:
+        files = []
+        records = []
+        total = 0
+        for filename, path in zip(status['filenames'], paths):
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            result = self.service.search_untemplated(content)
+            result['filename'] = filename
+            total += result['count']
+            files.append(result)
+            if self.store is not None:
+                records.append(search_record(filename, content, result))
+            self._progress(job_id, status, len(content.encode('utf-8')))
+        if self.store is not None:
+            self._record('search', records)
+        return {
+            'success': True,
+            'operation': 'search',
+            'count': total,
+            'files': files,
+            'message': f'Found {total} untemplated Korean elements in {len(files)} files'
+        }
+
+    def _run_apply(self, job_id: str, status: Dict, paths: List[str]) -> Dict:
+        filenames = dict(zip(paths, status['filenames']))
+
+        def on_scanned(scan_result):
+            self._progress(job_id, status, scan_result.get('bytes', 0))
+
+        # W# placeholders, as /api/apply returns: IDs allocated from the uploaded
+        # subset alone would collide with IDs used elsewhere in the project
+        result = apply_batch(paths, workers=JOB_SCAN_WORKERS, include_content=True, assign_ids=False,
+                             progress=on_scanned)
+        for file_result in result['files'] + result['errors']:
+            file_result['filename'] = filenames[file_result.pop('path')]
+        if self.store is not None:
+            self._record('apply', [
+                apply_record(f['filename'], f['content_hash'], f['replacements_count']) for f in result['files']
+            ])
+        result['operation'] = 'apply'
+        return result
+
+    def _record(self, operation: str, records: List[Dict]):
+        """Write a job's scan to the history store; a store failure never fails the job"""
+        try:
+            self.store.record_scan(operation, records, source='job')
+        except sqlite3.Error:
+            pass
+
+    # Eviction
+
+    def evict_expired(self) -> int:
+        """Remove finished jobs whose TTL has passed, returning the number removed
+
+        Orphaned jobs are marked as failed first, so they expire one TTL later.
+        """
+        if not os.path.isdir(self.jobs_dir):
+            return 0
+        now = time.time()
+        removed = 0
+        for job_id in os.listdir(self.jobs_dir):
+            if not JOB_ID_PATTERN.match(job_id):
+                continue
+            status = self.get_status(job_id)
+            if status is None:
+                # Half-written job directory: evict once it is older than the TTL
+                job_dir = self._job_dir(job_id)
+                expired = os.path.getmtime(job_dir) + self.ttl < now
+            else:
+                expired = status['expires_at'] is not None and status['expires_at'] < now
+            if expired:
+                shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _janitor_loop(self):
+        # Frequent enough to keep the heartbeats of this process's jobs fresh
+        interval = max(1, min(60, self.ttl // 10, self.stale_after // 3))
+        while True:
+            time.sleep(interval)
+            try:
+                self._heartbeat()
+                self.evict_expired()
+            except OSError:
+                pass
@@ -0,0 +1,608 @@
+"""
+Core locale processing engine shared by the API, the CLI and batch tools.
+
+This module has no Flask dependency so it can be imported from worker
+processes and command line tools without initialising the web app.
+"""
+
+import math
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from matchers import SelfClosingMatcher, SimpleElementMatcher, TemplateCallMatcher
+from scripts import ScriptTable
+
+# The scan patterns use possessive quantifiers (`\w++`, `*+`), new in Python 3.11
+if sys.version_info < (3, 11):
+    raise RuntimeError(
+        f'The locale engine requires Python 3.11+, running {sys.version_info.major}.{sys.version_info.minor}'
+    )
+
+# Maximum number of distinct strings kept in the detect_korean_text memo cache
+DETECT_CACHE_SIZE = int(os.environ.get('LOCALE_TOOL_DETECT_CACHE_SIZE', 8192))
+# CPU seconds one file may take to scan before the scan is aborted (0 disables)
+SCAN_BUDGET = float(os.environ.get('LOCALE_TOOL_SCAN_BUDGET', 10))
+
+# Polynomial rolling hash used to compare joined segments
+_HASH_BASE = 1_000_003
+_HASH_MODULUS = (1 << 61) - 1
+
+
+class ScanBudgetExceeded(Exception):
+    """Scanning one file took more CPU time than the scan budget
+    
+    Carries the elements found before the scan was aborted.
+    """
+    
+    def __init__(self, budget: float, position: int, length: int, elements: Optional[List[Dict]] = None):
+        self.budget = budget
+        self.position = position
+        self.length = length
+        self.elements = elements or []
+        super().__init__(
+            f'Scan aborted after {budget:g}s of CPU time at offset {position} of {length}: '
+            f'results are partial (LOCALE_TOOL_SCAN_BUDGET)'
+        )
+
+
+class LineIndex:
+    """Newline offset index mapping character offsets to line/column in O(log n)
+    
+    Built once per file; lines and columns are 1-based.
+    """
+    
+    def __init__(self, content: str):
+        lines = content.split('\n')
+        # Start offset of every line: 0, then one past each newline
+        self.line_starts = array('q', [0])
+        self.line_starts.extend(accumulate(len(line) + 1 for line in lines[:-1]))
+    
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+    
+    def offset(self, line: int, column: int) -> int:
+        """Inverse of line_col"""
+        return self.line_starts[line - 1] + column - 1
+    
+    def annotate(self, element: Dict) -> Dict:
+        """Add line/column fields for an element's start and end offsets"""
+        element['line'], element['column'] = self.line_col(element['start'])
+        element['end_line'], element['end_column'] = self.line_col(element['end'])
+        return element
+
+
+class LocaleService:
+    """Service class containing the core locale processing logic"""
+    
+    def __init__(self, detect_cache_size: int = DETECT_CACHE_SIZE,
+                 scripts: Optional[Sequence[str]] = None, scan_budget: float = SCAN_BUDGET):
+        # Detection pattern for the enabled scripts (LOCALE_TOOL_SCRIPTS,
+        # default: hangul), compiled from merged codepoint range tables
+        self.script_table = ScriptTable(scripts)
+        self.scripts = self.script_table.scripts
+        self.korean_pattern = self.script_table.pattern
+        self.block_pattern = re.compile(
+            f'{self.script_table.char_class}+(?: {self.script_table.char_class}+)*'
+        )
+        self.scan_budget = scan_budget
+        
+        # Matches of `(\w+)=["']([^"']*K+[^"']*)["']` (K: the script class)
+        # without backtracking: an attribute starts at the start of a word,
+        # and its value runs to the first quote, so both are read possessively
+        script_chars = self.script_table.char_class[1:-1]
+        self.attr_pattern = re.compile(
+            r'(?<!\w)(\w++)=["\']([^"\'' + script_chars + r']*+[' + script_chars + r'][^"\']*+)["\']'
+        )
+        
+        # Template patterns
+        self.bt_template = r'\{bt\("W\d+",\s*"([^"]+)"\)\}'
+        self.bvt_template = r'\{bvt\(([^)]+)\)\}'
+        
+        # Element patterns, built once per service (and before forking
+        # when the server preloads the app). The element and bvt patterns
+        # backtrack quadratically on minified input, so they are found by
+        # linear-time matchers (see matchers.py)
+        self.simple_pattern = SimpleElementMatcher()
+        self.self_closing_pattern = SelfClosingMatcher()
+        self.bt_pattern = re.compile(r'\{bt\("W\d+",\s*"[^"]+"\)\}')
+        self.bvt_pattern = TemplateCallMatcher('bvt', nonempty=True)
+        
+        # Spans that are already templated, W# placeholders included, so
+        # apply never wraps text twice: `\{bt\("W(?:\d+|#)",\s*"[^"]*"\)\}`
+        # or `\{bvt\([^)]*\)\}`, whichever starts first
+        self.bt_span_pattern = re.compile(r'\{bt\("W(?:\d+|#)",\s*"[^"]*"\)\}')
+        self.bvt_span_pattern = TemplateCallMatcher('bvt')
+        
+        # Bounded memo cache shared by the search and apply paths. The same
+        # labels ("확인", "취소", ...) repeat thousands of times in real apps.
+        self._detect_cached = lru_cache(maxsize=detect_cache_size)(self._segment_korean_text)
+    
+    def detect_korean_text(self, text: str) -> List[str]:
+        """Detect Korean text in the given string (memoized per string)"""
+        return list(self._detect_cached(text))
+    
+    def cache_stats(self) -> Dict:
+        """Hit-rate statistics for the detect_korean_text memo cache"""
+        info = self._detect_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'size': info.currsize,
+            'max_size': info.maxsize
+        }
+    
+    def clear_cache(self):
+        """Drop all memoized detect_korean_text results"""
+        self._detect_cached.cache_clear()
+    
+    def _segment_korean_text(self, text: str) -> tuple:
+        """Segment Korean text in the given string (uncached)
+        
+        Segments separated by single spaces are joined, and the longest
+        such join that occurs in the text is the result: the first among
+        the longest when read left to right. Any join that occurs in the
+        text occurs as runs separated by single spaces, so only those
+        blocks of runs are candidates, which keeps this linear in the text.
+        """
+        # Blocks of Korean text segments separated by single spaces
+        blocks = [match.span() for match in self.block_pattern.finditer(text)]
+        
+        if not blocks:
+            return ()
+        
+        # If there's only one block, return it
+        if len(blocks) == 1:
+            start, end = blocks[0]
+            return (text[start:end],)
+        
+        longest = max(end - start for start, end in blocks)
+        best = [(start, end) for start, end in blocks if end - start == longest]
+        start, end = best[0]
+        joined = text[start:end]
+        if len(best) > 1 and any(text[s:e] != joined for s, e in best):
+            # A join starting at an earlier segment can repeat the text of
+            # a later block of the same length; it wins the tie
+            segments = [match.span() for match in self.korean_pattern.finditer(text)]
+            before = bisect_right(segments, (start, start))
+            joined = self._first_join(text, segments, before, longest, {text[s:e] for s, e in best}) or joined
+        return (joined,)
+    
+    @staticmethod
+    def _first_join(text: str, segments: List[Tuple[int, int]], before: int, length: int, candidates) -> Optional[str]:
+        """Earliest join of segments, starting before a segment index, that is one of the candidates
+        
+        Joins are compared by a rolling hash of all segments joined with
+        spaces, so each start costs O(1) however long the joins are.
+        """
+        joined = ' '.join(text[start:end] for start, end in segments)
+        prefix = [0]
+        for char in joined:
+            prefix.append((prefix[-1] * _HASH_BASE + ord(char)) % _HASH_MODULUS)
+        scale = pow(_HASH_BASE, length, _HASH_MODULUS)
+        wanted = {}
+        for candidate in candidates:
+            value = 0
+            for char in candidate:
+                value = (value * _HASH_BASE + ord(char)) % _HASH_MODULUS
+            wanted[value] = candidate
+        
+        ends = set()
+        offset = -1
+        for start, end in segments:
+            offset += end - start + 1
+            ends.add(offset)
+        
+        offset = 0
+        for index in range(before):
+            start, end = segments[index]
+            if offset + length in ends:
+                value = (prefix[offset + length] - prefix[offset] * scale) % _HASH_MODULUS
+                candidate = wanted.get(value)
+                if candidate is not None and joined.startswith(candidate, offset):
+                    return candidate
+            offset += end - start + 1
+        return None
+    
+    def element_matchers(self) -> Tuple[Tuple[str, re.Pattern], ...]:
+        """(kind, pattern) pairs scanned for elements, in report order
+        
+        Patterns are compiled regexes or matchers with the same finditer,
+        search and match methods.
+        """
+        return (
+            # Simple elements (those without nested tags)
+            ('simple', self.simple_pattern),
+            # Self-closing tags with Korean text in attributes
+            ('self_closing', self.self_closing_pattern),
+            # Attributes with Korean text
+            ('attribute', self.attr_pattern)
+        )
+    
+    def element_from_match(self, kind: str, match: re.Match) -> Optional[Dict]:
+        """Element record for one pattern match, or None without Korean text"""
+        if kind == 'simple':
+            inner_text = match.group(3).strip()
+            # What apply wraps: every block, not only the longest
+            korean_texts = self.wrapped_texts(inner_text)
+            if not korean_texts:
+                return None
+            return {
+                'tag': match.group(1),
+                'attributes': match.group(2),
+                'inner_text': inner_text,
+                'korean_texts': korean_texts,
+                'start': match.start(),
+                'end': match.end(),
+                'full_match': match.group(0),
+                'is_simple': True
+            }
+        
+        if kind == 'self_closing':
+            attributes = match.group(2)
+            korean_texts = self.detect_korean_text(attributes)
+            if not korean_texts:
+                return None
+            return {
+                'tag': match.group(1),
+                'attributes': attributes,
+                'inner_text': '',
+                'korean_texts': korean_texts,
+                'start': match.start(),
+                'end': match.end(),
+                'full_match': match.group(0),
+                'is_self_closing': True
+            }
+        
+        attr_name = match.group(1)
+        attr_value = match.group(2)
+        korean_texts = self.detect_korean_text(attr_value)
+        if not korean_texts:
+            return None
+        return {
+            'tag': 'attribute',
+            'attributes': f'{attr_name}="{attr_value}"',
+            'inner_text': attr_value,
+            'korean_texts': korean_texts,
+            'start': match.start(),
+            'end': match.end(),
+            'full_match': match.group(0),
+            'is_attribute': True
+        }
+    
+    def scan_deadline(self) -> float:
+        """Thread CPU time at which a scan starting now exceeds the scan budget"""
+        return time.thread_time() + self.scan_budget if self.scan_budget > 0 else math.inf
+    
+    def find_tsx_elements_with_korean(self, content: str) -> List[Dict]:
+        """Find TSX elements containing Korean text
+        
+        Raises ScanBudgetExceeded, with the elements found so far, when the
+        scan takes more CPU time than the scan budget.
+        """
+        deadline = self.scan_deadline()
+        elements = []
+        for kind, pattern in self.element_matchers():
+            for match in pattern.finditer(content):
+                if time.thread_time() > deadline:
+                    raise ScanBudgetExceeded(self.scan_budget, match.start(), len(content),
+                                             self.dedupe_elements(elements))
+                element = self.element_from_match(kind, match)
+                if element is not None:
+                    elements.append(element)
+        return self.dedupe_elements(elements)
+    
+    @staticmethod
+    def dedupe_elements(elements: List[Dict]) -> List[Dict]:
+        """Report every source span once, with its most specific classification
+        
+        The element passes overlap: an attribute of a self-closing tag is
+        found both as the tag and as the attribute, and attribute syntax in
+        the text of a simple element (`<p>a="한글"</p>`) both as the text and
+        as an attribute. Hits are checked against interval indexes of the
+        other passes and kept the way apply rewrites them:
+        
+        * a self-closing tag whose Korean text comes from its attributes is
+          dropped in favour of the attribute hits;
+        * an attribute inside the text of a simple element is dropped in
+          favour of the element.
+        
+        The order of the remaining hits is unchanged.
+        """
+        simple, self_closing, attributes = [], [], []
+        for index, element in enumerate(elements):
+            if 'is_attribute' in element:
+                attributes.append(index)
+            elif 'is_simple' in element:
+                simple.append(index)
+            elif 'is_self_closing' in element:
+                self_closing.append(index)
+        if not attributes:
+            return elements
+        # Each pass reports its hits in document order, so every index list
+        # is sorted by offset and is swept with a single pointer
+        attribute_starts = [elements[index]['start'] for index in attributes]
+        
+        dropped = set()
+        position = 0
+        for index in simple:
+            element = elements[index]
+            # Text range: after the opening tag, before `</tag>`
+            inner_start = element['start'] + element['full_match'].index('>') + 1
+            inner_end = element['end'] - len(element['tag']) - 3
+            position = bisect_left(attribute_starts, inner_start, position)
+            while position < len(attributes) and attribute_starts[position] < inner_end:
+                if elements[attributes[position]]['end'] <= inner_end:
+                    dropped.add(attributes[position])
+                position += 1
+        
+        position = 0
+        for index in self_closing:
+            element = elements[index]
+            tag_end = element['end']
+            attribute_texts = set()
+            position = bisect_left(attribute_starts, element['start'], position)
+            while position < len(attributes) and attribute_starts[position] < tag_end:
+                attribute = elements[attributes[position]]
+                if attribute['end'] <= tag_end:
+                    attribute_texts.update(attribute['korean_texts'])
+                position += 1
+            if attribute_texts.issuperset(element['korean_texts']):
+                dropped.add(index)
+        
+        if not dropped:
+            return elements
+        return [element for index, element in enumerate(elements) if index not in dropped]
+    
+    def has_any_template(self, text: str) -> bool:
+        """Check if text has any template (bt or bvt)"""
+        return bool(self.bt_pattern.search(text) or self.bvt_pattern.search(text))
+    
+    def untemplated_texts(self, element: Dict) -> List[str]:
+        """Texts apply wraps in a simple element with templates
+        
+        Text left outside the templates (`<p>안녕 {bt("W1", "확인")} 세상</p>`)
+        is wrapped by apply, so search reports such an element as partially
+        templated, with these texts as its korean_texts.
+        """
+        if 'is_simple' not in element:
+            return []
+        full_match = element['full_match']
+        # The gaps plan_template_units rewrites, within the element's text
+        inner_start = full_match.index('>') + 1
+        inner_end = len(full_match) - len(element['tag']) - 3
+        spans = self.find_template_spans(full_match)
+        span_starts = [span_start for span_start, _ in spans]
+        texts = []
+        for gap_start, gap_end in self._untemplated_gaps(spans, span_starts, inner_start, inner_end):
+            texts.extend(self.wrapped_texts(full_match[gap_start:gap_end]))
+        return list(dict.fromkeys(texts))
+    
+    def search_untemplated(self, content: str) -> Dict:
+        """Search for elements without templates"""
+        start_time = time.time()
+        
+        # Find elements with Korean text
+        error = None
+        try:
+            elements = self.find_tsx_elements_with_korean(content)
+        except ScanBudgetExceeded as e:
+            elements = e.elements
+            error = str(e)
+        
+        # Filter out already templated elements (not those apply still rewrites)
+        untemplated_elements = []
+        line_index = LineIndex(content) if elements else None
+        for element in elements:
+            if self.has_any_template(element['full_match']):
+                texts = self.untemplated_texts(element)
+                if not texts:
+                    continue
+                element['korean_texts'] = texts
+                element['partially_templated'] = True
+            untemplated_elements.append(line_index.annotate(element))
+        
+        duration = time.time() - start_time
+        
+        result = {
+            'success': error is None,
+            'count': len(untemplated_elements),
+            'elements': untemplated_elements,
+            'duration': duration,
+            'message': f'Found {len(untemplated_elements)} untemplated Korean elements'
+        }
+        if error is not None:
+            # Partial result: what was found before the scan was aborted
+            result['partial'] = True
+            result['error'] = error
+            result['message'] += ' before the scan was aborted'
+        return result
+    
+    def find_template_spans(self, content: str) -> List[Tuple[int, int]]:
+        """Sorted (start, end) spans of existing templates, W# placeholders included"""
+        spans = []
+        bt = self.bt_span_pattern.search(content)
+        bvt = self.bvt_span_pattern.search(content)
+        while bt is not None or bvt is not None:
+            match = bt if bvt is None or (bt is not None and bt.start() < bvt.start()) else bvt
+            spans.append(match.span())
+            # Templates do not nest: search again past the one just taken
+            if bt is not None and bt.start() < match.end():
+                bt = self.bt_span_pattern.search(content, match.end())
+            if bvt is not None and bvt.start() < match.end():
+                bvt = self.bvt_span_pattern.search(content, match.end())
+        return spans
+    
+    @staticmethod
+    def _untemplated_gaps(spans: List[Tuple[int, int]], span_starts: List[int],
+                          start: int, end: int):
+        """Yield the (start, end) parts of a range not covered by template spans"""
+        index = max(0, bisect_right(span_starts, start) - 1)
+        position = start
+        while index < len(spans) and spans[index][0] < end:
+            span_start, span_end = spans[index]
+            if span_end > position:
+                if span_start > position:
+                    yield position, span_start
+                position = span_end
+            index += 1
+        if position < end:
+            yield position, end
+    
+    @staticmethod
+    def _overlaps(spans: List[Tuple[int, int]], span_starts: List[int], start: int, end: int) -> bool:
+        """Whether a range overlaps any of the sorted, non-overlapping spans"""
+        index = bisect_right(span_starts, start) - 1
+        if index >= 0 and spans[index][1] > start:
+            return True
+        return index + 1 < len(spans) and spans[index + 1][0] < end
+    
+    def _text_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Spans of the text to wrap in a gap, in order
+        
+        Every block of script runs joined by single spaces is wrapped whole,
+        so a phrase keeps one key (`상품 목록: 총 개수` has two). The text
+        detect_korean_text reports is always one of these blocks.
+        """
+        # The memoized detect answers most texts without a scan
+        if not self.detect_korean_text(text):
+            return []
+        return [match.span() for match in self.block_pattern.finditer(text)]
+    
+    def wrapped_texts(self, text: str) -> List[str]:
+        """Distinct texts apply wraps in a piece of element text, in order"""
+        return list(dict.fromkeys(text[start:end] for start, end in self._text_spans(text)))
+    
+    def plan_template_edits(self, content: str) -> Tuple[List[Tuple[int, int, str]], int]:
+        """Compute the BT rewrite of content as sorted, non-overlapping edits
+        
+        Existing templates are collected once as intervals, and only the gaps
+        between them are rewritten, so partially templated elements get their
+        remaining text wrapped and nothing is ever wrapped twice. Applying the
+        edits and planning again yields no edits (apply is idempotent).
+        
+        Returns:
+            ([(start, end, replacement), ...], number of elements and attributes rewritten)
+        
+        Raises ScanBudgetExceeded when planning takes more CPU time than
+        the scan budget.
+        """
+        units = self.plan_template_units(content)
+        edits = sorted(edit for _, unit_edits in units for edit in unit_edits)
+        return edits, len(units)
+    
+    def plan_template_units(self, content: str) -> List[Tuple[Tuple[int, int], List[Tuple[int, int, str]]]]:
+        """The plan of plan_template_edits, grouped by what is rewritten
+        
+        Returns one ((start, end), edits) unit per element whose text is
+        wrapped (the element's span) and per attribute rewritten (the
+        attribute's span), so a subset of the plan can be applied.
+        """
+        deadline = self.scan_deadline()
+        spans = self.find_template_spans(content)
+        span_starts = [span_start for span_start, _ in spans]
+        
+        units = []
+        inner_ranges = []
+        
+        # Text of simple JSX elements, outside existing templates
+        for match in self.simple_pattern.finditer(content):
+            if time.thread_time() > deadline:
+                raise ScanBudgetExceeded(self.scan_budget, match.start(), len(content))
+            inner_start, inner_end = match.span(3)
+            if inner_start < inner_end:
+                inner_ranges.append((inner_start, inner_end))
+            element_edits = []
+            for gap_start, gap_end in self._untemplated_gaps(spans, span_starts, inner_start, inner_end):
+                gap = content[gap_start:gap_end]
+                for text_start, text_end in self._text_spans(gap):
+                    korean_text = gap[text_start:text_end]
+                    element_edits.append((gap_start + text_start, gap_start + text_end,
+                                          f'{{bt("W#", "{korean_text}")}}'))
+            if element_edits:
+                units.append((match.span(), element_edits))
+        
+        # Attributes, unless they overlap a template or an element's text.
+        # A rejected match only advances the search by one character, so it
+        # cannot hide an attribute that starts inside it.
+        inner_starts = [inner_start for inner_start, _ in inner_ranges]
+        position = 0
+        while True:
+            match = self.attr_pattern.search(content, position)
+            if match is None:
+                break
+            if time.thread_time() > deadline:
+                raise ScanBudgetExceeded(self.scan_budget, match.start(), len(content))
+            attr_start, attr_end = match.span()
+            if self._overlaps(spans, span_starts, attr_start, attr_end) or \
+                    self._overlaps(inner_ranges, inner_starts, attr_start, attr_end):
+                position = attr_start + 1
+                continue
+            units.append(((attr_start, attr_end),
+                          [(attr_start, attr_end, f'{match.group(1)}={{bt("W#", "{match.group(2)}")}}')]))
+            position = attr_end
+        
+        return units
+    
+    @staticmethod
+    def iter_edited(content: str, edits: List[Tuple[int, int, str]]) -> Iterator[str]:
+        """Yield the rewritten content piece by piece: untouched slices and replacements"""
+        position = 0
+        for edit_start, edit_end, replacement in edits:
+            yield content[position:edit_start]
+            yield replacement
+            position = edit_end
+        yield content[position:]
+    
+    def apply_template(self, content: str, template_type: str = 'bt',
+                       plan: Optional[Tuple[List[Tuple[int, int, str]], int]] = None) -> Dict:
+        """Apply selected template to the content
+        
+        plan is a precomputed (edits, count) of plan_template_edits for the
+        content, e.g. the stored plan of a search session; without it the
+        content is planned here.
+        """
+        start_time = time.time()
+        
+        if template_type not in ['bt', 'bvt']:
+            return {
+                'success': False,
+                'error': 'Invalid template type. Must be "bt" or "bvt"'
+            }
+        
+        if template_type == 'bvt':
+            return {
+                'success': False,
+                'error': 'BVT Template is temporarily disabled. Only BT Template is available.'
+            }
+        
+        try:
+            edits, replacements_count = plan if plan is not None else self.plan_template_edits(content)
+            
+            # Build the output once from the untouched slices and the edits
+            updated_content = ''.join(self.iter_edited(content, edits))
+            
+            duration = time.time() - start_time
+            
+            return {
+                'success': True,
+                'updated_content': updated_content,
+                'replacements_count': replacements_count,
+                'duration': duration,
+                'message': f'Template applied successfully! {replacements_count} replacements in {duration:.2f}s'
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to apply template: {str(e)}'
+            }
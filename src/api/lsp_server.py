@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Language Server Protocol mode for the locale engine.
+
+Flags untemplated Korean strings as diagnostics while a TSX file is being
+edited and offers a quick fix that applies the BT template to one element.
+Documents are synced incrementally: each change updates an IncrementalScan,
+which rescans only the region around the edit, and diagnostics are
+published once a burst of changes has been read.
+
+Run over stdio (the editor starts the process):
+    python src/api/lsp_server.py --stdio
+"""
+
+import argparse
+import json
+import os
+import re
+import select
+import sys
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional
+
+from incremental import IncrementalScan
+from locale_service import LineIndex, LocaleService
+
+SERVER_NAME = 'locale-tool'
+DIAGNOSTIC_SOURCE = 'locale-tool'
+DIAGNOSTIC_CODE = 'untemplated'
+
+# LSP constants
+TEXT_DOCUMENT_SYNC_INCREMENTAL = 2
+SEVERITY_WARNING = 2
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+SERVER_NOT_INITIALIZED = -32002
+INTERNAL_ERROR = -32603
+
+_astral = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def utf16_length(text: str) -> int:
+    """Length of text in UTF-16 code units (LSP's default position encoding)"""
+    if text.isascii():
+        return len(text)
+    return len(text) + len(_astral.findall(text))
+
+
+def utf16_to_index(text: str, units: int) -> int:
+    """Index into text of a UTF-16 offset (clamped to the end of text)"""
+    if text.isascii() or not _astral.search(text):
+        return min(units, len(text))
+    count = 0
+    for index, char in enumerate(text):
+        if count >= units:
+            return index
+        count += 2 if ord(char) > 0xFFFF else 1
+    return len(text)
+
+
+class TextDocument:
+    """An open document: its text, version and incremental element scan"""
+
+    def __init__(self, uri: str, text: str, version: int, service: LocaleService):
+        self.uri = uri
+        self.version = version
+        self.scan = IncrementalScan(service, text)
+        self._line_index: Optional[LineIndex] = None
+        self._has_astral = False
+
+    @property
+    def text(self) -> str:
+        return self.scan.content
+
+    def line_index(self) -> LineIndex:
+        if self._line_index is None:
+            self._line_index = LineIndex(self.text)
+            # Without astral characters UTF-16 columns equal character columns
+            self._has_astral = bool(_astral.search(self.text))
+        return self._line_index
+
+    def _line_bounds(self, line: int):
+        starts = self.line_index().line_starts
+        end = starts[line + 1] - 1 if line + 1 < len(starts) else len(self.text)
+        return starts[line], end
+
+    def offset_at(self, position: Dict) -> int:
+        """Character offset of an LSP position"""
+        line = position['line']
+        if line >= len(self.line_index().line_starts):
+            return len(self.text)
+        line_start, line_end = self._line_bounds(line)
+        return line_start + utf16_to_index(self.text[line_start:line_end], position['character'])
+
+    def position_at(self, offset: int) -> Dict:
+        """LSP position of a character offset"""
+        line_starts = self.line_index().line_starts
+        line = bisect_right(line_starts, offset) - 1
+        line_start = line_starts[line]
+        if self._has_astral:
+            return {'line': line, 'character': utf16_length(self.text[line_start:offset])}
+        return {'line': line, 'character': offset - line_start}
+
+    def range_of(self, start: int, end: int) -> Dict:
+        return {'start': self.position_at(start), 'end': self.position_at(end)}
+
+    def apply_change(self, change: Dict):
+        """Apply one TextDocumentContentChangeEvent"""
+        if 'range' in change:
+            start = self.offset_at(change['range']['start'])
+            end = self.offset_at(change['range']['end'])
+            self.scan.edit(start, max(start, end), change['text'])
+        else:
+            self.scan.rescan(change['text'])
+        self._line_index = None
+
+
+class LanguageServer:
+    """LSP request and notification handlers; send() writes one message"""
+
+    def __init__(self, send: Callable[[Dict], None], service: Optional[LocaleService] = None):
+        self.send = send
+        self.service = service or LocaleService()
+        self.documents: Dict[str, TextDocument] = {}
+        self.pending: set = set()
+        self.initialized = False
+        self.shutdown_requested = False
+        self.exit_code: Optional[int] = None
+        self.handlers = {
+            'initialize': self.initialize,
+            'shutdown': self.shutdown,
+            'exit': self.exit,
+            'textDocument/didOpen': self.did_open,
+            'textDocument/didChange': self.did_change,
+            'textDocument/didClose': self.did_close,
+            'textDocument/codeAction': self.code_action
+        }
+
+    def handle(self, message: Dict):
+        """Dispatch one JSON-RPC message"""
+        method = message.get('method')
+        is_request = 'id' in message
+        if method is None:
+            # Responses to server requests are not used
+            return
+
+        handler = self.handlers.get(method)
+        if handler is None:
+            if is_request:
+                self._error(message['id'], METHOD_NOT_FOUND, f'Unhandled method {method}')
+            return
+        if not self.initialized and method not in ('initialize', 'exit'):
+            if is_request:
+                self._error(message['id'], SERVER_NOT_INITIALIZED, 'Server not initialized')
+            return
+        if self.shutdown_requested and method != 'exit':
+            if is_request:
+                self._error(message['id'], INVALID_REQUEST, 'Server is shutting down')
+            return
+
+        result = handler(message.get('params') or {})
+        if is_request:
+            self.send({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+
+    def _error(self, message_id, code: int, text: str):
+        self.send({'jsonrpc': '2.0', 'id': message_id, 'error': {'code': code, 'message': text}})
+
+    # Lifecycle
+
+    def initialize(self, params: Dict) -> Dict:
+        self.initialized = True
+        return {
+            'capabilities': {
+                'positionEncoding': 'utf-16',
+                'textDocumentSync': {'openClose': True, 'change': TEXT_DOCUMENT_SYNC_INCREMENTAL},
+                'codeActionProvider': {'codeActionKinds': ['quickfix']}
+            },
+            'serverInfo': {'name': SERVER_NAME}
+        }
+
+    def shutdown(self, params: Dict):
+        self.shutdown_requested = True
+        return None
+
+    def exit(self, params: Dict):
+        self.exit_code = 0 if self.shutdown_requested else 1
+
+    # Document sync
+
+    def did_open(self, params: Dict):
+        item = params['textDocument']
+        self.documents[item['uri']] = TextDocument(item['uri'], item['text'], item.get('version', 0), self.service)
+        self.pending.add(item['uri'])
+
+    def did_change(self, params: Dict):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return
+        for change in params['contentChanges']:
+            document.apply_change(change)
+        document.version = params['textDocument'].get('version', document.version)
+        self.pending.add(document.uri)
+
+    def did_close(self, params: Dict):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.pending.discard(uri)
+        self.send(self._notification('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []}))
+
+    # Diagnostics
+
+    def diagnostic(self, document: TextDocument, element: Dict) -> Dict:
+        return {
+            'range': document.range_of(element['start'], element['end']),
+            'severity': SEVERITY_WARNING,
+            'source': DIAGNOSTIC_SOURCE,
+            'code': DIAGNOSTIC_CODE,
+            'message': f"Untemplated Korean text: {', '.join(element['korean_texts'])}"
+        }
+
+    def publish_pending(self):
+        """Publish diagnostics of every document changed since the last call"""
+        for uri in sorted(self.pending):
+            document = self.documents.get(uri)
+            if document is None:
+                continue
+            self.send(self._notification('textDocument/publishDiagnostics', {
+                'uri': uri,
+                'version': document.version,
+                'diagnostics': [self.diagnostic(document, element) for element in document.scan.untemplated()]
+            }))
+        self.pending.clear()
+
+    @staticmethod
+    def _notification(method: str, params: Dict) -> Dict:
+        return {'jsonrpc': '2.0', 'method': method, 'params': params}
+
+    # Code actions
+
+    def code_action(self, params: Dict) -> List[Dict]:
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return []
+        start = document.offset_at(params['range']['start'])
+        end = document.offset_at(params['range']['end'])
+
+        actions = []
+        for element in document.scan.untemplated():
+            if element['start'] > end or element['end'] < start:
+                continue
+            edits, replacements_count = self.service.plan_template_edits(element['full_match'])
+            if not replacements_count:
+                continue
+            actions.append({
+                'title': f"Apply BT template to \"{', '.join(element['korean_texts'])}\"",
+                'kind': 'quickfix',
+                'diagnostics': [self.diagnostic(document, element)],
+                'isPreferred': True,
+                'edit': {'changes': {document.uri: [
+                    {
+                        'range': document.range_of(element['start'] + edit_start, element['start'] + edit_end),
+                        'newText': replacement
+                    }
+                    for edit_start, edit_end, replacement in edits
+                ]}}
+            })
+        return actions
+
+
+class MessageReader:
+    """Reads Content-Length framed JSON-RPC messages from a file descriptor"""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.buffer = bytearray()
+
+    def _take(self) -> Optional[Dict]:
+        header_end = self.buffer.find(b'\r\n\r\n')
+        if header_end < 0:
+            return None
+        length = None
+        for line in bytes(self.buffer[:header_end]).split(b'\r\n'):
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                length = int(value)
+        if length is None:
+            raise ValueError('Message without Content-Length header')
+        body_start = header_end + 4
+        if len(self.buffer) < body_start + length:
+            return None
+        body = bytes(self.buffer[body_start:body_start + length])
+        del self.buffer[:body_start + length]
+        return json.loads(body)
+
+    def read(self) -> Optional[Dict]:
+        """Next message, or None at end of input"""
+        while True:
+            message = self._take()
+            if message is not None:
+                return message
+            chunk = os.read(self.fd, 65536)
+            if not chunk:
+                return None
+            self.buffer.extend(chunk)
+
+    def has_pending(self) -> bool:
+        """Whether another message is buffered or waiting on the descriptor"""
+        if self.buffer.find(b'\r\n\r\n') >= 0:
+            return True
+        readable, _, _ = select.select([self.fd], [], [], 0)
+        return bool(readable)
+
+
+def write_message(stream, message: Dict):
+    body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    stream.write(b'Content-Length: %d\r\n\r\n' % len(body))
+    stream.write(body)
+    stream.flush()
+
+
+def run_stdio() -> int:
+    reader = MessageReader(sys.stdin.fileno())
+    output = sys.stdout.buffer
+    server = LanguageServer(lambda message: write_message(output, message))
+    while server.exit_code is None:
+        message = reader.read()
+        if message is None:
+            return 0 if server.shutdown_requested else 1
+        try:
+            server.handle(message)
+        except Exception as e:
+            print(f'{SERVER_NAME}: error handling {message.get("method")}: {e}', file=sys.stderr)
+            if 'id' in message:
+                server._error(message['id'], INTERNAL_ERROR, str(e))
+        # Keystroke bursts are applied first and diagnosed once
+        if server.pending and not reader.has_pending():
+            server.publish_pending()
+    return server.exit_code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Locale Tool - language server')
+    parser.add_argument('--stdio', action='store_true', help='Communicate over stdin/stdout (the default)')
+    parser.parse_args(argv)
+    return run_stdio()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
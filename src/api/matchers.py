@@ -0,0 +1,218 @@
+"""
+Linear-time matchers for the scan patterns that backtrack.
+
+Python's re engine tries a pattern at every candidate start and reads
+ahead from each one. For the element patterns that read-ahead is
+unbounded:
+
+* `<(\\w+)([^>]*?)>([^<]*)</\\1>` reads from every `<` up to the next `>`
+  and the next `<`, so minified input such as `<a<a<a...` without a `>`
+  costs one pass over the rest of the file per `<` (quadratic), and the
+  name group backtracks one character at a time on top of that (cubic).
+* `<(\\w+)([^>]*?)/>` and `\\{bvt\\(([^)]+)\\)\\}` do the same up to the
+  next `>` or `)`.
+
+The matchers below find exactly the matches of those patterns, but work
+from the delimiters that end a match: every start before a given `>` (or
+`)`) reads up to that same delimiter, so the starts between two
+delimiters share one fate and are decided together with str.find and
+str.rfind. Every character is read a bounded number of times.
+
+Matches duck-type re.Match (group, span, start, end), and the matchers
+support finditer, search and match with pos/endpos like compiled patterns,
+so they can be used wherever those were.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Tuple
+
+
+class SpanMatch:
+    """Minimal re.Match stand-in: the string and the span of each group"""
+
+    __slots__ = ('string', 'regs')
+
+    def __init__(self, string: str, regs: Tuple[Tuple[int, int], ...]):
+        self.string = string
+        self.regs = regs
+
+    def span(self, group: int = 0) -> Tuple[int, int]:
+        return self.regs[group]
+
+    def start(self, group: int = 0) -> int:
+        return self.regs[group][0]
+
+    def end(self, group: int = 0) -> int:
+        return self.regs[group][1]
+
+    def group(self, group: int = 0) -> str:
+        start, end = self.regs[group]
+        return self.string[start:end]
+
+    def groups(self) -> Tuple[str, ...]:
+        return tuple(self.group(index) for index in range(1, len(self.regs)))
+
+    def __repr__(self):
+        return f'<SpanMatch span={self.regs[0]} match={self.group()!r}>'
+
+
+class _Matcher(ABC):
+    """search/findall on top of a subclass's finditer and match"""
+
+    pattern = ''
+
+    @abstractmethod
+    def finditer(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[SpanMatch]:
+        """Matches in string[pos:endpos], leftmost first, without overlaps"""
+
+    @abstractmethod
+    def match(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Optional[SpanMatch]:
+        """The match starting exactly at pos, if any"""
+
+    def search(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Optional[SpanMatch]:
+        return next(self.finditer(string, pos, endpos), None)
+
+    def findall(self, string: str, pos: int = 0, endpos: Optional[int] = None):
+        return [match.group() for match in self.finditer(string, pos, endpos)]
+
+    @staticmethod
+    def _bounds(string: str, pos: int, endpos: Optional[int]) -> Tuple[int, int]:
+        length = len(string)
+        endpos = length if endpos is None else max(0, min(endpos, length))
+        return max(0, pos), endpos
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.pattern!r})'
+
+
+class SimpleElementMatcher(_Matcher):
+    """Matches of `<(\\w+)([^>]*?)>([^<]*)</\\1>` (an element without nested tags)
+
+    An element ends at a closing tag `</c>`. Its text runs back to the `>`
+    that follows the last `<` before the closing tag, and it starts at the
+    leftmost `<c` after the `>` before that `<`. The name group may be a
+    prefix of the opening tag's name (the pattern backtracks into it), so
+    `<c` is matched as a prefix too.
+    """
+
+    pattern = r'<(\w+)([^>]*?)>([^<]*)</\1>'
+    _closing = re.compile(r'</(\w+)>')
+
+    @staticmethod
+    def _build(string: str, start: int, name_length: int, attributes_end: int, closing: re.Match) -> SpanMatch:
+        name_end = start + 1 + name_length
+        return SpanMatch(string, (
+            (start, closing.end()),
+            (start + 1, name_end),
+            (name_end, attributes_end),
+            (attributes_end + 1, closing.start())
+        ))
+
+    def finditer(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        previous_end = pos
+        for closing in self._closing.finditer(string, pos, endpos):
+            text_end = closing.start()
+            last_lt = string.rfind('<', previous_end, text_end)
+            if last_lt < 0:
+                continue
+            attributes_end = string.find('>', last_lt, text_end)
+            if attributes_end < 0:
+                continue
+            name = closing.group(1)
+            earliest = max(string.rfind('>', previous_end, last_lt) + 1, previous_end)
+            start = string.find('<' + name, earliest, last_lt + 1 + len(name))
+            if start < 0:
+                continue
+            previous_end = closing.end()
+            yield self._build(string, start, len(name), attributes_end, closing)
+
+    def match(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Optional[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        if not string.startswith('<', pos, endpos):
+            return None
+        attributes_end = string.find('>', pos + 1, endpos)
+        if attributes_end < 0:
+            return None
+        text_end = string.find('<', attributes_end + 1, endpos)
+        if text_end < 0:
+            return None
+        closing = self._closing.match(string, text_end, endpos)
+        if closing is None or not string.startswith(closing.group(1), pos + 1, attributes_end):
+            return None
+        return self._build(string, pos, len(closing.group(1)), attributes_end, closing)
+
+
+class SelfClosingMatcher(_Matcher):
+    """Matches of `<(\\w+)([^>]*?)/>` (a self-closing tag)
+
+    A tag ends at `/>`, and its attributes cannot contain `>`, so it starts
+    at the leftmost `<name` after the `>` before that `/>`.
+    """
+
+    pattern = r'<(\w+)([^>]*?)/>'
+    _opening = re.compile(r'<(\w+)')
+
+    def finditer(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        position = pos
+        while True:
+            slash = string.find('/>', position, endpos)
+            if slash < 0:
+                return
+            earliest = max(string.rfind('>', position, slash) + 1, position)
+            opening = self._opening.search(string, earliest, slash)
+            position = slash + 2
+            if opening is not None:
+                yield SpanMatch(string, ((opening.start(), slash + 2), opening.span(1), (opening.end(), slash)))
+
+    def match(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Optional[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        opening = self._opening.match(string, pos, endpos)
+        if opening is None:
+            return None
+        end = string.find('>', opening.end(), endpos)
+        if end < 0 or string[end - 1] != '/':
+            return None
+        return SpanMatch(string, ((pos, end + 1), opening.span(1), (opening.end(), end - 1)))
+
+
+class TemplateCallMatcher(_Matcher):
+    """Matches of `\\{name\\(([^)]*)\\)\\}` (`+` instead of `*` when nonempty)
+
+    A call reads up to the first `)` after its opening; when that is not
+    followed by `}`, no opening before it can match either.
+    """
+
+    def __init__(self, name: str, nonempty: bool = False):
+        self.opening = '{' + name + '('
+        self.min_length = 1 if nonempty else 0
+        self.pattern = r'\{' + re.escape(name) + r'\(([^)]' + ('+' if nonempty else '*') + r')\)\}'
+
+    def finditer(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        position = pos
+        while True:
+            start = string.find(self.opening, position, endpos)
+            if start < 0:
+                return
+            value_start = start + len(self.opening)
+            close = string.find(')', value_start, endpos)
+            if close < 0:
+                return
+            if close - value_start >= self.min_length and string.startswith(')}', close, endpos):
+                yield SpanMatch(string, ((start, close + 2), (value_start, close)))
+                position = close + 2
+            else:
+                position = close + 1
+
+    def match(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Optional[SpanMatch]:
+        pos, endpos = self._bounds(string, pos, endpos)
+        if not string.startswith(self.opening, pos, endpos):
+            return None
+        value_start = pos + len(self.opening)
+        close = string.find(')', value_start, endpos)
+        if close - value_start < self.min_length or not string.startswith(')}', close, endpos):
+            return None
+        return SpanMatch(string, ((pos, close + 2), (value_start, close)))
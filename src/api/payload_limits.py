@@ -0,0 +1,166 @@
+"""
+Request payload limits and spooled uploads for the Flask API.
+
+Oversized requests are rejected from their Content-Length header before
+any of the body is read; bodies sent without one (chunked) are cut off with
+a 413 as soon as reading them passes the same limit. Small interactive endpoints (`/content`) get a
+tight limit, file upload endpoints a larger one, and uploads above the
+spool threshold are written to a temporary file instead of being held in
+worker memory.
+"""
+
+import codecs
+import io
+import os
+import tempfile
+
+from flask import Request, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+MB = 1024 * 1024
+
+# Hard limit for any request, enforced by Flask/Werkzeug while reading the body
+MAX_CONTENT_LENGTH = int(os.environ.get('LOCALE_TOOL_MAX_CONTENT_LENGTH', 100 * MB))
+
+# Uploaded files larger than this are spooled to disk
+UPLOAD_SPOOL_THRESHOLD = int(os.environ.get('LOCALE_TOOL_UPLOAD_SPOOL_THRESHOLD', 1 * MB))
+
+# Directory for spooled uploads (default: system temp directory)
+UPLOAD_SPOOL_DIR = os.environ.get('LOCALE_TOOL_UPLOAD_SPOOL_DIR') or None
+
+# Per-endpoint limits, checked against Content-Length before the body is read
+CONTENT_LIMIT = int(os.environ.get('LOCALE_TOOL_CONTENT_LIMIT', 2 * MB))
+UPLOAD_LIMIT = int(os.environ.get('LOCALE_TOOL_UPLOAD_LIMIT', 20 * MB))
+
+PAYLOAD_LIMITS = {
+    '/api/search/content': CONTENT_LIMIT,
+    '/api/apply/content': CONTENT_LIMIT,
+    '/api/file/': CONTENT_LIMIT,
+    '/api/search/': UPLOAD_LIMIT,
+    '/api/apply/': UPLOAD_LIMIT,
+    '/api/apply/zip': UPLOAD_LIMIT,
+    '/api/export/': UPLOAD_LIMIT,
+    '/api/jobs/': UPLOAD_LIMIT,
+}
+
+
+class SpoolingRequest(Request):
+    """Request that spools uploaded files to disk above a configurable size"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(
+            max_size=UPLOAD_SPOOL_THRESHOLD,
+            mode='rb+',
+            dir=UPLOAD_SPOOL_DIR
+        )
+
+
+class CappedStream:
+    """WSGI input wrapper that fails with a 413 once a body passes its limit
+
+    For bodies without a Content-Length. Werkzeug's own max_content_length
+    check stops reading at the limit, so a single read of an oversized body
+    would silently return a truncated prefix; reading one byte past the
+    limit tells the two apart.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.total = 0
+
+    def _count(self, data):
+        self.total += len(data)
+        if self.total > self.limit:
+            raise RequestEntityTooLarge(f'Payload exceeds the {self.limit} byte limit for this endpoint')
+        return data
+
+    def read(self, size=-1):
+        allowed = self.limit + 1 - self.total
+        if size is None or size < 0 or size > allowed:
+            size = allowed
+        return self._count(self.stream.read(size))
+
+    def readline(self, size=-1):
+        allowed = self.limit + 1 - self.total
+        if size is None or size < 0 or size > allowed:
+            size = allowed
+        return self._count(self.stream.readline(size))
+
+
+def payload_limit_for(path: str):
+    """Return the configured limit for a request path, or None for the global limit"""
+    return PAYLOAD_LIMITS.get(path) or PAYLOAD_LIMITS.get(path.rstrip('/') + '/')
+
+
+def reject_oversized_payload():
+    """before_request hook: reject from the Content-Length header without buffering the body"""
+    limit = payload_limit_for(request.path)
+    if limit is None:
+        return None
+    if request.content_length is None:
+        # No Content-Length (chunked): enforce the limit while the body is read
+        request.environ['wsgi.input'] = CappedStream(request.environ['wsgi.input'], limit)
+        return None
+
+    if request.content_length > limit:
+        response = jsonify({
+            'success': False,
+            'error': f'Payload too large: {request.content_length} bytes exceeds the {limit} byte limit for this endpoint'
+        })
+        response.status_code = 413
+        # The body is not read, so the connection cannot be reused
+        response.headers['Connection'] = 'close'
+        return response
+    return None
+
+
+def read_upload_text(uploaded_file) -> str:
+    """Decode an uploaded (possibly spooled) file straight from its stream
+
+    Decoding through a text wrapper avoids holding the full bytes payload
+    alongside the decoded string. The stream is rewound afterwards.
+    """
+    stream = uploaded_file.stream
+    stream.seek(0)
+    try:
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    except (AttributeError, io.UnsupportedOperation):
+        # Streams that are not full io objects (older SpooledTemporaryFile)
+        content = stream.read().decode('utf-8')
+        stream.seek(0)
+        return content
+
+    try:
+        return text_stream.read()
+    finally:
+        text_stream.detach()
+        stream.seek(0)
+
+
+def check_upload_text(uploaded_file, chunk_size: int = 64 * 1024):
+    """Raise UnicodeDecodeError unless an upload is valid UTF-8, without keeping its text
+
+    For endpoints that decode uploads lazily while streaming their response:
+    checking them all first turns a bad upload into a 400 instead of a
+    truncated download. The stream is rewound afterwards.
+    """
+    stream = uploaded_file.stream
+    stream.seek(0)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    finally:
+        stream.seek(0)
+
+
+def init_payload_limits(app):
+    """Install payload limits and spooled uploads on the Flask app"""
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    app.request_class = SpoolingRequest
+    app.before_request(reject_oversized_payload)
@@ -0,0 +1,190 @@
+"""
+Opt-in profiling of single requests.
+
+An operator sends the admin token in the `X-Profile-Token` header and that
+one request runs under cProfile, with a sampling thread recording its call
+stacks. The profile is stored as a pstats dump and as collapsed stacks
+(the input format of flamegraph.pl and speedscope), tagged with a hash of
+the uploaded file so a slow file can be reproduced.
+
+Profiling is only installed when LOCALE_TOOL_PROFILE_TOKEN is set; without
+it no hook is registered and requests pay nothing.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+from flask import g, jsonify, request, send_file
+
+PROFILE_TOKEN = os.environ.get('LOCALE_TOOL_PROFILE_TOKEN', '')
+PROFILE_DIR = os.environ.get(
+    'LOCALE_TOOL_PROFILE_DIR',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'profiles')
+)
+# Number of stored profiles kept, oldest are deleted first
+PROFILE_KEEP = int(os.environ.get('LOCALE_TOOL_PROFILE_KEEP', 50))
+# Stack sampling interval in seconds
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('LOCALE_TOOL_PROFILE_SAMPLE_INTERVAL', 0.001))
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_FORMATS = {
+    'pstats': ('.pstats', 'application/octet-stream'),
+    'collapsed': ('.collapsed', 'text/plain'),
+    'meta': ('.json', 'application/json'),
+}
+
+PROFILE_ID_PATTERN = re.compile(r'^\d+-[0-9a-f]{12}-[0-9a-f]{8}$')
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread into collapsed-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        super().__init__(name='locale-profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.counts.most_common())
+
+
+def _authorized(token: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN and token) and hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+def request_hash() -> str:
+    """SHA-256 of the uploaded files, or of the raw body for JSON requests"""
+    digest = hashlib.sha256()
+    if request.files:
+        for field in sorted(request.files):
+            for uploaded_file in request.files.getlist(field):
+                stream = uploaded_file.stream
+                stream.seek(0)
+                for chunk in iter(lambda: stream.read(64 * 1024), b''):
+                    digest.update(chunk)
+                stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def start_profile():
+    """before_request hook: profile this request if the admin token is present"""
+    if not _authorized(request.headers.get(PROFILE_HEADER)):
+        return None
+
+    sampler = StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+    g.profile = (profiler, sampler, time.time())
+    sampler.start()
+    profiler.enable()
+    return None
+
+
+def finish_profile(response):
+    """after_request hook: stop profiling and store the profile"""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+
+    profiler, sampler, start_time = profile
+    profiler.disable()
+    sampler.stop()
+
+    file_hash = request_hash()
+    profile_id = f'{int(start_time)}-{file_hash[:12]}-{uuid.uuid4().hex[:8]}'
+    meta = {
+        'profile_id': profile_id,
+        'method': request.method,
+        'path': request.path,
+        'file_hash': file_hash,
+        'status_code': response.status_code,
+        'duration': time.time() - start_time,
+        'samples': sum(sampler.counts.values()),
+        'created_at': start_time
+    }
+    save_profile(profile_id, profiler, sampler.collapsed(), meta)
+
+    response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+def save_profile(profile_id: str, profiler: cProfile.Profile, collapsed: str, meta: Dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, profile_id)
+    profiler.dump_stats(base + '.pstats')
+    with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+        f.write(collapsed)
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    prune_profiles()
+
+
+def prune_profiles(keep: int = PROFILE_KEEP):
+    """Delete the oldest stored profiles beyond the retention count"""
+    profile_ids = sorted(
+        name[:-len('.json')] for name in os.listdir(PROFILE_DIR)
+        if name.endswith('.json') and PROFILE_ID_PATTERN.match(name[:-len('.json')])
+    )
+    for profile_id in profile_ids[:max(0, len(profile_ids) - keep)]:
+        for extension, _ in PROFILE_FORMATS.values():
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + extension))
+            except OSError:
+                pass
+
+
+def download_profile(profile_id):
+    """Admin-gated download of a stored profile (?format=pstats|collapsed|meta)"""
+    if not _authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({'success': False, 'error': 'Profiling token required'}), 403
+
+    fmt = request.args.get('format', 'collapsed')
+    if fmt not in PROFILE_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid format. Must be one of: {", ".join(PROFILE_FORMATS)}'
+        }), 400
+
+    extension, mimetype = PROFILE_FORMATS[fmt]
+    path = os.path.join(PROFILE_DIR, profile_id + extension)
+    if not PROFILE_ID_PATTERN.match(profile_id) or not os.path.exists(path):
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return send_file(path, mimetype=mimetype, as_attachment=fmt != 'meta',
+                     download_name=profile_id + extension)
+
+
+def init_profiling(app):
+    """Install the profiling hooks, only when a profiling token is configured"""
+    if not PROFILE_TOKEN:
+        return
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.add_url_rule('/api/profiles/<profile_id>', 'download_profile', download_profile)
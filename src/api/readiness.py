@@ -0,0 +1,272 @@
+"""
+Load-aware readiness for load balancers and autoscalers.
+
+`/api/health/` only says that the process is up. `/api/health/ready`
+reports the live load of the server and answers 503 once it is past
+configurable thresholds, so a load balancer sends new uploads to idle
+replicas and an autoscaler can scale on real pressure:
+
+* in-flight requests, and utilization: in-flight requests over the
+  request slots of the server (gunicorn workers x threads)
+* depth of the background job queue
+* p95 duration of the scans (search, apply, file and export requests)
+  finished within the last LOCALE_TOOL_READY_WINDOW seconds
+* memory headroom: the cgroup memory limit minus usage, or MemAvailable
+
+With sync workers a probe is only ever served by an idle worker, so the
+counters live in shared memory allocated when the app is imported: with
+gunicorn's preload (the default) all workers fork from that import and
+update the same counters. Without preloading every worker reports only
+its own requests.
+
+Every worker process counts in its own slot, keyed by its pid, and only
+it writes there, so counting takes no lock shared between processes: a
+worker killed mid-request cannot leave a lock held. Its leftover count
+stops counting once the process is gone, and gunicorn's child_exit hook
+frees its slot for the next worker.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from flask import current_app, g, request
+
+# Thresholds past which the server reports "not ready" (0 disables one)
+READY_MAX_UTILIZATION = float(os.environ.get('LOCALE_TOOL_READY_MAX_UTILIZATION', 1.0))
+READY_MAX_QUEUE_DEPTH = int(os.environ.get('LOCALE_TOOL_READY_MAX_QUEUE_DEPTH', 8))
+READY_MAX_P95_SECONDS = float(os.environ.get('LOCALE_TOOL_READY_MAX_P95_SECONDS', 10))
+READY_MIN_MEMORY_MB = float(os.environ.get('LOCALE_TOOL_READY_MIN_MEMORY_MB', 64))
+# Scans considered for the p95: those finished within the window, at most READY_SAMPLES
+READY_WINDOW = float(os.environ.get('LOCALE_TOOL_READY_WINDOW', 60))
+READY_SAMPLES = 256
+# Worker processes that can count at once (a new worker reuses the slot of a dead one)
+READY_WORKER_SLOTS = int(os.environ.get('LOCALE_TOOL_READY_WORKER_SLOTS', 64))
+# Seconds a new worker waits for the slot table lock before claiming a slot without it
+SLOT_LOCK_TIMEOUT = 1.0
+
+MB = 1024 * 1024
+
+# Requests timed as scans
+SCAN_PATH_PREFIXES = ('/api/search/', '/api/apply/', '/api/file/', '/api/export/')
+# Probes are not load
+UNTRACKED_PATH_PREFIXES = ('/api/health/',)
+
+# Fields of a worker slot
+_PID = 0
+_IN_FLIGHT = 1
+_NEXT_SAMPLE = 2
+_SLOT_FIELDS = 3
+
+
+def memory_available() -> Optional[int]:
+    """Bytes of memory left before the cgroup limit (or MemAvailable), None if unknown"""
+    for limit_path, usage_path in (
+        ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'),
+        ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes'),
+    ):
+        try:
+            with open(limit_path) as f:
+                limit = f.read().strip()
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        # Unlimited cgroups report "max" (v2) or a huge number (v1)
+        if limit.isdigit() and int(limit) < 1 << 60:
+            return max(0, int(limit) - usage)
+        break
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with that pid exists (a zombie not yet reaped does)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class LoadMonitor:
+    """Request and scan-latency counters shared by forked worker processes"""
+
+    def __init__(self, samples: int = READY_SAMPLES, window: float = READY_WINDOW,
+                 slots: int = READY_WORKER_SLOTS):
+        self.window = window
+        self.samples = samples
+        self.capacity = multiprocessing.RawValue('q', 1)
+        # Per worker process: pid (0 when free), in-flight requests, next sample to overwrite
+        self.slots = multiprocessing.RawArray('q', slots * _SLOT_FIELDS)
+        # Scan samples, `samples` per slot
+        self.durations = multiprocessing.RawArray('d', slots * samples)
+        self.finished_at = multiprocessing.RawArray('d', slots * samples)
+        # Only taken to claim a slot, once per process
+        self.slot_lock = multiprocessing.Lock()
+        # Threads of one process share its slot
+        self.local_lock = threading.Lock()
+        self.slot_pid = 0
+        self.slot: Optional[int] = None
+
+    def set_capacity(self, slots: int):
+        """Number of requests the server handles at once (gunicorn workers x threads)"""
+        self.capacity.value = max(1, slots)
+
+    def _own_slot(self) -> Optional[int]:
+        """Offset of this process's slot, claimed on first use (None when all are taken)"""
+        pid = os.getpid()
+        if self.slot_pid != pid:
+            # A worker that died holding the lock delays this claim, never blocks it
+            locked = self.slot_lock.acquire(timeout=SLOT_LOCK_TIMEOUT)
+            try:
+                self.slot = self._claim(pid)
+            finally:
+                if locked:
+                    self.slot_lock.release()
+            self.slot_pid = pid
+        return self.slot
+
+    def _claim(self, pid: int) -> Optional[int]:
+        free = None
+        for offset in range(0, len(self.slots), _SLOT_FIELDS):
+            owner = self.slots[offset + _PID]
+            if owner == pid:
+                return offset
+            if free is None and (owner == 0 or not pid_alive(owner)):
+                free = offset
+        if free is not None:
+            self.slots[free + _IN_FLIGHT] = 0
+            self.slots[free + _PID] = pid
+        return free
+
+    def request_started(self):
+        with self.local_lock:
+            slot = self._own_slot()
+            if slot is not None:
+                self.slots[slot + _IN_FLIGHT] += 1
+
+    def request_finished(self, scan_duration: Optional[float] = None):
+        with self.local_lock:
+            slot = self._own_slot()
+            if slot is None:
+                return
+            self.slots[slot + _IN_FLIGHT] = max(0, self.slots[slot + _IN_FLIGHT] - 1)
+            if scan_duration is not None:
+                index = self.slots[slot + _NEXT_SAMPLE]
+                sample = slot // _SLOT_FIELDS * self.samples + index
+                self.durations[sample] = scan_duration
+                self.finished_at[sample] = time.time()
+                self.slots[slot + _NEXT_SAMPLE] = (index + 1) % self.samples
+
+    def release_worker(self, pid: int) -> bool:
+        """Free the slot of a worker that exited (gunicorn child_exit), dropping its count"""
+        for offset in range(0, len(self.slots), _SLOT_FIELDS):
+            if self.slots[offset + _PID] == pid:
+                self.slots[offset + _IN_FLIGHT] = 0
+                self.slots[offset + _PID] = 0
+                return True
+        return False
+
+    def release_dead_workers(self) -> int:
+        """Free the slots of workers that are gone, returning the number freed"""
+        dead = [self.slots[offset + _PID] for offset in range(0, len(self.slots), _SLOT_FIELDS)
+                if self.slots[offset + _PID] and not pid_alive(self.slots[offset + _PID])]
+        return sum(self.release_worker(pid) for pid in dead)
+
+    def in_flight(self) -> int:
+        """Requests in flight in the worker processes that are alive"""
+        total = 0
+        for offset in range(0, len(self.slots), _SLOT_FIELDS):
+            owner = self.slots[offset + _PID]
+            if owner and pid_alive(owner):
+                total += self.slots[offset + _IN_FLIGHT]
+        return total
+
+    def recent_scans(self) -> List[float]:
+        """Durations of the scans finished within the window (those of dead workers too)"""
+        since = time.time() - self.window
+        return [duration for duration, finished_at in zip(self.durations, self.finished_at)
+                if finished_at and finished_at >= since]
+
+    def snapshot(self, queue_depth: int = 0, jobs_running: int = 0, job_workers: int = 0) -> Dict:
+        """Current load signals"""
+        in_flight = self.in_flight()
+        capacity = self.capacity.value
+        scans = self.recent_scans()
+        return {
+            'in_flight': in_flight,
+            'capacity': capacity,
+            'utilization': round(in_flight / capacity, 3),
+            'queue_depth': queue_depth,
+            'jobs_running': jobs_running,
+            'job_workers': job_workers,
+            'recent_scans': len(scans),
+            'p95_scan_seconds': round(percentile(scans, 0.95), 3) if scans else None,
+            'memory_available_bytes': memory_available()
+        }
+
+
+def readiness(snapshot: Dict, max_utilization: float = READY_MAX_UTILIZATION,
+              max_queue_depth: int = READY_MAX_QUEUE_DEPTH, max_p95_seconds: float = READY_MAX_P95_SECONDS,
+              min_memory_mb: float = READY_MIN_MEMORY_MB) -> Dict:
+    """The snapshot with 'ready' and the 'reasons' it is not, checked against the thresholds"""
+    reasons = []
+    if max_utilization and snapshot['utilization'] >= max_utilization:
+        reasons.append(f"utilization {snapshot['utilization']:g} >= {max_utilization:g}")
+    if max_queue_depth and snapshot['queue_depth'] >= max_queue_depth:
+        reasons.append(f"job queue depth {snapshot['queue_depth']} >= {max_queue_depth}")
+    p95 = snapshot['p95_scan_seconds']
+    if max_p95_seconds and p95 is not None and p95 >= max_p95_seconds:
+        reasons.append(f'p95 scan latency {p95:g}s >= {max_p95_seconds:g}s')
+    memory = snapshot['memory_available_bytes']
+    if min_memory_mb and memory is not None and memory < min_memory_mb * MB:
+        reasons.append(f'memory headroom {memory / MB:.0f} MB < {min_memory_mb:g} MB')
+    return dict(snapshot, ready=not reasons, reasons=reasons, thresholds={
+        'max_utilization': max_utilization,
+        'max_queue_depth': max_queue_depth,
+        'max_p95_seconds': max_p95_seconds,
+        'min_memory_mb': min_memory_mb
+    })
+
+
+def track_request():
+    """before_request hook: count the request as in flight"""
+    if request.path.startswith(UNTRACKED_PATH_PREFIXES):
+        return
+    g.load_monitor = current_app.extensions['load_monitor']
+    g.load_started = time.perf_counter()
+    g.load_monitor.request_started()
+
+
+def untrack_request(exc):
+    """teardown_request hook: count the request as finished and time scans"""
+    started = g.pop('load_started', None)
+    if started is None:
+        return
+    scan = request.path.startswith(SCAN_PATH_PREFIXES) and exc is None
+    g.pop('load_monitor').request_finished(time.perf_counter() - started if scan else None)
+
+
+def init_readiness(app, monitor: LoadMonitor):
+    """Count in-flight requests and time scans for the readiness endpoint"""
+    app.extensions['load_monitor'] = monitor
+    app.before_request(track_request)
+    app.teardown_request(untrack_request)
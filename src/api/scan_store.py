@@ -0,0 +1,257 @@
+"""
+Persistent store of search and apply results.
+
+Every scan run through the API or the CLI is written to a local SQLite
+database, indexed by file path, content hash, tag and Korean text, so
+questions such as "which files use this string" or "how did the untemplated
+count change over time" are answered with an indexed query instead of a
+rescan. Each scan is written in a single transaction.
+
+The store keeps STORE_MAX_AGE seconds and at most STORE_MAX_SCANS scans of
+history; older scans are pruned by the writers themselves, at most once per
+PRUNE_INTERVAL, so the database stays bounded without a separate janitor.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+STORE_PATH = os.environ.get(
+    'LOCALE_TOOL_STORE_PATH',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'scans.db')
+)
+# Set LOCALE_TOOL_STORE=0 to stop recording scans
+STORE_ENABLED = os.environ.get('LOCALE_TOOL_STORE', '1') != '0'
+# History kept: scans older than STORE_MAX_AGE seconds or beyond the newest
+# STORE_MAX_SCANS are pruned (0 keeps them)
+STORE_MAX_AGE = int(os.environ.get('LOCALE_TOOL_STORE_MAX_AGE', 30 * 24 * 3600))
+STORE_MAX_SCANS = int(os.environ.get('LOCALE_TOOL_STORE_MAX_SCANS', 10000))
+# Seconds between two prunes by the same store
+PRUNE_INTERVAL = 3600
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS scans (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        source TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        files INTEGER NOT NULL,
+        untemplated_count INTEGER NOT NULL,
+        replacements_count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS file_scans (
+        id INTEGER PRIMARY KEY,
+        scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+        path TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        untemplated_count INTEGER NOT NULL,
+        replacements_count INTEGER NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS hits (
+        file_scan_id INTEGER NOT NULL REFERENCES file_scans (id) ON DELETE CASCADE,
+        tag TEXT NOT NULL,
+        korean_text TEXT NOT NULL,
+        line INTEGER,
+        column INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS latest_searches (
+        path TEXT PRIMARY KEY,
+        file_scan_id INTEGER NOT NULL REFERENCES file_scans (id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_scans_created ON scans (created_at);
+    CREATE INDEX IF NOT EXISTS idx_file_scans_scan ON file_scans (scan_id);
+    CREATE INDEX IF NOT EXISTS idx_file_scans_path ON file_scans (path, operation, id);
+    CREATE INDEX IF NOT EXISTS idx_file_scans_hash ON file_scans (content_hash);
+    CREATE INDEX IF NOT EXISTS idx_hits_text ON hits (korean_text);
+    CREATE INDEX IF NOT EXISTS idx_hits_tag ON hits (tag);
+    CREATE INDEX IF NOT EXISTS idx_hits_file_scan ON hits (file_scan_id);
+    CREATE INDEX IF NOT EXISTS idx_latest_searches_file_scan ON latest_searches (file_scan_id);
+'''
+
+# Fills latest_searches of a store written before the table existed
+BACKFILL_LATEST_SEARCHES = '''
+    INSERT OR IGNORE INTO latest_searches (path, file_scan_id)
+    SELECT path, MAX(id) FROM file_scans
+    WHERE operation = 'search' AND NOT EXISTS (SELECT 1 FROM latest_searches)
+    GROUP BY path
+'''
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def content_path(filename: Optional[str], content: str) -> str:
+    """Path a scan of content is filed under: its filename, or its content hash when anonymous"""
+    return filename or f'<content:{content_hash(content)}>'
+
+
+def search_record(path: str, content: str, result: Dict) -> Dict:
+    """Store record for one search_untemplated result"""
+    return {
+        'path': path,
+        'content_hash': content_hash(content),
+        'untemplated_count': result['count'],
+        'replacements_count': 0,
+        'elements': result['elements']
+    }
+
+
+def apply_record(path: str, input_hash: str, replacements_count: int) -> Dict:
+    """Store record for one applied file, identified by the hash of its input"""
+    return {
+        'path': path,
+        'content_hash': input_hash,
+        'untemplated_count': 0,
+        'replacements_count': replacements_count,
+        'elements': []
+    }
+
+
+class ScanStore:
+    """SQLite-backed history of scan results"""
+
+    def __init__(self, path: str = STORE_PATH, max_age: int = STORE_MAX_AGE,
+                 max_scans: int = STORE_MAX_SCANS):
+        self.path = path
+        self.max_age = max_age
+        self.max_scans = max_scans
+        self.pruned_at = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.executescript(SCHEMA)
+            conn.execute(BACKFILL_LATEST_SEARCHES)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the store safe to use
+        # from request threads, job threads and worker processes alike
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def record_scan(self, operation: str, records: Iterable[Dict], source: str = 'api') -> int:
+        """Write the records of one scan in a single transaction, returning the scan ID"""
+        records = list(records)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            scan_id = conn.execute(
+                'INSERT INTO scans (created_at, source, operation, files, untemplated_count, replacements_count) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (now, source, operation, len(records),
+                 sum(record['untemplated_count'] for record in records),
+                 sum(record['replacements_count'] for record in records))
+            ).lastrowid
+
+            hit_rows = []
+            for record in records:
+                file_scan_id = conn.execute(
+                    'INSERT INTO file_scans (scan_id, path, content_hash, operation, untemplated_count, '
+                    'replacements_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (scan_id, record['path'], record['content_hash'], operation,
+                     record['untemplated_count'], record['replacements_count'], now)
+                ).lastrowid
+                if operation == 'search':
+                    conn.execute(
+                        'INSERT INTO latest_searches (path, file_scan_id) VALUES (?, ?) '
+                        'ON CONFLICT (path) DO UPDATE SET file_scan_id = excluded.file_scan_id',
+                        (record['path'], file_scan_id)
+                    )
+                for element in record['elements']:
+                    for text in element['korean_texts']:
+                        hit_rows.append((file_scan_id, element['tag'], text,
+                                         element.get('line'), element.get('column')))
+            conn.executemany(
+                'INSERT INTO hits (file_scan_id, tag, korean_text, line, column) VALUES (?, ?, ?, ?, ?)',
+                hit_rows
+            )
+        if now - self.pruned_at >= PRUNE_INTERVAL:
+            self.prune(now)
+        return scan_id
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete the scans past max_age or beyond the newest max_scans, returning the number deleted
+
+        Their file scans, hits and latest-search entries go with them.
+        """
+        now = time.time() if now is None else now
+        self.pruned_at = now
+        removed = 0
+        with closing(self._connect()) as conn, conn:
+            if self.max_age > 0:
+                removed += conn.execute('DELETE FROM scans WHERE created_at < ?', (now - self.max_age,)).rowcount
+            if self.max_scans > 0:
+                removed += conn.execute(
+                    'DELETE FROM scans WHERE id <= (SELECT id FROM scans ORDER BY id DESC LIMIT 1 OFFSET ?)',
+                    (self.max_scans,)
+                ).rowcount
+        return removed
+
+    def files_using(self, text: str, tag: Optional[str] = None) -> List[Dict]:
+        """Files whose latest search contains an untemplated string"""
+        query = '''
+            SELECT f.path, f.content_hash, f.created_at, h.tag, h.line, h.column
+            FROM hits h
+            JOIN latest_searches l ON l.file_scan_id = h.file_scan_id
+            JOIN file_scans f ON f.id = h.file_scan_id
+            WHERE h.korean_text = ?
+        '''
+        params = [text]
+        if tag:
+            query += ' AND h.tag = ?'
+            params.append(tag)
+        query += ' ORDER BY f.path, h.line, h.column'
+
+        files: Dict[str, Dict] = {}
+        with closing(self._connect()) as conn:
+            for row in conn.execute(query, params):
+                file_entry = files.setdefault(row['path'], {
+                    'path': row['path'],
+                    'content_hash': row['content_hash'],
+                    'scanned_at': row['created_at'],
+                    'count': 0,
+                    'locations': []
+                })
+                file_entry['count'] += 1
+                file_entry['locations'].append({'tag': row['tag'], 'line': row['line'], 'column': row['column']})
+        return list(files.values())
+
+    def untemplated_trend(self, path: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Untemplated counts of the most recent searches, oldest first
+
+        Without a path each point is one scan (API request or CLI run);
+        with a path each point is one search of that file.
+        """
+        with closing(self._connect()) as conn:
+            if path is None:
+                rows = conn.execute(
+                    'SELECT id AS scan_id, created_at, source, files, untemplated_count FROM scans '
+                    "WHERE operation = 'search' ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT scan_id, created_at, content_hash, untemplated_count FROM file_scans '
+                    "WHERE path = ? AND operation = 'search' ORDER BY id DESC LIMIT ?", (path, limit)
+                ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def file_history(self, path: str, limit: int = 50) -> List[Dict]:
+        """Most recent searches and applies of one file, newest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT scan_id, operation, content_hash, untemplated_count, replacements_count, created_at '
+                'FROM file_scans WHERE path = ? ORDER BY id DESC LIMIT ?', (path, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def open_default_store() -> Optional[ScanStore]:
+    """The configured store, or None when recording is disabled"""
+    return ScanStore(STORE_PATH) if STORE_ENABLED else None
@@ -0,0 +1,122 @@
+"""
+Pluggable script detection backed by precomputed Unicode range tables.
+
+Each supported script is a table of codepoint ranges. The enabled scripts
+are merged into a single sorted, non-overlapping range table once, and
+compiled into one regex character class, so text is scanned in a single
+pass no matter how many scripts are enabled.
+"""
+
+import os
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Range = Tuple[int, int]
+
+SCRIPT_RANGES: Dict[str, Tuple[Range, ...]] = {
+    'hangul': (
+        (0x1100, 0x11FF),  # Hangul Jamo
+        (0x3131, 0x318E),  # Hangul Compatibility Jamo (ㄱ-ㅎ, ㅏ-ㅣ)
+        (0xA960, 0xA97F),  # Hangul Jamo Extended-A
+        (0xAC00, 0xD7A3),  # Hangul Syllables (가-힣)
+        (0xD7B0, 0xD7FF),  # Hangul Jamo Extended-B
+    ),
+    'kana': (
+        (0x3040, 0x309F),  # Hiragana
+        (0x30A0, 0x30FF),  # Katakana
+        (0x31F0, 0x31FF),  # Katakana Phonetic Extensions
+        (0xFF66, 0xFF9D),  # Halfwidth Katakana
+    ),
+    'han': (
+        (0x3400, 0x4DBF),  # CJK Unified Ideographs Extension A
+        (0x4E00, 0x9FFF),  # CJK Unified Ideographs
+        (0xF900, 0xFAFF),  # CJK Compatibility Ideographs
+        (0x20000, 0x2A6DF),  # CJK Unified Ideographs Extension B
+    ),
+    'thai': (
+        (0x0E00, 0x0E7F),  # Thai
+    ),
+}
+
+# Convenience aliases for locales
+SCRIPT_ALIASES = {
+    'ko': ('hangul',),
+    'ja': ('kana', 'han'),
+    'zh': ('han',),
+    'th': ('thai',),
+}
+
+DEFAULT_SCRIPTS = ('hangul',)
+
+
+def configured_scripts() -> Tuple[str, ...]:
+    """Scripts enabled through LOCALE_TOOL_SCRIPTS (comma separated), default: hangul"""
+    value = os.environ.get('LOCALE_TOOL_SCRIPTS', '')
+    names = [name.strip().lower() for name in value.split(',') if name.strip()]
+    return resolve_scripts(names) if names else DEFAULT_SCRIPTS
+
+
+def resolve_scripts(names: Iterable[str]) -> Tuple[str, ...]:
+    """Expand locale aliases and validate script names, preserving order"""
+    resolved: List[str] = []
+    for name in names:
+        for script in SCRIPT_ALIASES.get(name, (name,)):
+            if script not in SCRIPT_RANGES:
+                raise ValueError(
+                    f'Unknown script "{script}". Must be one of: '
+                    f'{", ".join(sorted(SCRIPT_RANGES) + sorted(SCRIPT_ALIASES))}'
+                )
+            if script not in resolved:
+                resolved.append(script)
+    return tuple(resolved)
+
+
+def merge_ranges(scripts: Sequence[str]) -> List[Range]:
+    """Merge the range tables of several scripts into sorted, non-overlapping ranges"""
+    ranges = sorted(r for script in scripts for r in SCRIPT_RANGES[script])
+    merged: List[Range] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_char_class(scripts: Sequence[str]) -> str:
+    """Regex character class matching any character of the given scripts"""
+    parts = []
+    for start, end in merge_ranges(scripts):
+        if start == end:
+            parts.append(re.escape(chr(start)))
+        else:
+            parts.append(f'{re.escape(chr(start))}-{re.escape(chr(end))}')
+    return '[' + ''.join(parts) + ']'
+
+
+class ScriptTable:
+    """Compiled detection table for a set of scripts"""
+
+    def __init__(self, scripts: Optional[Sequence[str]] = None):
+        self.scripts = resolve_scripts(scripts) if scripts else configured_scripts()
+        self.ranges = merge_ranges(self.scripts)
+        self.range_starts = [start for start, _ in self.ranges]
+        self.char_class = build_char_class(self.scripts)
+        # One combined pattern, whatever the number of scripts
+        self.pattern = re.compile(self.char_class + '+')
+
+    def contains(self, char: str) -> bool:
+        """Whether a single character belongs to one of the enabled scripts"""
+        codepoint = ord(char)
+        index = bisect_right(self.range_starts, codepoint) - 1
+        return index >= 0 and codepoint <= self.ranges[index][1]
+
+    def script_of(self, char: str) -> Optional[str]:
+        """Name of the enabled script a character belongs to, if any"""
+        codepoint = ord(char)
+        for script in self.scripts:
+            for start, end in SCRIPT_RANGES[script]:
+                if start <= codepoint <= end:
+                    return script
+        return None
@@ -0,0 +1,47 @@
+"""
+Fast JSON encoding for API responses.
+
+Search and apply results can hold thousands of element records. Instead of
+walking them field by field through Flask-RESTX `marshal_with`, responses
+are encoded in a single pass straight into the response body: with `orjson`
+when the optional package is installed, otherwise with the standard
+library's C encoder (compact separators, UTF-8 output, no key sorting).
+
+The Swagger models are still attached to the endpoints with
+`@ns.response(...)`, so the documentation is unchanged.
+"""
+
+import json
+
+from flask import make_response
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), check_circular=False)
+
+
+def encode_json(data) -> bytes:
+    """Encode a response payload to UTF-8 JSON bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Values orjson does not handle (e.g. integers over 64 bits)
+            pass
+    return _encoder.encode(data).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation for application/json using encode_json"""
+    response = make_response(encode_json(data), code)
+    response.mimetype = 'application/json'
+    response.headers.extend(headers or {})
+    return response
+
+
+def init_serialization(api):
+    """Use the fast encoder for every JSON response of the Flask-RESTX API"""
+    api.representation('application/json')(output_json)
@@ -0,0 +1,207 @@
+"""
+Search sessions: apply the plan computed by a search instead of rescanning.
+
+A search asked for a session returns a token tied to the SHA-256 of the
+scanned content and to the apply plan for it: the edits of every element
+text and attribute apply would rewrite, and which of them each reported
+element (by its `id`) stands for. Apply with the token and the same
+content executes the stored plan directly, optionally only for a subset of
+the reported elements, so a reviewed search can be applied selectively
+without a second scan. Sessions live on disk under SESSIONS_DIR, so any
+server process can use them, and expire after a TTL.
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from scan_store import content_hash
+
+SESSIONS_DIR = os.environ.get(
+    'LOCALE_TOOL_SESSIONS_DIR',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'sessions')
+)
+SESSION_TTL = int(os.environ.get('LOCALE_TOOL_SESSION_TTL', 3600))
+# Set LOCALE_TOOL_SESSIONS=0 to disable search sessions
+SESSIONS_ENABLED = os.environ.get('LOCALE_TOOL_SESSIONS', '1') != '0'
+
+SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+Unit = Tuple[Tuple[int, int], List[Tuple[int, int, str]]]
+
+
+class SessionNotFoundError(Exception):
+    """Raised when a session token is unknown or expired"""
+
+
+class SessionMismatchError(Exception):
+    """Raised when the content does not match the content a session was created for"""
+
+
+def parse_element_ids(value: Union[None, str, Sequence]) -> Optional[List[int]]:
+    """Element IDs from a comma-separated string or a list
+
+    None or a blank string means all elements, an empty list none.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    parts = value.split(',') if isinstance(value, str) else value
+    if not isinstance(parts, (list, tuple)):
+        raise ValueError('element_ids must be a list or a comma-separated string of element IDs')
+    ids = []
+    for part in parts:
+        if isinstance(part, str):
+            part = part.strip()
+            if not part:
+                continue
+            if not part.isdigit():
+                raise ValueError(f'Invalid element ID: {part!r}')
+            part = int(part)
+        if isinstance(part, bool) or not isinstance(part, int):
+            raise ValueError(f'Invalid element ID: {part!r}')
+        ids.append(part)
+    return ids
+
+
+def map_hits(elements: List[Dict], units: List[Unit]) -> List[List[int]]:
+    """Indexes of the plan units each search hit stands for, by hit number
+
+    A simple element stands for the unit of its text and an attribute for
+    its own unit (the same span: both come from the same pattern), and a
+    self-closing tag for the units of its attributes. A hit apply would
+    not rewrite stands for no unit.
+    """
+    by_span = {span: index for index, (span, _) in enumerate(units)}
+    order = sorted(range(len(units)), key=lambda index: units[index][0])
+    starts = [units[index][0][0] for index in order]
+    hits = []
+    for element in elements:
+        start, end = element['start'], element['end']
+        if 'is_self_closing' in element:
+            position = bisect_left(starts, start)
+            indexes = []
+            while position < len(order) and starts[position] < end:
+                if units[order[position]][0][1] <= end:
+                    indexes.append(order[position])
+                position += 1
+            hits.append(indexes)
+        else:
+            index = by_span.get((start, end))
+            hits.append([] if index is None else [index])
+    return hits
+
+
+def select_units(hits: List[List[int]], units: List,
+                 element_ids: Optional[Iterable[int]] = None) -> Tuple[List[Tuple[int, int, str]], int]:
+    """Sorted edits and count of the units of the selected hits (all units without IDs)"""
+    if element_ids is None:
+        chosen = units
+    else:
+        selected = set(element_ids)
+        unknown = sorted(i for i in selected if not 0 <= i < len(hits))
+        if unknown:
+            raise ValueError(f'Unknown element IDs: {", ".join(map(str, unknown))}')
+        chosen = [units[index] for index in sorted({index for i in selected for index in hits[i]})]
+    edits = sorted((start, end, replacement) for unit in chosen for start, end, replacement in unit[2])
+    return edits, len(chosen)
+
+
+class SessionStore:
+    """Search sessions as JSON files, one per token"""
+
+    def __init__(self, sessions_dir: str = SESSIONS_DIR, ttl: int = SESSION_TTL):
+        self.sessions_dir = sessions_dir
+        self.ttl = ttl
+        self.last_evicted = 0.0
+
+    def _path(self, token: str) -> str:
+        if not isinstance(token, str) or not SESSION_ID_PATTERN.match(token):
+            raise KeyError(token)
+        return os.path.join(self.sessions_dir, token + '.json')
+
+    def create(self, content: str, elements: List[Dict], units: List[Unit]) -> str:
+        """Store the plan of a search and return its session token"""
+        self._evict_periodically()
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        token = uuid.uuid4().hex
+        now = time.time()
+        session = {
+            'content_hash': content_hash(content),
+            'created_at': now,
+            'expires_at': now + self.ttl,
+            'hits': map_hits(elements, units),
+            'units': [[start, end, edits] for (start, end), edits in units]
+        }
+        path = self._path(token)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return token
+
+    def get(self, token: str) -> Optional[Dict]:
+        """Return a session, or None if it is unknown or expired"""
+        try:
+            with open(self._path(token), 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (KeyError, OSError, ValueError):
+            return None
+        if session['expires_at'] < time.time():
+            return None
+        return session
+
+    def plan(self, token: str, content: str,
+             element_ids: Optional[Iterable[int]] = None) -> Tuple[List[Tuple[int, int, str]], int]:
+        """The stored (edits, count) of a session for content, like plan_template_edits
+
+        Raises SessionNotFoundError, SessionMismatchError when content is not
+        the searched content, and ValueError for unknown element IDs.
+        """
+        session = self.get(token)
+        if session is None:
+            raise SessionNotFoundError(f'Unknown or expired session: {token}')
+        if session['content_hash'] != content_hash(content):
+            raise SessionMismatchError('Content does not match the searched content of the session')
+        return select_units(session['hits'], session['units'], element_ids)
+
+    # Eviction
+
+    def evict_expired(self) -> int:
+        """Remove expired sessions, returning the number removed"""
+        if not os.path.isdir(self.sessions_dir):
+            return 0
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.sessions_dir):
+            token, extension = os.path.splitext(name)
+            if extension not in ('.json', '.tmp') or not SESSION_ID_PATTERN.match(token.split('.')[0]):
+                continue
+            path = os.path.join(self.sessions_dir, name)
+            try:
+                # Sessions are never rewritten, so the file age is the session age
+                if os.path.getmtime(path) + self.ttl < now:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _evict_periodically(self):
+        # No janitor thread: creating a session sweeps at most every TTL / 10
+        now = time.time()
+        if now - self.last_evicted < max(1, min(60, self.ttl // 10)):
+            return
+        self.last_evicted = now
+        try:
+            self.evict_expired()
+        except OSError:
+            pass
+
+
+def open_default_store() -> Optional[SessionStore]:
+    """The session store configured by the environment, or None when disabled"""
+    return SessionStore() if SESSIONS_ENABLED else None
@@ -0,0 +1,234 @@
+"""
+Fuzzy suggestions of existing translations for untemplated strings.
+
+Untemplated strings are often near-duplicates of strings that already have
+an ID, e.g. "저장하기" and `bt("W1152", "저장 하기")`. Known strings are kept
+in a character n-gram inverted index:
+
+* Text is normalized the Hangul-aware way: NFKC composes jamo sequences
+  into syllables and folds compatibility forms, then spacing and
+  punctuation are dropped (Korean spacing is notoriously inconsistent).
+* Each syllable is one character, so a bigram covers two syllables and a
+  changed particle such as 을/를 only touches the bigrams around it.
+* Similarity is the Dice coefficient of the padded bigram sets. Candidates
+  are collected from the posting lists of the query's rarest bigrams only
+  (prefix filtering): an entry reaching the minimum score must share at
+  least one of them, so common bigrams such as "하기" are never walked.
+  Candidates sharing the most of them are scored first, and the scan
+  stops once no remaining candidate can beat the k-th best score.
+
+The catalog is loaded from LOCALE_TOOL_CATALOG_PATHS: TSX files or
+directories (existing `bt("Wnnn", ...)` templates) and JSON files mapping
+IDs to text.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from batch import EXISTING_ID_PATTERN, PLACEHOLDER_PATTERN, find_tsx_files
+
+CATALOG_PATHS = [
+    path for path in os.environ.get('LOCALE_TOOL_CATALOG_PATHS', '').split(os.pathsep) if path
+]
+# Suggestions per hit (0 disables suggestions)
+SUGGEST_LIMIT = int(os.environ.get('LOCALE_TOOL_SUGGEST_LIMIT', 3))
+SUGGEST_MIN_SCORE = float(os.environ.get('LOCALE_TOOL_SUGGEST_MIN_SCORE', 0.6))
+SUGGEST_CACHE_SIZE = 4096
+
+# Slack for the float bounds: an entry scoring exactly the minimum (or the
+# k-th best) score must not be lost to rounding, e.g. 3 * 1.4 / 0.6 < 7
+_EPSILON = 1e-9
+
+_separators = re.compile(r'[\W_]+')
+
+
+def normalize(text: str) -> str:
+    """Comparison form of a string: NFKC, lowercase, no spacing or punctuation"""
+    return _separators.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def ngrams(text: str) -> FrozenSet[str]:
+    """Padded character bigrams of the normalized text"""
+    normalized = normalize(text)
+    if not normalized:
+        return frozenset()
+    padded = f'\x02{normalized}\x03'
+    return frozenset(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+class SuggestionIndex:
+    """Inverted bigram index of known (ID, text) pairs"""
+
+    def __init__(self, min_score: float = SUGGEST_MIN_SCORE):
+        self.min_score = min_score
+        self.entries: List[Tuple[str, str]] = []
+        self.grams: List[FrozenSet[str]] = []
+        self.postings: Dict[str, array] = {}
+        self._known = set()
+        self._suggest_cached = lru_cache(maxsize=SUGGEST_CACHE_SIZE)(self._suggest)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, template_id: str, text: str) -> bool:
+        """Index one pair; duplicates and strings without letters are skipped"""
+        if (template_id, text) in self._known:
+            return False
+        grams = ngrams(text)
+        if not grams:
+            return False
+        self._known.add((template_id, text))
+        index = len(self.entries)
+        self.entries.append((template_id, text))
+        self.grams.append(grams)
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('i')
+            posting.append(index)
+        self._suggest_cached.cache_clear()
+        return True
+
+    def add_content(self, content: str) -> int:
+        """Index the existing bt("Wnnn", ...) templates of a file"""
+        return sum(self.add(f'W{num}', text) for num, text in EXISTING_ID_PATTERN.findall(content))
+
+    def add_catalog(self, catalog: Dict[str, str]) -> int:
+        """Index an {ID: text} translation catalog"""
+        return sum(self.add(str(template_id), text) for template_id, text in catalog.items()
+                   if isinstance(text, str))
+
+    def add_paths(self, paths: Iterable[str]) -> int:
+        """Index TSX files, directories of them and JSON catalogs; returns the files read"""
+        files = 0
+        for root in paths:
+            if root.endswith('.json') and os.path.isfile(root):
+                try:
+                    with open(root, 'r', encoding='utf-8') as f:
+                        catalog = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(catalog, dict):
+                    self.add_catalog(catalog)
+                    files += 1
+                continue
+            if not os.path.exists(root):
+                continue
+            for path in find_tsx_files(root):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self.add_content(f.read())
+                except (OSError, UnicodeDecodeError):
+                    continue
+                files += 1
+        return files
+
+    def suggest(self, text: str, limit: int = SUGGEST_LIMIT) -> List[Dict]:
+        """Most similar known entries, best first (memoized per string)"""
+        return [
+            {'id': self.entries[index][0], 'text': self.entries[index][1], 'score': score}
+            for score, index in self._suggest_cached(text, limit)
+        ]
+
+    def _suggest(self, text: str, limit: int) -> Tuple[Tuple[float, int], ...]:
+        query = ngrams(text)
+        size = len(query)
+        if not size or not limit:
+            return ()
+
+        # Dice >= t needs an overlap of at least size * t / (2 - t), and
+        # entry sizes within [size * t / (2 - t), size * (2 - t) / t]
+        t = self.min_score
+        min_overlap = max(1, math.ceil(size * t / (2 - t) - _EPSILON))
+
+        # An entry sharing min_overlap grams shares one of the rarest
+        # size - min_overlap + 1 of them; count how many each entry shares
+        prefix_size = size - min_overlap + 1
+        rarest = sorted(query, key=lambda gram: len(self.postings.get(gram, ())))
+        counts = Counter()
+        for gram in rarest[:prefix_size]:
+            counts.update(self.postings.get(gram, ()))
+
+        # Candidates sharing the most rare grams first; the best score an
+        # entry can reach only drops from there, so stop once it falls
+        # below the k-th best score found so far
+        remaining = size - prefix_size
+        threshold = t
+        entry_grams = self.grams
+        best: List[Tuple[float, int]] = []
+        for index, count in counts.most_common():
+            overlap_bound = count + remaining
+            if 2 * overlap_bound < threshold * (size + overlap_bound) - _EPSILON:
+                break
+            grams = entry_grams[index]
+            other = len(grams)
+            # Size filter, multiplied out: size * t / (2 - t) <= other <= size * (2 - t) / t
+            if other * (2 - t) < size * t - _EPSILON or other * t > size * (2 - t) + _EPSILON:
+                continue
+            if 2 * min(overlap_bound, other) < threshold * (size + other) - _EPSILON:
+                continue
+            overlap = len(query & grams)
+            if 2 * overlap < threshold * (size + other) - _EPSILON:
+                continue
+            score = 2 * overlap / (size + other)
+            heapq.heappush(best, (score, -index))
+            if len(best) > limit:
+                heapq.heappop(best)
+            if len(best) == limit:
+                threshold = max(t, best[0][0])
+        return tuple((round(score, 3), -negative) for score, negative in sorted(best, reverse=True))
+
+    @classmethod
+    def from_content(cls, content: str, min_score: float = SUGGEST_MIN_SCORE) -> 'SuggestionIndex':
+        index = cls(min_score)
+        index.add_content(content)
+        return index
+
+
+def load_catalog_index(paths: Optional[Sequence[str]] = None) -> SuggestionIndex:
+    """Index of the configured catalog (LOCALE_TOOL_CATALOG_PATHS)"""
+    index = SuggestionIndex()
+    index.add_paths(CATALOG_PATHS if paths is None else paths)
+    return index
+
+
+def suggest_texts(texts: Iterable[str], indexes: Sequence[SuggestionIndex],
+                  limit: int = SUGGEST_LIMIT) -> List[Dict]:
+    """Best suggestions for any of the texts across several indexes"""
+    best: Dict[Tuple[str, str], Dict] = {}
+    for text in texts:
+        for index in indexes:
+            for suggestion in index.suggest(text, limit):
+                key = (suggestion['id'], suggestion['text'])
+                if key not in best or best[key]['score'] < suggestion['score']:
+                    best[key] = suggestion
+    return sorted(best.values(), key=lambda s: (-s['score'], s['id']))[:limit]
+
+
+def add_element_suggestions(elements: List[Dict], indexes: Sequence[SuggestionIndex],
+                            limit: int = SUGGEST_LIMIT) -> List[Dict]:
+    """Attach 'suggestions' to every search hit"""
+    for element in elements:
+        element['suggestions'] = suggest_texts(element['korean_texts'], indexes, limit) if limit else []
+    return elements
+
+
+def placeholder_suggestions(updated_content: str, indexes: Sequence[SuggestionIndex],
+                            limit: int = SUGGEST_LIMIT) -> List[Dict]:
+    """Suggestions for the texts that apply wrapped in new W# placeholders"""
+    if not limit:
+        return []
+    result = []
+    for text in dict.fromkeys(PLACEHOLDER_PATTERN.findall(updated_content)):
+        suggestions = suggest_texts([text], indexes, limit)
+        if suggestions:
+            result.append({'text': text, 'suggestions': suggestions})
+    return result
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel batch apply pipeline
+"""
+
+import os
+import tempfile
+
+from batch import apply_batch, find_tsx_files
+
+FILES = {
+    'a/Header.tsx': '<div>\n  <h1>저장</h1>\n  <button>취소</button>\n</div>\n',
+    'b/Footer.tsx': '<div>\n  <span>{bt("W7", "확인")}</span>\n  <p>저장</p>\n</div>\n',
+    'c/Form.tsx': '<form>\n  <input placeholder="확인" />\n  <label>이름</label>\n</form>\n',
+}
+
+
+def make_tree(root):
+    for relative_path, content in FILES.items():
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def test_batch_apply_global_ids():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        paths = find_tsx_files(root)
+        serial = apply_batch(paths, workers=1, include_content=True)
+        parallel = apply_batch(list(reversed(paths)), workers=3, include_content=True)
+
+        # Output is independent of worker scheduling and input order
+        assert serial['files'] == parallel['files']
+
+        contents = {os.path.relpath(f['path'], root): f['updated_content'] for f in serial['files']}
+        # Same text gets the same ID across files, existing IDs are reused
+        assert 'bt("W8", "저장")' in contents['a/Header.tsx']
+        assert 'bt("W8", "저장")' in contents['b/Footer.tsx']
+        assert 'bt("W7", "확인")' in contents['c/Form.tsx']
+        assert 'W#' not in ''.join(contents.values())
+        assert serial['next_id'] == 11
+
+
+def test_batch_apply_write():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        result = apply_batch(find_tsx_files(root), workers=2, start_id=100, write=True)
+        assert result['success']
+
+        with open(os.path.join(root, 'a/Header.tsx'), encoding='utf-8') as f:
+            assert 'bt("W100", "저장")' in f.read()
+        assert os.path.exists(os.path.join(root, 'a/Header.tsx.backup'))
+
+
+if __name__ == "__main__":
+    test_batch_apply_global_ids()
+    test_batch_apply_write()
+    print("✅ Batch apply tests completed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the translation catalog export
+"""
+
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+
+from app import app
+from catalog_export import iter_catalog
+
+SOURCES = [
+    ('a.tsx', '<div><button>저장</button><span>취소</span></div>'),
+    ('b.tsx', '<div><button>저장</button><input placeholder="이름 & 주소" /></div>'),
+]
+
+
+def test_json_catalog_is_deduplicated():
+    catalog = json.loads(''.join(iter_catalog(iter(SOURCES), 'json')))
+    by_source = {entry['source']: entry for entry in catalog['strings']}
+
+    assert by_source['저장']['occurrences'] == 2
+    assert [loc['path'] for loc in by_source['저장']['locations']] == ['a.tsx', 'b.tsx']
+    assert [entry['source'] for entry in catalog['strings']][:2] == ['저장', '취소']
+
+
+def test_csv_and_xliff_catalogs():
+    rows = list(csv.reader(io.StringIO(''.join(iter_catalog(iter(SOURCES), 'csv')))))
+    assert rows[0] == ['id', 'source', 'occurrences', 'locations']
+    assert rows[1][1:3] == ['저장', '2']
+
+    root = ET.fromstring(''.join(iter_catalog(iter(SOURCES), 'xliff')).encode('utf-8'))
+    ns = {'x': 'urn:oasis:names:tc:xliff:document:1.2'}
+    sources = [el.text for el in root.findall('.//x:trans-unit/x:source', ns)]
+    assert '저장' in sources and len(sources) == len(set(sources))
+
+
+def test_export_endpoint_rejects_non_utf8_upload():
+    client = app.test_client()
+    response = client.post('/api/export/', data={
+        'files': [(io.BytesIO(SOURCES[0][1].encode('utf-8')), 'a.tsx'),
+                  (io.BytesIO('<p>저장</p>'.encode('cp949')), 'b.tsx')],
+        'format': 'json'
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert 'b.tsx' in response.get_json()['error']
+
+    response = client.post('/api/export/', data={
+        'files': [(io.BytesIO(source.encode('utf-8')), name) for name, source in SOURCES],
+        'format': 'json'
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert json.loads(response.data)['strings'][0]['source'] == '저장'
+
+
+if __name__ == "__main__":
+    test_json_catalog_is_deduplicated()
+    test_csv_and_xliff_catalogs()
+    test_export_endpoint_rejects_non_utf8_upload()
+    print("✅ Catalog export tests completed!")
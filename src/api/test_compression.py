@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for compressed request and response bodies
+"""
+
+import gzip
+import io
+import json
+
+from app import app
+
+CONTENT = '<div>\n' + '<span className="label">저장하기</span>\n' * 500 + '</div>\n'
+
+
+def test_gzip_request_and_response():
+    client = app.test_client()
+    body = gzip.compress(json.dumps({'content': CONTENT}).encode('utf-8'))
+    response = client.post(
+        '/api/search/content',
+        data=body,
+        headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip'}
+    )
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))['count'] == 500
+
+
+def test_streamed_download_is_compressed():
+    client = app.test_client()
+    response = client.post(
+        '/api/apply/',
+        data={'file': (io.BytesIO(CONTENT.encode('utf-8')), 'page.tsx'), 'return_file': 'true'},
+        content_type='multipart/form-data',
+        headers={'Accept-Encoding': 'gzip'}
+    )
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.data).decode('utf-8').count('bt("W#"') == 500
+
+
+def test_decompressed_size_is_limited():
+    client = app.test_client()
+    bomb = gzip.compress(b'{"content": "' + b'a' * (5 * 1024 * 1024) + b'"}')
+    response = client.post(
+        '/api/search/content',
+        data=bomb,
+        headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    )
+    assert response.status_code == 413
+
+
+def test_malformed_compressed_body_is_a_bad_request():
+    response = app.test_client().post(
+        '/api/search/content',
+        data=b'\x1f\x8b\x08\x00not really gzip',
+        headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    )
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_gzip_request_and_response()
+    test_streamed_download_is_compressed()
+    test_decompressed_size_is_limited()
+    test_malformed_compressed_body_is_a_bad_request()
+    print("✅ Compression tests completed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the local scan daemon
+"""
+
+import os
+import threading
+
+import pytest
+
+import daemon
+from locale_service import LocaleService
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    socket_path = str(tmp_path / 'd.sock')
+    scan_daemon = daemon.ScanDaemon(LocaleService())
+    ready = threading.Event()
+    thread = threading.Thread(target=daemon.serve, args=(socket_path, 0, scan_daemon, ready), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield socket_path, scan_daemon
+    scan_daemon.stop_requested.set()
+    thread.join(5)
+
+
+def test_search_paths_and_content(running_daemon, tmp_path):
+    socket_path, _ = running_daemon
+    page = tmp_path / 'Page.tsx'
+    page.write_text('<div>\n  <h1>상품 목록</h1>\n  <p>{bt("W1", "확인")}</p>\n</div>', encoding='utf-8')
+
+    result = daemon.call('search', socket_path, autostart=False,
+                         paths=[str(page), str(tmp_path / 'missing.tsx')])
+    assert result['count'] == 1
+    assert result['files'][0]['elements'][0]['line'] == 2
+    assert result['errors'][0]['path'].endswith('missing.tsx')
+
+    result = daemon.call('search', socket_path, autostart=False, content='<span>저장</span>', path='buffer.tsx')
+    assert result['files'][0]['path'] == 'buffer.tsx'
+    assert result['count'] == 1
+
+
+def test_outdated_daemon_asks_for_restart(running_daemon):
+    socket_path, scan_daemon = running_daemon
+
+    response = daemon._send(socket_path, {'op': 'ping', 'version': 'outdated'})
+
+    assert response['restart'] is True
+    assert scan_daemon.stop_requested.is_set()
+
+
+def test_unknown_op_and_stopped_daemon(running_daemon):
+    socket_path, scan_daemon = running_daemon
+
+    with pytest.raises(daemon.DaemonError, match='Unknown op'):
+        daemon.call('explode', socket_path, autostart=False)
+
+    daemon.call('shutdown', socket_path, autostart=False)
+    scan_daemon.stop_requested.wait(5)
+    with pytest.raises(daemon.DaemonError):
+        daemon.call('ping', socket_path, autostart=False)
+
+
+def test_client_starts_daemon(tmp_path):
+    socket_path = str(tmp_path / 'd.sock')
+
+    status = daemon.call('ping', socket_path)
+
+    try:
+        assert status['pid'] != os.getpid()
+        assert status['version'] == daemon.engine_version()
+    finally:
+        daemon.call('shutdown', socket_path)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed file and zip downloads
+"""
+
+import io
+import zipfile
+
+from app import app
+from downloads import iter_encoded, iter_zip
+
+
+def test_iter_encoded_chunks_utf8():
+    parts = ['<p>', '안녕', '</p>'] * 10
+    chunks = list(iter_encoded(parts, chunk_size=16))
+    assert len(chunks) > 1
+    assert b''.join(chunks).decode('utf-8') == ''.join(parts)
+
+
+def test_iter_zip_streams_readable_archive():
+    chunks = list(iter_zip([
+        ('a.tsx', lambda: [b'<p>' * 5000, b'</p>']),
+        ('b.tsx', lambda: ['<b>확인</b>'.encode('utf-8')]),
+    ]))
+    assert len(chunks) > 2
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read('b.tsx').decode('utf-8') == '<b>확인</b>'
+
+
+def test_apply_download_is_streamed_without_temp_file():
+    response = app.test_client().post('/api/apply/', data={
+        'file': (io.BytesIO('<p>안녕</p>'.encode('utf-8')), 'Page.tsx'),
+        'return_file': 'true'
+    })
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename=processed_Page.tsx'
+    assert response.headers['X-Replacements-Count'] == '1'
+    assert response.get_data(as_text=True) == '<p>{bt("W#", "안녕")}</p>'
+
+
+def test_apply_zip_download():
+    response = app.test_client().post('/api/apply/zip', data={
+        'files': [
+            (io.BytesIO('<p>안녕</p>'.encode('utf-8')), 'Page.tsx'),
+            (io.BytesIO('<b>확인</b>'.encode('utf-8')), 'other/Page.tsx'),
+        ]
+    })
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert archive.namelist() == ['processed_Page.tsx', 'processed_Page_1.tsx']
+    assert archive.read('processed_Page_1.tsx').decode('utf-8') == '<b>{bt("W#", "확인")}</b>'
+
+
+def test_apply_zip_rejects_a_bad_file_before_streaming():
+    response = app.test_client().post('/api/apply/zip', data={
+        'files': [
+            (io.BytesIO('<p>안녕</p>'.encode('utf-8')), 'Page.tsx'),
+            (io.BytesIO('<b>확인</b>'.encode('euc-kr')), 'Legacy.tsx'),
+        ]
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'File must be UTF-8 encoded: Legacy.tsx'
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for git-aware incremental scanning
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+
+import cli
+from git_scan import changed_hunks, scan_changed
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+def write(repo, path, content):
+    full_path = os.path.join(repo, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_only_changed_hunks_are_reported():
+    with tempfile.TemporaryDirectory() as repo:
+        git(repo, 'init', '-q')
+        git(repo, 'config', 'user.email', 'test@example.com')
+        git(repo, 'config', 'user.name', 'test')
+        write(repo, 'src/Page.tsx', '<div>\n  <p>기존</p>\n</div>\n')
+        write(repo, 'src/Other.tsx', '<div>\n  <p>다른</p>\n</div>\n')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'base')
+
+        write(repo, 'src/Page.tsx', '<div>\n  <p>기존</p>\n  <span>새로운</span>\n</div>\n')
+        write(repo, 'src/new.tsx', '<b>추가</b>\n')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'change')
+
+        assert changed_hunks('HEAD~1', repo, 'HEAD') == {'src/Page.tsx': [(3, 3)], 'src/new.tsx': [(1, 1)]}
+
+        result = scan_changed('HEAD~1', repo, 'HEAD')
+        assert result['files_scanned'] == 2
+        assert result['count'] == 3  # All hits in the changed files
+        assert result['new_count'] == 2  # Only hits inside changed hunks
+        new_texts = [e['korean_texts'][0] for f in result['files'] for e in f['new_elements']]
+        assert new_texts == ['새로운', '추가']
+
+
+class AbortingService:
+    """Stands in for a LocaleService whose scan budget runs out"""
+
+    def search_untemplated(self, content):
+        return {'success': False, 'error': 'Scan aborted', 'count': 0, 'elements': []}
+
+
+def test_working_tree_includes_untracked_files():
+    with tempfile.TemporaryDirectory() as repo:
+        git(repo, 'init', '-q')
+        git(repo, 'config', 'user.email', 'test@example.com')
+        git(repo, 'config', 'user.name', 'test')
+        write(repo, '.gitignore', 'build/\n')
+        write(repo, 'src/Page.tsx', '<div>\n  <p>기존</p>\n</div>\n')
+        write(repo, 'src/My Page.tsx', '<div>\n</div>\n')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'base')
+
+        # A tracked file whose path has a space, modified in the working tree
+        write(repo, 'src/My Page.tsx', '<div>\n  <b>수정</b>\n</div>\n')
+        write(repo, 'src/새 페이지.tsx', '<div>\n  <p>새로운</p>\n</div>\n')
+        write(repo, 'build/Out.tsx', '<p>빌드</p>\n')
+
+        assert changed_hunks('HEAD', repo) == {'src/My Page.tsx': [(2, 2)], 'src/새 페이지.tsx': [(1, 3)]}
+        result = scan_changed('HEAD', os.path.join(repo, 'src'))
+        assert result['success']
+        assert result['new_count'] == 2
+        assert [f['path'] for f in result['files']] == ['src/My Page.tsx', 'src/새 페이지.tsx']
+
+        result = scan_changed('HEAD', repo, service=AbortingService())
+        assert not result['success']
+        assert result['files'][0]['error'] == 'Scan aborted'
+
+
+def test_changed_gate_fails_on_aborted_scan(monkeypatch, capsys):
+    aborted = {'success': False, 'new_count': 0, 'message': 'Found 0 new untemplated Korean elements',
+               'files': [{'path': 'src/Page.tsx', 'new_elements': [], 'error': 'Scan aborted'}]}
+    monkeypatch.setattr(cli, 'scan_changed', lambda base, repo, head: aborted)
+    args = argparse.Namespace(base='HEAD', repo='.', head=None, json=False)
+    assert cli.cmd_changed(args) == 2
+    assert 'src/Page.tsx: ERROR Scan aborted' in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    test_only_changed_hunks_are_reported()
+    test_working_tree_includes_untracked_files()
+    print("✅ Git scan tests completed!")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental element scan
+"""
+
+import random
+
+from incremental import IncrementalScan, restart_point
+from locale_service import LocaleService
+
+PIECES = [
+    '<span>', '</span>', '<div className="a">', '</div>', '안녕', '확인 ', '<input placeholder="검색" />',
+    'title="버튼"', "alt='사진'", '{bt("W1", "저장")}', '\n', '<', '>', '/', '"', "'", '=', 'x',
+    '<p>', '</p>', '<br/>', '  ', '저장하기', '{bvt(x)}', '<b>굵게</b>'
+]
+
+
+def test_edits_match_full_rescan():
+    service = LocaleService()
+    rng = random.Random(44)
+    for _ in range(500):
+        scan = IncrementalScan(service, ''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 40))))
+        for _ in range(8):
+            start = rng.randint(0, len(scan.content))
+            end = rng.randint(start, min(len(scan.content), start + rng.randint(0, 15)))
+            scan.edit(start, end, ''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 3))))
+
+            assert scan.elements() == service.find_tsx_elements_with_korean(scan.content)
+            expected = service.search_untemplated(scan.content)['elements']
+            assert [element['start'] for element in scan.untemplated()] == [element['start'] for element in expected]
+
+
+def test_typing_inside_an_element():
+    service = LocaleService()
+    content = '<div>\n  <span>안녕</span>\n  <p>{bt("W1", "저장")}</p>\n</div>'
+    scan = IncrementalScan(service, content)
+    position = content.index('</span>')
+
+    for i, char in enumerate('하세요'):
+        scan.edit(position + i, position + i, char)
+
+    assert [element['inner_text'] for element in scan.untemplated()] == ['안녕하세요']
+    # Matches after the edit are kept, not rescanned
+    assert scan.tail['simple']
+
+
+def test_restart_point_skips_unrelated_tags():
+    content = '<div><span>안녕</span><b>확인'
+    position = len(content)
+
+    # An attempt reaching the end starts at most two '<' back
+    assert restart_point('simple', content, position) == content.index('안녕')
+    assert restart_point('self_closing', content, position) == content.index('확인')
+    assert restart_point('attribute', content, position) == content.index('확인')
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous job subsystem
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from jobs import JobManager, QueueFullError
+
+FILES = [
+    ('Header.tsx', '<div><h1>저장</h1><button>취소</button></div>'),
+    ('Footer.tsx', '<div><p>저장</p></div>'),
+]
+
+
+def wait_for(manager, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.get_status(job_id)
+        if status['status'] in ('completed', 'failed'):
+            return status
+        time.sleep(0.02)
+    raise AssertionError('Job did not finish in time')
+
+
+def test_search_job_progress_and_result():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        manager = JobManager(jobs_dir=jobs_dir, workers=1)
+        job = manager.submit('search', FILES)
+        assert job['status'] == 'queued'
+
+        status = wait_for(manager, job['job_id'])
+        assert status['status'] == 'completed'
+        assert status['files_done'] == 2
+        assert status['bytes_processed'] == status['bytes_total']
+        assert os.path.exists(manager.result_path(job['job_id']))
+
+
+def test_queue_is_bounded_and_results_expire():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        manager = JobManager(jobs_dir=jobs_dir, workers=0, queue_size=1, ttl=0)
+        manager.submit('apply', FILES)
+        with pytest.raises(QueueFullError):
+            manager.submit('apply', FILES)
+
+        # Nothing has finished yet, so nothing is evicted
+        assert manager.evict_expired() == 0
+
+        job_id = manager.queue.get_nowait()
+        manager._run_job(job_id)
+        assert manager.get_status(job_id)['status'] == 'completed'
+        with open(manager.result_path(job_id), encoding='utf-8') as f:
+            result = json.load(f)
+        # Placeholders, not IDs allocated from the uploaded files alone
+        assert {f['updated_content'] for f in result['files']} == {
+            '<div><h1>{bt("W#", "저장")}</h1><button>{bt("W#", "취소")}</button></div>',
+            '<div><p>{bt("W#", "저장")}</p></div>'
+        }
+        time.sleep(0.01)
+        assert manager.evict_expired() == 1
+        assert manager.get_status(job_id) is None
+
+
+def test_orphaned_jobs_fail_and_expire():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        owner = JobManager(jobs_dir=jobs_dir, workers=0, ttl=0, stale_after=0)
+        job_id = owner.submit('search', FILES)['job_id']
+        time.sleep(0.01)
+        # The owner still holds the job, whatever the age of its heartbeat
+        assert owner.get_status(job_id)['status'] == 'queued'
+
+        # Another worker sees a fresh heartbeat, then a stale one once the owner is gone
+        other = JobManager(jobs_dir=jobs_dir, workers=0, ttl=0, stale_after=60)
+        assert other.get_status(job_id)['status'] == 'queued'
+        other.stale_after = 0
+        assert other.evict_expired() == 0
+        status = other.get_status(job_id)
+        assert status['status'] == 'failed'
+        assert status['error'] == f'Job failed: worker process {os.getpid()} stopped'
+
+        time.sleep(0.01)
+        assert other.evict_expired() == 1
+        assert not os.path.exists(os.path.join(jobs_dir, job_id))
+
+
+if __name__ == "__main__":
+    test_search_job_progress_and_result()
+    test_queue_is_bounded_and_results_expire()
+    test_orphaned_jobs_fail_and_expire()
+    print("✅ Job tests completed!")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Test script for the core locale processing engine
+"""
+
+import itertools
+import random
+import time
+
+import pytest
+
+from locale_service import LineIndex, LocaleService
+from scripts import ScriptTable
+
+
+def test_detect_cache_shared_by_search_and_apply():
+    service = LocaleService(detect_cache_size=16)
+    content = '<div><button>확인</button><button>확인</button><span>취소</span></div>'
+
+    service.search_untemplated(content)
+    service.apply_template(content, 'bt')
+
+    stats = service.cache_stats()
+    assert stats['misses'] == 2  # "확인" and "취소" are segmented once
+    assert stats['hits'] >= 4
+    assert 0 < stats['hit_rate'] < 1
+    assert stats['size'] == 2
+
+
+def test_detect_cache_returns_copies():
+    service = LocaleService()
+    first = service.detect_korean_text('저장 하기')
+    first.append('mutated')
+    assert service.detect_korean_text('저장 하기') == ['저장 하기']
+
+
+def test_line_index_matches_naive_count():
+    content = 'ab\ncd\n\n안녕\n'
+    line_index = LineIndex(content)
+    for offset in range(len(content) + 1):
+        line, column = line_index.line_col(offset)
+        assert line == content.count('\n', 0, offset) + 1
+        assert line_index.offset(line, column) == offset
+
+
+def test_search_results_carry_line_and_column():
+    service = LocaleService()
+    content = '<div>\n  <span>안녕하세요</span>\n  <input placeholder="검색" />\n</div>\n'
+    elements = service.search_untemplated(content)['elements']
+    assert (elements[0]['line'], elements[0]['column']) == (2, 3)
+    assert elements[0]['end_line'] == 2
+    assert all(element['line'] == 3 for element in elements[1:])
+
+
+def test_default_scripts_include_hangul_jamo():
+    service = LocaleService()
+    assert service.scripts == ('hangul',)
+    assert service.detect_korean_text('ㅋㅋ') == ['ㅋㅋ']
+    assert service.detect_korean_text('保存') == []
+
+
+def test_configured_scripts_detect_japanese_and_chinese():
+    service = LocaleService(scripts=['ko', 'ja'])
+    assert service.scripts == ('hangul', 'kana', 'han')
+    content = '<div><span>保存する</span><input placeholder="検索" /><b>확인</b></div>'
+    result = service.search_untemplated(content)
+    assert sorted(e['inner_text'] for e in result['elements'] if e['tag'] != 'input') == ['保存する', '検索', '확인']
+
+    applied = service.apply_template(content, 'bt')
+    assert '{bt("W#", "保存する")}' in applied['updated_content']
+    assert 'placeholder={bt("W#", "検索")}' in applied['updated_content']
+
+
+def test_script_table_merges_ranges():
+    table = ScriptTable(['kana', 'han', 'hangul'])
+    starts = [start for start, _ in table.ranges]
+    assert starts == sorted(starts)
+    assert all(end < next_start for (_, end), next_start in zip(table.ranges, starts[1:]))
+    for char in 'あア漢가ㄱ':
+        assert table.contains(char)
+        assert table.pattern.fullmatch(char)
+    for char in 'a1 ':
+        assert not table.contains(char)
+    assert table.script_of('ア') == 'kana'
+
+
+def test_unknown_script_is_rejected():
+    with pytest.raises(ValueError):
+        ScriptTable(['klingon'])
+
+
+def test_apply_wraps_partially_templated_elements_once():
+    service = LocaleService()
+    content = '<p>{bt("W1", "안녕")} 세계</p><b>{bt("W#", "확인")} 확인</b><i>가나, 가</i>'
+    updated = service.apply_template(content, 'bt')['updated_content']
+    assert updated == (
+        '<p>{bt("W1", "안녕")} {bt("W#", "세계")}</p>'
+        '<b>{bt("W#", "확인")} {bt("W#", "확인")}</b>'
+        '<i>{bt("W#", "가나")}, {bt("W#", "가")}</i>'
+    )
+
+
+
+def test_apply_wraps_whole_phrases_and_search_reports_them():
+    service = LocaleService()
+    content = '<b>상품 목록: 총 개수</b><p>저장 하기, 저장 하기!</p>'
+    assert service.apply_template(content, 'bt')['updated_content'] == (
+        '<b>{bt("W#", "상품 목록")}: {bt("W#", "총 개수")}</b>'
+        '<p>{bt("W#", "저장 하기")}, {bt("W#", "저장 하기")}!</p>'
+    )
+    assert [element['korean_texts'] for element in service.search_untemplated(content)['elements']] == [
+        ['상품 목록', '총 개수'], ['저장 하기']
+    ]
+
+
+def test_search_reports_what_apply_rewrites_in_mixed_content():
+    service = LocaleService()
+    content = ('<div>\n'
+               '  <p>안녕 {bt("W1", "확인")} 세상</p>\n'
+               '  <h1>{bt("W2", "제목")}</h1>\n'
+               '  <span title="설명">저장</span>\n'
+               '  <input placeholder={bt("W3", "이름")} />\n'
+               '</div>')
+    result = service.search_untemplated(content)
+    assert [(element['full_match'], element.get('partially_templated', False))
+            for element in result['elements']] == [
+        ('<p>안녕 {bt("W1", "확인")} 세상</p>', True),
+        ('<span title="설명">저장</span>', False),
+        ('title="설명"', False)
+    ]
+    assert result['count'] == service.apply_template(content, 'bt')['replacements_count'] == 3
+    # Only the text apply wraps
+    assert result['elements'][0]['korean_texts'] == ['안녕', '세상']
+
+    assert service.search_untemplated('<p>안녕 {bt("W1", "확인")} 세상</p>')['count'] == 1
+    assert service.search_untemplated('<p>{bt("W1", "확인")}, {bt("W2", "세상")}</p>')['count'] == 0
+
+
+FUZZ_TEXTS = ['확인', '취소', '저장 하기', '가', '나다', 'ㅋㅋ', '상품 목록']
+FUZZ_TOKENS = [
+    '<b>', '</b>', '<p className="x">', '</p>', '<span>{k}</span>', '<input placeholder="{k}" />',
+    '{bt("W1", "{k}")}', '{bt("W#", "{k}")}', '{bvt(label)}', '{k}', 'title="{k}"', "alt='{k}'",
+    'x="{k} y"', ' ', ', ', '\n', '=', '"', "'", '<', '>', '/', '{', '}', 'a',
+]
+
+
+def test_apply_is_idempotent_on_fuzzed_corpus():
+    rng = random.Random(39)
+    service = LocaleService()
+    for _ in range(5000):
+        content = ''.join(
+            rng.choice(FUZZ_TOKENS).replace('{k}', rng.choice(FUZZ_TEXTS))
+            for _ in range(rng.randint(1, 40))
+        )
+        once = service.apply_template(content, 'bt')
+        twice = service.apply_template(once['updated_content'], 'bt')
+        assert twice['updated_content'] == once['updated_content'], content
+        assert twice['replacements_count'] == 0
+        assert '{bt("W#", "{bt(' not in once['updated_content']
+
+
+def test_overlapping_hits_are_reported_once():
+    service = LocaleService()
+    content = ('<input placeholder="이름 입력" title="설명" />'
+               '<p title="제목">x="한글"</p>'
+               '<img alt={"사진"} title="설명"/>')
+    result = service.search_untemplated(content)
+    assert [element['full_match'] for element in result['elements']] == [
+        '<p title="제목">x="한글"</p>',
+        '<img alt={"사진"} title="설명"/>',
+        'placeholder="이름 입력"', 'title="설명"', 'title="제목"', 'title="설명"'
+    ]
+    assert result['count'] == 6
+
+
+def test_deduplication_keeps_every_text_on_fuzzed_corpus():
+    rng = random.Random(48)
+    service = LocaleService()
+    for _ in range(2000):
+        content = ''.join(
+            rng.choice(FUZZ_TOKENS).replace('{k}', rng.choice(FUZZ_TEXTS))
+            for _ in range(rng.randint(1, 40))
+        )
+        raw = [element for kind, pattern in service.element_matchers() for match in pattern.finditer(content)
+               for element in [service.element_from_match(kind, match)] if element is not None]
+        reported = service.find_tsx_elements_with_korean(content)
+        spans = [(element['start'], element['end']) for element in reported]
+        assert len(set(spans)) == len(spans), content
+        # A dropped hit is inside a reported element's text, or its text is
+        # reported by the hits inside it
+        for element in raw:
+            if (element['start'], element['end']) in spans:
+                continue
+            inside = [other for other in reported
+                      if element['start'] <= other['start'] and other['end'] <= element['end']]
+            assert any(other['start'] <= element['start'] and element['end'] <= other['end']
+                       for other in reported if other.get('is_simple')) or \
+                set(element['korean_texts']) <= {text for other in inside for text in other['korean_texts']}, content
+
+
+def test_scan_budget_aborts_with_partial_result(monkeypatch):
+    service = LocaleService(scan_budget=5)
+    # One CPU "second" per clock read: the deadline passes at the sixth element
+    clock = itertools.count()
+    monkeypatch.setattr(time, 'thread_time', lambda: next(clock))
+    content = '<p>안녕</p>' * 20
+
+    result = service.search_untemplated(content)
+    assert not result['success']
+    assert result['partial']
+    assert result['count'] == 5
+    assert 'Scan aborted after 5s of CPU time at offset 45 of 180' in result['error']
+
+    applied = service.apply_template(content, 'bt')
+    assert not applied['success']
+    assert 'Scan aborted' in applied['error']
+
+
+def test_scan_budget_disabled():
+    service = LocaleService(scan_budget=0)
+    result = service.search_untemplated('<p>안녕</p>' * 20)
+    assert result['success'] and result['count'] == 20
+    assert 'partial' not in result
+
+
+if __name__ == "__main__":
+    test_detect_cache_shared_by_search_and_apply()
+    test_detect_cache_returns_copies()
+    test_line_index_matches_naive_count()
+    test_search_results_carry_line_and_column()
+    test_default_scripts_include_hangul_jamo()
+    test_configured_scripts_detect_japanese_and_chinese()
+    test_script_table_merges_ranges()
+    test_unknown_script_is_rejected()
+    test_apply_wraps_partially_templated_elements_once()
+    test_apply_wraps_whole_phrases_and_search_reports_them()
+    test_search_reports_what_apply_rewrites_in_mixed_content()
+    test_apply_is_idempotent_on_fuzzed_corpus()
+    test_overlapping_hits_are_reported_once()
+    test_deduplication_keeps_every_text_on_fuzzed_corpus()
+    test_scan_budget_disabled()
+    print("✅ Locale service tests completed!")
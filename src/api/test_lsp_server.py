@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the language server
+"""
+
+from locale_service import LocaleService
+from lsp_server import LanguageServer, TextDocument, utf16_length, utf16_to_index
+
+URI = 'file:///src/Page.tsx'
+
+
+def start_server(text):
+    messages = []
+    server = LanguageServer(messages.append, LocaleService())
+    server.handle({'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {}})
+    server.handle({'jsonrpc': '2.0', 'method': 'textDocument/didOpen', 'params': {
+        'textDocument': {'uri': URI, 'languageId': 'typescriptreact', 'version': 1, 'text': text}
+    }})
+    server.publish_pending()
+    return server, messages
+
+
+def test_utf16_positions():
+    assert utf16_length('😀 안녕') == 5
+    assert utf16_to_index('😀 안녕', 3) == 2
+    document = TextDocument(URI, 'a\n😀 <b>안녕</b>', 1, LocaleService())
+    offset = document.text.index('<b>')
+
+    assert document.position_at(offset) == {'line': 1, 'character': 3}
+    assert document.offset_at({'line': 1, 'character': 3}) == offset
+
+
+def test_incremental_changes_publish_diagnostics():
+    server, messages = start_server('<div>\n  <span>안녕</span>\n  <p>Hello</p>\n</div>')
+    assert messages[0]['result']['capabilities']['textDocumentSync']['change'] == 2
+    diagnostics = messages[-1]['params']['diagnostics']
+    assert diagnostics[0]['range'] == {'start': {'line': 1, 'character': 2}, 'end': {'line': 1, 'character': 17}}
+
+    # Type Korean text into the second element, then template the first one
+    server.handle({'jsonrpc': '2.0', 'method': 'textDocument/didChange', 'params': {
+        'textDocument': {'uri': URI, 'version': 2},
+        'contentChanges': [
+            {'range': {'start': {'line': 2, 'character': 5}, 'end': {'line': 2, 'character': 10}}, 'text': '반가워요'},
+            {'range': {'start': {'line': 1, 'character': 8}, 'end': {'line': 1, 'character': 10}},
+             'text': '{bt("W1", "안녕")}'}
+        ]
+    }})
+    server.publish_pending()
+
+    published = messages[-1]['params']
+    assert published['version'] == 2
+    assert [d['message'] for d in published['diagnostics']] == ['Untemplated Korean text: 반가워요']
+    assert published['diagnostics'][0]['range']['start'] == {'line': 2, 'character': 2}
+
+
+def test_code_action_templates_one_element():
+    server, messages = start_server('<span>안녕</span>\n<button title="닫기">확인</button>')
+
+    server.handle({'jsonrpc': '2.0', 'id': 2, 'method': 'textDocument/codeAction', 'params': {
+        'textDocument': {'uri': URI},
+        'range': {'start': {'line': 0, 'character': 7}, 'end': {'line': 0, 'character': 7}},
+        'context': {'diagnostics': []}
+    }})
+
+    actions = messages[-1]['result']
+    assert len(actions) == 1
+    assert actions[0]['kind'] == 'quickfix'
+    assert actions[0]['edit']['changes'][URI] == [{
+        'range': {'start': {'line': 0, 'character': 6}, 'end': {'line': 0, 'character': 8}},
+        'newText': '{bt("W#", "안녕")}'
+    }]
+
+
+def test_lifecycle():
+    messages = []
+    server = LanguageServer(messages.append, LocaleService())
+
+    server.handle({'jsonrpc': '2.0', 'id': 1, 'method': 'textDocument/codeAction', 'params': {}})
+    assert messages[-1]['error']['code'] == -32002
+
+    server.handle({'jsonrpc': '2.0', 'id': 2, 'method': 'initialize', 'params': {}})
+    server.handle({'jsonrpc': '2.0', 'id': 3, 'method': 'textDocument/hover', 'params': {}})
+    assert messages[-1]['error']['code'] == -32601
+
+    server.handle({'jsonrpc': '2.0', 'id': 4, 'method': 'shutdown'})
+    server.handle({'jsonrpc': '2.0', 'method': 'exit'})
+    assert server.exit_code == 0
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the linear-time scan matchers
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from locale_service import LocaleService
+
+# The backtracking patterns the matchers replace
+REFERENCE = {
+    'simple': re.compile(r'<(\w+)([^>]*?)>([^<]*)</\1>'),
+    'self_closing': re.compile(r'<(\w+)([^>]*?)/>'),
+    'bvt': re.compile(r'\{bvt\(([^)]+)\)\}'),
+    'template_span': re.compile(r'\{bt\("W(?:\d+|#)",\s*"[^"]*"\)\}|\{bvt\([^)]*\)\}')
+}
+
+PIECES = [
+    '<', '>', '/', '</', '/>', 'a', 'ab', 'div', '</a>', '</ab>', '<a', '<ab', '<a>', '</b>', '=', '"', "'",
+    ' ', '  ', '\n', 'x', '한', '한글', '가 나', '{bvt(', ')', '}', ')}', '{bt("W1", "x")}', '{bt("W#", "', ' x="한"'
+]
+
+PATHOLOGICAL = {
+    'unclosed tags': lambda n: '<a' * (n // 2),
+    'long tag name': lambda n: '<' + 'a' * n + '>x</b>',
+    'unterminated attribute': lambda n: 'a="' + '한' * n,
+    'long word': lambda n: 'a' * n,
+    'attribute openings': lambda n: ' x="' * (n // 4),
+    'unclosed bvt': lambda n: '{bvt(' * (n // 5),
+    'spaced text': lambda n: '<p>' + '가  ' * (n // 3) + '</p>'
+}
+
+
+def signature(match):
+    return match and (match.span(), match.groups())
+
+
+def reference_segments(service, text):
+    """detect_korean_text as it was: every join of segments tried against the text"""
+    segments = service.korean_pattern.findall(text)
+    if len(segments) <= 1:
+        return tuple(segments)
+    largest = ''
+    for i in range(len(segments)):
+        for j in range(i + 1, len(segments) + 1):
+            joined = ' '.join(segments[i:j])
+            if joined in text and len(joined) > len(largest):
+                largest = joined
+    return (largest,) if largest else tuple(segments)
+
+
+def test_matchers_agree_with_backtracking_patterns():
+    service = LocaleService()
+    attribute = re.compile(r'(\w+)=["\']([^"\']*' + service.script_table.char_class + r'+[^"\']*)["\']')
+    matchers = [
+        (service.simple_pattern, REFERENCE['simple']),
+        (service.self_closing_pattern, REFERENCE['self_closing']),
+        (service.bvt_pattern, REFERENCE['bvt']),
+        (service.attr_pattern, attribute)
+    ]
+    rng = random.Random(46)
+    for _ in range(3000):
+        content = ''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 30)))
+        pos = rng.randint(0, len(content))
+        endpos = rng.randint(pos, len(content))
+        for matcher, reference in matchers:
+            assert [signature(m) for m in matcher.finditer(content)] == \
+                [signature(m) for m in reference.finditer(content)], content
+            assert [signature(m) for m in matcher.finditer(content, pos, endpos)] == \
+                [signature(m) for m in reference.finditer(content, pos, endpos)], content
+            for position in range(len(content) + 1):
+                # Attributes only start at the start of a word
+                if matcher is service.attr_pattern and position and re.match(r'\w', content[position - 1]):
+                    continue
+                assert signature(matcher.match(content, position)) == \
+                    signature(reference.match(content, position)), (content, position)
+        assert service.find_template_spans(content) == \
+            [m.span() for m in REFERENCE['template_span'].finditer(content)], content
+        assert service._segment_korean_text(content) == reference_segments(service, content), content
+
+
+def test_segment_ties_follow_reading_order():
+    service = LocaleService()
+    # "가나 다" and "라마 바" are the longest blocks, but the first two
+    # segments joined also read "라마 바", so that join comes first
+    text = '라마  바  가나 다  라마 바'
+    assert service._segment_korean_text(text) == reference_segments(service, text) == ('라마 바',)
+    text = '라마  가나 다  라마 바'
+    assert service._segment_korean_text(text) == reference_segments(service, text) == ('가나 다',)
+
+
+@pytest.mark.parametrize('name', sorted(PATHOLOGICAL))
+def test_pathological_input_scans_in_linear_time(name):
+    service = LocaleService(scan_budget=0)
+    content = PATHOLOGICAL[name](200000)
+    start = time.perf_counter()
+    service.search_untemplated(content)
+    service.apply_template(content, 'bt')
+    # The backtracking patterns took minutes on these 200 KB inputs
+    assert time.perf_counter() - start < 5, name
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for request payload limits and spooled uploads
+"""
+
+import io
+import json
+
+from app import app
+from payload_limits import CONTENT_LIMIT, UPLOAD_LIMIT
+
+
+def test_oversized_content_is_rejected_early():
+    client = app.test_client()
+    response = client.post('/api/search/content', json={'content': 'x' * (CONTENT_LIMIT + 1)})
+    assert response.status_code == 413
+    assert response.json['success'] is False
+
+    response = client.post('/api/search/content', json={'content': '<span>안녕하세요</span>'})
+    assert response.status_code == 200
+    assert response.json['count'] == 1
+
+
+def test_large_upload_is_spooled_and_scanned():
+    client = app.test_client()
+    content = '<span>저장</span>\r\n' * 100000  # Well above the spool threshold
+    response = client.post(
+        '/api/search/',
+        data={'file': (io.BytesIO(content.encode('utf-8')), 'large.tsx')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 200
+    assert response.json['count'] == 100000
+    assert response.json['debug_info']['file_size'] == len(content)
+
+
+def test_chunked_body_is_limited_while_read():
+    client = app.test_client()
+    # No Content-Length: the server terminates the stream, as gunicorn does for chunked bodies
+    chunked = {'headers': {'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'},
+               'environ_overrides': {'wsgi.input_terminated': True}}
+    body = json.dumps({'content': '<span>안녕하세요</span>' + 'x' * CONTENT_LIMIT}).encode('utf-8')
+    response = client.post('/api/search/content', input_stream=io.BytesIO(body), **chunked)
+    assert response.status_code == 413
+
+    body = json.dumps({'content': '<span>안녕하세요</span>'}).encode('utf-8')
+    response = client.post('/api/search/content', input_stream=io.BytesIO(body), **chunked)
+    assert response.status_code == 200
+    assert response.json['count'] == 1
+
+
+def test_job_uploads_are_limited():
+    response = app.test_client().post(
+        '/api/jobs/',
+        data={'files': (io.BytesIO(b'x' * (UPLOAD_LIMIT + 1)), 'large.tsx'), 'operation': 'search'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 413
+    assert response.json['success'] is False
+
+
+if __name__ == "__main__":
+    test_oversized_content_is_rejected_early()
+    test_large_upload_is_spooled_and_scanned()
+    test_chunked_body_is_limited_while_read()
+    test_job_uploads_are_limited()
+    print("✅ Payload limit tests completed!")
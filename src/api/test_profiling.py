@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for admin-gated request profiling
+"""
+
+import hashlib
+import io
+import pstats
+
+from flask import Flask, request
+
+import profiling
+from locale_service import LocaleService
+
+
+def make_app(monkeypatch, tmp_path, token='secret'):
+    monkeypatch.setattr(profiling, 'PROFILE_TOKEN', token)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    app = Flask(__name__)
+    service = LocaleService()
+
+    @app.route('/api/search/', methods=['POST'])
+    def search():
+        content = request.files['file'].read().decode('utf-8')
+        return service.search_untemplated(content * 200)
+
+    profiling.init_profiling(app)
+    return app
+
+
+def upload(client, headers=None):
+    data = {'file': (io.BytesIO('<p>안녕하세요</p>'.encode('utf-8')), 'a.tsx')}
+    return client.post('/api/search/', data=data, headers=headers or {})
+
+
+def test_profile_is_stored_and_tagged_with_file_hash(monkeypatch, tmp_path):
+    client = make_app(monkeypatch, tmp_path).test_client()
+
+    response = upload(client, {'X-Profile-Token': 'secret'})
+    profile_id = response.headers['X-Profile-Id']
+    assert response.status_code == 200
+
+    meta = client.get(f'/api/profiles/{profile_id}?format=meta',
+                      headers={'X-Profile-Token': 'secret'}).get_json()
+    assert meta['file_hash'] == hashlib.sha256('<p>안녕하세요</p>'.encode('utf-8')).hexdigest()
+    assert meta['path'] == '/api/search/'
+
+    stats = pstats.Stats(str(tmp_path / f'{profile_id}.pstats'))
+    assert any(name == 'search_untemplated' for _, _, name in stats.stats)
+    collapsed = client.get(f'/api/profiles/{profile_id}', headers={'X-Profile-Token': 'secret'})
+    assert collapsed.status_code == 200
+
+
+def test_profiling_requires_token(monkeypatch, tmp_path):
+    client = make_app(monkeypatch, tmp_path).test_client()
+
+    assert 'X-Profile-Id' not in upload(client).headers
+    assert 'X-Profile-Id' not in upload(client, {'X-Profile-Token': 'wrong'}).headers
+    assert client.get('/api/profiles/1-000000000000-00000000').status_code == 403
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiling_disabled_without_configured_token(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path, token='')
+    assert not app.before_request_funcs
+    assert 'download_profile' not in app.view_functions
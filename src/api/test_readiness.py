@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the load-aware readiness endpoint
+"""
+
+import os
+
+import app as app_module
+import readiness as readiness_module
+from readiness import LoadMonitor, percentile, readiness
+
+
+def test_thresholds():
+    monitor = LoadMonitor()
+    monitor.set_capacity(4)
+    for duration in [0.1] * 18 + [12.0, 12.0]:
+        monitor.request_started()
+        monitor.request_finished(duration)
+    monitor.request_started()
+
+    snapshot = monitor.snapshot(queue_depth=2)
+    assert snapshot['in_flight'] == 1
+    assert snapshot['utilization'] == 0.25
+    assert snapshot['recent_scans'] == 20
+    assert snapshot['p95_scan_seconds'] == 12.0
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+
+    result = readiness(dict(snapshot, memory_available_bytes=32 * 1024 * 1024))
+    assert not result['ready']
+    assert result['reasons'] == ['p95 scan latency 12s >= 10s', 'memory headroom 32 MB < 64 MB']
+    assert readiness(snapshot, max_p95_seconds=0, min_memory_mb=0)['ready']
+    assert not readiness(snapshot, max_utilization=0.25, max_p95_seconds=0)['ready']
+    assert not readiness(dict(snapshot, queue_depth=8), max_p95_seconds=0)['ready']
+
+
+def fork_worker(monitor, hold_lock=False):
+    """A worker that finishes a scan and dies in the middle of its next request"""
+    pid = os.fork()
+    if pid == 0:
+        monitor.request_started()
+        monitor.request_finished(1.5)
+        monitor.request_started()
+        if hold_lock:
+            monitor.slot_lock.acquire()
+        os._exit(0)
+    # Exited, but not yet reaped
+    os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+    return pid
+
+
+def test_shared_with_forked_workers():
+    monitor = LoadMonitor()
+    pid = fork_worker(monitor)
+    # Until the master reaps it the worker's request counts, then child_exit frees its slot
+    snapshot = monitor.snapshot()
+    assert snapshot['in_flight'] == 1
+    assert snapshot['recent_scans'] == 1
+    assert monitor.release_worker(pid)
+    assert monitor.snapshot()['in_flight'] == 0
+    os.waitpid(pid, 0)
+
+
+def test_dead_worker_leaves_no_count_or_lock_behind(monkeypatch):
+    monkeypatch.setattr(readiness_module, 'SLOT_LOCK_TIMEOUT', 0.05)
+    monitor = LoadMonitor(slots=1)
+    pid = fork_worker(monitor, hold_lock=True)
+    os.waitpid(pid, 0)
+
+    # Killed without child_exit, and holding the slot lock
+    assert monitor.snapshot()['in_flight'] == 0
+    monitor.request_started()
+    snapshot = monitor.snapshot()
+    assert snapshot['in_flight'] == 1
+    assert snapshot['recent_scans'] == 1
+    # Its slot was taken over
+    assert monitor.release_dead_workers() == 0
+    assert not monitor.release_worker(pid)
+
+
+def test_ready_endpoint(monkeypatch):
+    monitor = LoadMonitor()
+    monkeypatch.setattr(app_module, 'load_monitor', monitor)
+    monkeypatch.setitem(app_module.app.extensions, 'load_monitor', monitor)
+    client = app_module.app.test_client()
+
+    # Scans are timed, probes are not counted as load
+    assert client.post('/api/search/content', json={'content': '<p>안녕</p>'}).status_code == 200
+    response = client.get('/api/health/ready')
+    result = response.get_json()
+    assert result['recent_scans'] == 1
+    assert result['in_flight'] == 0
+    assert response.status_code == (200 if result['ready'] else 503)
+
+    monitor.request_started()
+    response = client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert 'utilization 1 >= 1' in response.get_json()['reasons']
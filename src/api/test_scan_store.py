@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent scan history store
+"""
+
+import sqlite3
+from contextlib import closing
+
+from cli import main
+from locale_service import LocaleService
+from scan_store import ScanStore, apply_record, content_hash, content_path, search_record
+
+
+def test_files_using_reports_latest_search_only(tmp_path):
+    store = ScanStore(str(tmp_path / 'scans.db'))
+    service = LocaleService()
+    old = '<p>확인</p><b>취소</b>'
+    new = '<p>{bt("W1", "확인")}</p><b>취소</b>'
+
+    store.record_scan('search', [
+        search_record('a.tsx', old, service.search_untemplated(old)),
+        search_record('b.tsx', old, service.search_untemplated(old)),
+    ])
+    store.record_scan('search', [search_record('a.tsx', new, service.search_untemplated(new))])
+
+    files = store.files_using('확인')
+    assert [f['path'] for f in files] == ['b.tsx']
+    assert files[0]['locations'] == [{'tag': 'p', 'line': 1, 'column': 1}]
+    assert [f['path'] for f in store.files_using('취소', tag='b')] == ['a.tsx', 'b.tsx']
+    assert store.files_using('취소', tag='p') == []
+
+    assert [p['untemplated_count'] for p in store.untemplated_trend()] == [4, 1]
+    assert [p['untemplated_count'] for p in store.untemplated_trend('a.tsx')] == [2, 1]
+    assert store.untemplated_trend('a.tsx')[-1]['content_hash'] == content_hash(new)
+
+
+def test_file_history_includes_applies(tmp_path):
+    store = ScanStore(str(tmp_path / 'scans.db'))
+    store.record_scan('apply', [apply_record('a.tsx', content_hash('<p>확인</p>'), 1)], source='cli')
+    history = store.file_history('a.tsx')
+    assert history[0]['operation'] == 'apply'
+    assert history[0]['replacements_count'] == 1
+
+
+def test_cli_records_searches(tmp_path, capsys):
+    db = str(tmp_path / 'scans.db')
+    (tmp_path / 'Page.tsx').write_text('<h1>상품 목록</h1>', encoding='utf-8')
+
+    assert main(['search', str(tmp_path), '--store', db]) == 1
+    assert main(['history', 'strings', '상품 목록', '--store', db, '--json']) == 0
+    output = capsys.readouterr().out
+    assert 'Page.tsx' in output.split('\n', 1)[1]
+
+
+def test_prune_by_age_and_count_keeps_latest_searches_consistent(tmp_path):
+    store = ScanStore(str(tmp_path / 'scans.db'), max_age=100, max_scans=2)
+    service = LocaleService()
+    content = '<p>확인</p>'
+    result = service.search_untemplated(content)
+    for path in ('a.tsx', 'b.tsx', 'c.tsx'):
+        store.record_scan('search', [search_record(path, content, result)])
+
+    # Only the newest two scans are left once the store prunes itself
+    assert store.prune() == 1
+    assert [f['path'] for f in store.files_using('확인')] == ['b.tsx', 'c.tsx']
+
+    store.max_scans = 0
+    assert store.prune(now=store.untemplated_trend()[-1]['created_at'] + 101) == 2
+    assert store.files_using('확인') == []
+    with closing(sqlite3.connect(store.path)) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM hits').fetchone()[0] == 0
+
+
+def test_existing_store_backfills_latest_searches(tmp_path):
+    db = str(tmp_path / 'scans.db')
+    store = ScanStore(db)
+    content = '<p>확인</p>'
+    store.record_scan('search', [search_record('a.tsx', content, LocaleService().search_untemplated(content))])
+    with closing(sqlite3.connect(db)) as conn, conn:
+        conn.execute('DELETE FROM latest_searches')
+
+    assert [f['path'] for f in ScanStore(db).files_using('확인')] == ['a.tsx']
+
+
+def test_anonymous_content_is_keyed_by_hash():
+    assert content_path('Page.tsx', '<p>확인</p>') == 'Page.tsx'
+    assert content_path(None, '<p>확인</p>') == f'<content:{content_hash("<p>확인</p>")}>'
+    assert content_path('', '<p>확인</p>') != content_path('', '<p>취소</p>')
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test script for the fast JSON response encoder
+"""
+
+import json
+
+import serialization
+from app import app
+from locale_service import LocaleService
+
+
+def test_encode_json_round_trips_with_and_without_orjson(monkeypatch):
+    result = LocaleService().search_untemplated('<p title="제목">안녕</p>')
+    encoded = serialization.encode_json(result)
+    assert json.loads(encoded) == result
+
+    monkeypatch.setattr(serialization, 'orjson', None)
+    fallback = serialization.encode_json(result)
+    assert json.loads(fallback) == result
+    assert '안녕'.encode('utf-8') in fallback
+
+
+def test_process_file_returns_full_elements(tmp_path):
+    path = tmp_path / 'Page.tsx'
+    path.write_text('<h1>상품 목록</h1>', encoding='utf-8')
+
+    response = app.test_client().post('/api/file/', json={'file_path': str(path)})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    data = response.get_json()
+    assert data['count'] == 1
+    assert data['elements'][0]['korean_texts'] == ['상품 목록']
+    assert data['elements'][0]['line'] == 1
+
+
+def test_swagger_keeps_response_models():
+    spec = app.test_client().get('/api/swagger.json').get_json()
+    responses = spec['paths']['/file/']['post']['responses']
+    assert responses['200']['schema']['$ref'] == '#/definitions/SearchResponse'
+    assert 'Element' in spec['definitions']
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for search sessions (apply the plan of a search without a rescan)
+"""
+
+import io
+import os
+
+import app as app_module
+from locale_service import LocaleService
+from sessions import SessionStore, parse_element_ids
+
+CONTENT = '''
+<div>
+    <h1>안녕하세요</h1>
+    <p title="설명">일부 {bt("W1", "번역")} 텍스트</p>
+    <input placeholder="이름 입력" />
+    <span>{bt("W2", "완료")}</span>
+</div>
+'''
+
+
+def test_stored_plan_matches_apply(tmp_path):
+    service = LocaleService()
+    store = SessionStore(str(tmp_path))
+    elements = service.search_untemplated(CONTENT)['elements']
+    token = store.create(CONTENT, elements, service.plan_template_units(CONTENT))
+
+    # The full plan is the plan apply computes
+    assert store.plan(token, CONTENT) == service.plan_template_edits(CONTENT)
+
+    placeholder = next(number for number, element in enumerate(elements)
+                       if element['full_match'].startswith('placeholder'))
+    edits, count = store.plan(token, CONTENT, [placeholder])
+    assert count == 1
+    assert ''.join(service.iter_edited(CONTENT, edits)) == \
+        CONTENT.replace('placeholder="이름 입력"', 'placeholder={bt("W#", "이름 입력")}')
+
+    assert store.plan(token, CONTENT, []) == ([], 0)
+
+    # The partially templated paragraph has its own ID, which wraps its remaining text only
+    paragraph = next(number for number, element in enumerate(elements) if element['tag'] == 'p')
+    assert elements[paragraph]['partially_templated']
+    edits, count = store.plan(token, CONTENT, [paragraph])
+    assert count == 1
+    assert [replacement for _, _, replacement in edits] == ['{bt("W#", "일부")}', '{bt("W#", "텍스트")}']
+
+
+def test_one_id_selects_one_hit(tmp_path):
+    service = LocaleService()
+    store = SessionStore(str(tmp_path))
+    content = '<p title="저장">취소</p>'
+    elements = service.search_untemplated(content)['elements']
+    assert [element['full_match'] for element in elements] == [content, 'title="저장"']
+    token = store.create(content, elements, service.plan_template_units(content))
+
+    # The element's text, not the attribute in its opening tag
+    edits, count = store.plan(token, content, [0])
+    assert count == 1
+    assert ''.join(service.iter_edited(content, edits)) == '<p title="저장">{bt("W#", "취소")}</p>'
+    edits, count = store.plan(token, content, [1])
+    assert count == 1
+    assert ''.join(service.iter_edited(content, edits)) == '<p title={bt("W#", "저장")}>취소</p>'
+
+
+def test_unknown_and_expired_sessions(tmp_path):
+    service = LocaleService()
+    store = SessionStore(str(tmp_path), ttl=0)
+    token = store.create(CONTENT, [], service.plan_template_units(CONTENT))
+    assert store.get('not-a-token') is None
+    assert store.get(token) is None
+    os.utime(tmp_path / f'{token}.json', (0, 0))
+    assert store.evict_expired() == 1
+    assert os.listdir(tmp_path) == []
+
+    assert parse_element_ids(' 2, 0 ,') == [2, 0]
+    assert parse_element_ids('') is None
+    for invalid in ('1,x', [True], 'abc'):
+        try:
+            parse_element_ids(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f'{invalid!r} was accepted')
+
+
+def test_search_then_apply_selected_hits(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'session_store', SessionStore(str(tmp_path)))
+    client = app_module.app.test_client()
+
+    # Sessions are only created on request
+    result = client.post('/api/search/content', json={'content': CONTENT}).get_json()
+    assert 'session' not in result and 'id' not in result['elements'][0]
+    assert os.listdir(tmp_path) == []
+
+    response = client.post('/api/search/content', json={'content': CONTENT, 'session': True})
+    result = response.get_json()
+    token = result['session']
+    heading = next(element['id'] for element in result['elements'] if element['tag'] == 'h1')
+
+    # The stored plan is executed: rescanning would fail the test
+    monkeypatch.setattr(app_module.locale_service, 'plan_template_edits', None)
+    response = client.post('/api/apply/content', json={
+        'content': CONTENT, 'session': token, 'element_ids': [heading]
+    })
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['replacements_count'] == 1
+    assert result['updated_content'] == CONTENT.replace('<h1>안녕하세요</h1>', '<h1>{bt("W#", "안녕하세요")}</h1>')
+
+    response = client.post('/api/search/', data={
+        'file': (io.BytesIO(CONTENT.encode('utf-8')), 'page.tsx'), 'session': 'true'
+    }, content_type='multipart/form-data')
+    assert response.get_json()['session'] != token
+
+    response = client.post('/api/apply/', data={
+        'file': (io.BytesIO(CONTENT.encode('utf-8')), 'page.tsx'),
+        'session': token, 'element_ids': f'{heading}', 'return_file': 'true'
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.headers['X-Replacements-Count'] == '1'
+
+    def apply(**payload):
+        return client.post('/api/apply/content', json={'content': CONTENT, **payload})
+
+    assert apply(session=token, element_ids=[99]).status_code == 400
+    assert apply(element_ids=[heading]).status_code == 400
+    assert apply(session='0' * 32).status_code == 404
+    assert client.post('/api/apply/content', json={
+        'content': CONTENT + ' ', 'session': token
+    }).status_code == 409
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for fuzzy suggestions of existing translations
+"""
+
+import json
+import random
+
+import app as app_module
+from suggestions import SuggestionIndex, load_catalog_index, ngrams, normalize
+
+SYLLABLES = '저장삭제확인취소완료검색설정사용자목록추가하기을를이가니다'
+
+
+def test_spacing_and_particles_are_near_duplicates():
+    index = SuggestionIndex()
+    index.add('W1', '저장 하기')
+    index.add('W2', '저장을 완료했습니다')
+    index.add('W3', '삭제하기')
+
+    assert normalize('저장 하기!') == normalize('저장하기')
+    assert index.suggest('저장하기') == [{'id': 'W1', 'text': '저장 하기', 'score': 1.0}]
+    assert index.suggest('저장 완료했습니다')[0]['id'] == 'W2'
+    assert index.suggest('취소') == []
+    assert index.suggest('...') == []
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(45)
+    texts = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 8))) for _ in range(2000)]
+    index = SuggestionIndex(min_score=0.5)
+    for number, text in enumerate(texts):
+        index.add(f'W{number}', text)
+
+    for _ in range(200):
+        query = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 8)))
+        grams = ngrams(query)
+        scores = sorted((round(2 * len(grams & other) / (len(grams) + len(other)), 3)
+                         for other in index.grams), reverse=True)
+        expected = [score for score in scores[:3] if score >= 0.5]
+        assert [suggestion['score'] for suggestion in index.suggest(query, 3)] == expected
+
+
+
+def test_entries_scoring_exactly_the_minimum_are_suggested():
+    # 3 and 7 bigrams sharing 3: Dice 6 / 10 = 0.6, where 3 * 1.4 / 0.6 is just under 7
+    index = SuggestionIndex(min_score=0.6)
+    index.add('W1', '가나다라마가나')
+    assert len(ngrams('가나')) == 3 and len(index.grams[0]) == 7
+    assert index.suggest('가나') == [{'id': 'W1', 'text': '가나다라마가나', 'score': 0.6}]
+
+    rng = random.Random(60)
+    for _ in range(300):
+        index = SuggestionIndex(min_score=0.6)
+        for number in range(30):
+            index.add(f'W{number}', ''.join(rng.choice(SYLLABLES[:4]) for _ in range(rng.randint(1, 7))))
+        for _ in range(20):
+            query = ''.join(rng.choice(SYLLABLES[:4]) for _ in range(rng.randint(1, 5)))
+            grams = ngrams(query)
+            expected = sorted(((2 * len(grams & other) / (len(grams) + len(other)), -number)
+                               for number, other in enumerate(index.grams)), reverse=True)
+            expected = [(f'W{-negative}', round(score, 3)) for score, negative in expected
+                        if score >= 0.6 - 1e-9][:3]
+            assert [(entry['id'], entry['score']) for entry in index.suggest(query, 3)] == expected
+
+
+def test_catalog_from_json_and_tsx(tmp_path):
+    (tmp_path / 'catalog.json').write_text(json.dumps({'W10': '검색 결과', 'W11': 3}), encoding='utf-8')
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    (pages / 'Page.tsx').write_text('<p>{bt("W20", "설정 저장")}</p>', encoding='utf-8')
+
+    index = load_catalog_index([str(tmp_path / 'catalog.json'), str(pages), str(tmp_path / 'missing')])
+    assert len(index) == 2
+    assert index.suggest('검색결과')[0]['id'] == 'W10'
+    assert index.suggest('설정을 저장')[0]['id'] == 'W20'
+
+
+def test_search_and_apply_responses(monkeypatch):
+    catalog = SuggestionIndex()
+    catalog.add('W7', '저장 하기')
+    monkeypatch.setattr(app_module, 'suggestion_index', catalog)
+    client = app_module.app.test_client()
+    content = '<p>{bt("W3", "삭제 하기")}</p><button>저장하기</button><span>삭제하기</span>'
+
+    response = client.post('/api/search/content', json={'content': content})
+    elements = response.get_json()['elements']
+    assert [element['suggestions'][0]['id'] for element in elements] == ['W7', 'W3']
+
+    response = client.post('/api/apply/content', json={'content': content})
+    suggestions = response.get_json()['suggestions']
+    assert [(entry['text'], entry['suggestions'][0]['id']) for entry in suggestions] == [
+        ('저장하기', 'W7'), ('삭제하기', 'W3')
+    ]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed upload store
+"""
+
+import os
+import time
+
+import pytest
+from flask import Flask
+
+from scan_store import content_hash
+from upload_store import QuotaExceededError, UploadStore, init_upload_store
+
+HEADER = '<div><h1>저장</h1></div>'
+FOOTER = '<div><p>취소</p></div>'
+
+
+def test_uploads_are_deduplicated_by_content(tmp_path):
+    store = UploadStore(str(tmp_path / 'files'))
+    path = store.save(HEADER)
+    assert store.save(HEADER) == path
+    assert store.save(FOOTER) != path
+    assert store.get(content_hash(HEADER)) == HEADER
+    assert store.get('0' * 64) is None
+    assert store.get('../escape') is None
+    assert store.sweep() == {'expired': 0, 'evicted': 0, 'files': 2,
+                             'bytes': len(HEADER.encode()) + len(FOOTER.encode())}
+
+    with pytest.raises(QuotaExceededError):
+        UploadStore(str(tmp_path / 'small'), quota_bytes=10).save(HEADER)
+
+
+def test_ttl_and_least_recently_used_eviction(tmp_path):
+    legacy = tmp_path / 'Page.tsx.backup'
+    legacy.write_text(HEADER, encoding='utf-8')
+    size = len(HEADER.encode())
+    # Saved without limits (its janitor never removes anything), swept with them
+    writer = UploadStore(str(tmp_path / 'files'), ttl=10 ** 9)
+    store = UploadStore(str(tmp_path / 'files'), quota_bytes=2 * size, ttl=3600, legacy_dir=str(tmp_path))
+    now = time.time()
+    contents = [HEADER.replace('저장', text) for text in ('가나', '다라', '마바', '사아')]
+    paths = [writer.save(content) for content in contents]
+    # Last used: the first one two hours ago, then the others oldest to newest
+    for age, path in zip((7200, 300, 200, 100), paths):
+        os.utime(path, (now - age, now - age))
+    os.utime(legacy, (now - 7200, now - 7200))
+
+    assert store.sweep() == {'expired': 2, 'evicted': 1, 'files': 2, 'bytes': 2 * size}
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert not legacy.exists()
+
+
+def test_janitor_wakes_when_the_quota_is_exceeded(tmp_path):
+    size = len(HEADER.encode())
+    store = UploadStore(str(tmp_path), quota_bytes=size, ttl=3600)
+    first = store.save(HEADER)
+    os.utime(first, (time.time() - 60,) * 2)
+    second = store.save(FOOTER)
+
+    deadline = time.time() + 5
+    while os.path.exists(first) and time.time() < deadline:
+        time.sleep(0.01)
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_legacy_uploads_expire_without_any_save(tmp_path):
+    legacy = tmp_path / 'Page.tsx'
+    legacy.write_text(HEADER, encoding='utf-8')
+    os.utime(legacy, (time.time() - 7200,) * 2)
+    store = UploadStore(str(tmp_path / 'files'), ttl=3600, legacy_dir=str(tmp_path))
+    app = Flask(__name__)
+    app.add_url_rule('/', 'index', lambda: 'ok')
+    init_upload_store(app, store)
+    assert store.janitor is None
+
+    # The first request of the process starts the janitor, the second reuses it
+    client = app.test_client()
+    client.get('/')
+    janitor = store.janitor
+    client.get('/')
+    assert store.janitor is janitor
+
+    deadline = time.time() + 5
+    while legacy.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert not legacy.exists()
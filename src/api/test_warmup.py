@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Test script for the pre-fork engine warmup
+"""
+
+from locale_service import LocaleService
+from warmup import warm_up_engine
+
+
+def test_warm_up_engine_fills_detect_cache(tmp_path):
+    (tmp_path / 'Page.tsx').write_text('<h1>상품 목록</h1>', encoding='utf-8')
+    (tmp_path / 'notes.txt').write_text('<h1>무시</h1>', encoding='utf-8')
+    service = LocaleService()
+
+    stats = warm_up_engine(service, [str(tmp_path), str(tmp_path / 'missing')])
+
+    assert stats['files'] == 1
+    assert stats['cached_strings'] == service.cache_stats()['size']
+    misses = service.cache_stats()['misses']
+    service.detect_korean_text('상품 목록')
+    service.detect_korean_text('저장')
+    assert service.cache_stats()['misses'] == misses
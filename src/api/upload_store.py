@@ -0,0 +1,210 @@
+"""
+Content-addressed storage for uploads kept on disk.
+
+Uploads used to be written into UPLOAD_FOLDER under their own filename,
+with a `.backup` copy of whatever was there before: the directory grew
+without bound and same-name uploads from different users replaced each
+other. Uploads are now stored once per distinct content, under the
+SHA-256 of their text, so identical uploads share one file and different
+ones never collide.
+
+Storage is bounded by a TTL and a byte quota. Every save refreshes the
+file's mtime, so the mtime is the time of last use: a background janitor
+thread removes files unused for longer than the TTL, then the least
+recently used ones until the store fits the quota. Request threads never
+evict; a save that takes the store over the quota only wakes the janitor.
+Legacy uploads (`*.tsx` and `*.tsx.backup` at the top of UPLOAD_FOLDER)
+are expired by the same TTL.
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from scan_store import content_hash
+
+UPLOAD_STORE_DIR = os.environ.get(
+    'LOCALE_TOOL_UPLOAD_STORE_DIR',
+    os.path.join(os.path.expanduser('~'), 'locale_tool_uploads', 'files')
+)
+UPLOAD_QUOTA_BYTES = int(float(os.environ.get('LOCALE_TOOL_UPLOAD_QUOTA_MB', 512)) * 1024 * 1024)
+# Seconds an upload is kept after it was last saved
+UPLOAD_TTL = int(os.environ.get('LOCALE_TOOL_UPLOAD_TTL', 7 * 24 * 3600))
+
+BLOB_NAME_PATTERN = re.compile(r'^[0-9a-f]{64}\.tsx$')
+LEGACY_SUFFIXES = ('.tsx', '.tsx.backup')
+
+
+class QuotaExceededError(Exception):
+    """Raised when a single upload is larger than the whole upload quota"""
+
+
+class UploadStore:
+    """Uploads stored by content hash, bounded by a TTL and a byte quota"""
+
+    def __init__(self, root: str = UPLOAD_STORE_DIR, quota_bytes: int = UPLOAD_QUOTA_BYTES,
+                 ttl: int = UPLOAD_TTL, legacy_dir: Optional[str] = None):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.ttl = ttl
+        self.legacy_dir = legacy_dir
+        # Bytes stored as of the last sweep plus this process's saves since
+        self.usage_bytes = 0
+        self.wakeup = threading.Event()
+        self.start_lock = threading.Lock()
+        self.janitor: Optional[threading.Thread] = None
+
+    def path(self, digest: str) -> str:
+        """Path of the upload with the given content hash"""
+        if not BLOB_NAME_PATTERN.match(digest + '.tsx'):
+            raise KeyError(digest)
+        return os.path.join(self.root, digest[:2], digest + '.tsx')
+
+    # The janitor is started lazily so importing the app never spawns threads
+    # (important when gunicorn preloads the app before forking workers)
+
+    def start(self):
+        # A janitor started before a fork is not running in the child
+        if self.janitor is not None and self.janitor.is_alive():
+            return
+        with self.start_lock:
+            if self.janitor is not None and self.janitor.is_alive():
+                return
+            self.janitor = threading.Thread(target=self._janitor_loop, name='locale-upload-janitor', daemon=True)
+            self.janitor.start()
+
+    def save(self, content: str) -> str:
+        """Store content (once per distinct content) and return its path
+
+        Raises QuotaExceededError if the content alone is larger than the quota.
+        """
+        self.start()
+        path = self.path(content_hash(content))
+        try:
+            # Already stored: only mark it as recently used
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        data = content.encode('utf-8')
+        if len(data) > self.quota_bytes:
+            raise QuotaExceededError(
+                f'Upload of {len(data)} bytes exceeds the upload quota of {self.quota_bytes} bytes'
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Concurrent saves of the same content each write their own temporary file
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self.usage_bytes += len(data)
+        if self.usage_bytes > self.quota_bytes:
+            self.wakeup.set()
+        return path
+
+    def get(self, digest: str) -> Optional[str]:
+        """Content of a stored upload, or None if it is unknown or evicted"""
+        try:
+            path = self.path(digest)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            os.utime(path)
+        except (KeyError, OSError, UnicodeDecodeError):
+            return None
+        return content
+
+    # Eviction
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], List[Tuple[float, str]]]:
+        """(mtime, size, path) of the stored uploads, and (mtime, path) of stale files"""
+        blobs = []
+        stale = []
+        if os.path.isdir(self.root):
+            for shard in os.scandir(self.root):
+                if not shard.is_dir() or len(shard.name) != 2:
+                    continue
+                for entry in os.scandir(shard.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if BLOB_NAME_PATTERN.match(entry.name):
+                        blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif entry.name.endswith('.tmp'):
+                        # Left behind by an interrupted save
+                        stale.append((stat.st_mtime, entry.path))
+        if self.legacy_dir is not None and os.path.isdir(self.legacy_dir):
+            for entry in os.scandir(self.legacy_dir):
+                if entry.is_file() and entry.name.endswith(LEGACY_SUFFIXES):
+                    try:
+                        stale.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+        return blobs, stale
+
+    def sweep(self) -> Dict:
+        """Remove uploads past the TTL, then the least recently used ones over the quota"""
+        now = time.time()
+        blobs, stale = self._scan()
+        removed = 0
+        for mtime, path in stale:
+            if mtime + self.ttl < now and self._remove(path):
+                removed += 1
+
+        kept = []
+        for mtime, size, path in blobs:
+            if mtime + self.ttl < now:
+                if self._remove(path):
+                    removed += 1
+            else:
+                kept.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        kept.sort()
+        evicted = 0
+        for mtime, size, path in kept:
+            if total <= self.quota_bytes:
+                break
+            if self._remove(path):
+                evicted += 1
+            total -= size
+
+        self.usage_bytes = total
+        return {
+            'expired': removed,
+            'evicted': evicted,
+            'files': len(kept) - evicted,
+            'bytes': total
+        }
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def _janitor_loop(self):
+        interval = max(1, min(3600, self.ttl // 10))
+        while True:
+            try:
+                self.sweep()
+            except OSError:
+                pass
+            self.wakeup.wait(interval)
+            self.wakeup.clear()
+
+
+def init_upload_store(app, store: UploadStore):
+    """Start the janitor of store in every process that serves a request
+
+    Legacy uploads and files past the TTL expire even in workers that never
+    save an upload.
+    """
+    app.before_request(store.start)
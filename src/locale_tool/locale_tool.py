@@ -1,28 +1,50 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import re
 import os
+import sys
 import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple, Dict
 import json
 
+# Shared engine helpers live next to the API (no Flask dependency)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api'))
+
+from locale_service import LocaleService, ScanBudgetExceeded
+from batch import apply_batch, classify_elements, find_tsx_files, search_file
+
+# Number of result rows inserted into the results table at a time
+RESULTS_PAGE_SIZE = 200
+
 class LocaleTool:
     def __init__(self, root):
         self.root = root
         self.root.title("Locale Tool - BT/BVT Template Updater")
         self.root.geometry("800x600")
         
-        # Korean language detection pattern
-        self.korean_pattern = re.compile(r'[가-힣]+')
-        
-        # Template patterns - updated to match actual template formats
-        self.bt_template = r'\{bt\("W\d+",\s*"([^"]+)"\)\}'
-        self.bvt_template = r'\{bvt\(([^)]+)\)\}'
+        # Same detection and rewrite engine as the API and the CLI
+        self.service = LocaleService()
         
         # File content
         self.current_file_content = ""
         self.current_file_path = ""
         
+        # Search results table state (rows are loaded lazily, a page at a time)
+        self.search_results = []
+        self.results_loaded = 0
+        self.results_loading = False
+        self.sort_column = 'line'
+        self.sort_reverse = False
+        self.source_text_content = None
+        
+        # Folder workspace: per-file scan results cached by path
+        self.workspace_root = ""
+        self.workspace_files = []
+        self.workspace_results = {}
+        self.workspace_futures = {}
+        self.workspace_executor = None
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -40,7 +62,10 @@ class LocaleTool:
         self.file_path_var = tk.StringVar()
         file_entry = ttk.Entry(main_frame, textvariable=self.file_path_var, width=50)
         file_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 0), pady=5)
-        ttk.Button(main_frame, text="Browse", command=self.browse_file).grid(row=0, column=2, padx=(5, 0), pady=5)
+        browse_frame = ttk.Frame(main_frame)
+        browse_frame.grid(row=0, column=2, padx=(5, 0), pady=5)
+        ttk.Button(browse_frame, text="Browse", command=self.browse_file).pack(side=tk.LEFT)
+        ttk.Button(browse_frame, text="Open Folder", command=self.browse_folder).pack(side=tk.LEFT, padx=(5, 0))
         
         # Template selection (BVT temporarily disabled)
         ttk.Label(main_frame, text="Template:").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -73,12 +98,67 @@ class LocaleTool:
         self.apply_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.apply_frame, text="Apply Results")
         
-        # Search results
-        self.search_text = tk.Text(self.search_frame, height=15, width=80)
-        search_scrollbar = ttk.Scrollbar(self.search_frame, orient=tk.VERTICAL, command=self.search_text.yview)
-        self.search_text.configure(yscrollcommand=search_scrollbar.set)
-        self.search_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        search_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Source tab (target of double-click on a result row)
+        self.source_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.source_frame, text="Source")
+        
+        # Workspace tab (folder mode)
+        self.workspace_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.workspace_frame, text="Workspace")
+        
+        # Search results table
+        self.search_summary_var = tk.StringVar(value="")
+        ttk.Label(self.search_frame, textvariable=self.search_summary_var).pack(side=tk.TOP, anchor=tk.W, pady=(0, 5))
+        
+        columns = ('tag', 'korean', 'line', 'status')
+        self.results_tree = ttk.Treeview(self.search_frame, columns=columns, show='headings', selectmode='browse', height=15)
+        for column, heading, width, anchor in (
+            ('tag', 'Tag', 120, tk.W),
+            ('korean', 'Korean text', 380, tk.W),
+            ('line', 'Line', 80, tk.E),
+            ('status', 'Status', 120, tk.W),
+        ):
+            self.results_tree.heading(column, text=heading, command=lambda c=column: self.sort_results(c))
+            self.results_tree.column(column, width=width, anchor=anchor, stretch=(column == 'korean'))
+        self.search_scrollbar = ttk.Scrollbar(self.search_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=self.on_results_scroll)
+        self.results_tree.bind('<Double-1>', self.on_result_double_click)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.search_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Source view
+        self.source_text = tk.Text(self.source_frame, height=15, width=80, wrap=tk.NONE)
+        self.source_text.tag_configure('highlight', background='yellow')
+        source_scrollbar = ttk.Scrollbar(self.source_frame, orient=tk.VERTICAL, command=self.source_text.yview)
+        self.source_text.configure(yscrollcommand=source_scrollbar.set, state=tk.DISABLED)
+        self.source_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        source_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Workspace file list with scan progress
+        workspace_top = ttk.Frame(self.workspace_frame)
+        workspace_top.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        self.workspace_progress_var = tk.StringVar(value="Open a folder to scan all TSX files in a project.")
+        ttk.Label(workspace_top, textvariable=self.workspace_progress_var).pack(side=tk.LEFT)
+        self.workspace_progress = ttk.Progressbar(workspace_top, mode='determinate', length=200)
+        self.workspace_progress.pack(side=tk.RIGHT)
+        
+        workspace_buttons = ttk.Frame(self.workspace_frame)
+        workspace_buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        ttk.Button(workspace_buttons, text="Apply Template to Selected", command=self.apply_template_to_selected).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(workspace_buttons, text="Rescan Folder", command=self.scan_workspace).pack(side=tk.LEFT)
+        
+        self.workspace_tree = ttk.Treeview(self.workspace_frame, columns=('file', 'untemplated', 'status'), show='headings', selectmode='extended', height=12)
+        self.workspace_tree.heading('file', text='File')
+        self.workspace_tree.heading('untemplated', text='Untemplated')
+        self.workspace_tree.heading('status', text='Status')
+        self.workspace_tree.column('file', width=460, stretch=True)
+        self.workspace_tree.column('untemplated', width=100, anchor=tk.E, stretch=False)
+        self.workspace_tree.column('status', width=120, stretch=False)
+        workspace_scrollbar = ttk.Scrollbar(self.workspace_frame, orient=tk.VERTICAL, command=self.workspace_tree.yview)
+        self.workspace_tree.configure(yscrollcommand=workspace_scrollbar.set)
+        self.workspace_tree.bind('<Double-1>', self.on_workspace_double_click)
+        self.workspace_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        workspace_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Apply results
         self.apply_text = tk.Text(self.apply_frame, height=15, width=80)
@@ -105,6 +185,158 @@ class LocaleTool:
             self.current_file_path = file_path
             self.load_file_content()
     
+    def browse_folder(self):
+        folder = filedialog.askdirectory(title="Select Project Folder")
+        if folder:
+            self.workspace_root = folder
+            self.file_path_var.set(folder)
+            self.scan_workspace()
+    
+    def scan_workspace(self):
+        """Scan every TSX file in the workspace folder in a background process pool"""
+        if not self.workspace_root:
+            messagebox.showwarning("Warning", "Please open a folder first")
+            return
+        if self.workspace_futures:
+            messagebox.showinfo("Info", "A workspace scan is already running")
+            return
+        
+        self.workspace_files = find_tsx_files(self.workspace_root)
+        self.workspace_results = {}
+        self.workspace_tree.delete(*self.workspace_tree.get_children())
+        for path in self.workspace_files:
+            self.workspace_tree.insert('', tk.END, iid=path, values=(os.path.relpath(path, self.workspace_root), '', 'Scanning...'))
+        
+        self.notebook.select(self.workspace_frame)
+        self._scan_workspace_files(self.workspace_files)
+    
+    def _scan_workspace_files(self, paths: List[str]):
+        if not paths:
+            self.workspace_progress_var.set("No TSX files found.")
+            return
+        self.workspace_progress.configure(maximum=max(1, len(self.workspace_files)), value=len(self.workspace_results))
+        self.workspace_scan_start = time.time()
+        self.workspace_executor = ProcessPoolExecutor()
+        self.workspace_futures = {self.workspace_executor.submit(search_file, path): path for path in paths}
+        self.root.after(100, self._poll_workspace_scan)
+    
+    def _poll_workspace_scan(self):
+        """Collect finished scans on the Tk thread and update the progress bar"""
+        for future in [f for f in self.workspace_futures if f.done()]:
+            path = self.workspace_futures.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'path': path, 'success': False, 'error': str(e)}
+            self._store_workspace_result(result)
+            self.workspace_progress.step(1)
+        
+        done = len(self.workspace_results)
+        total = len(self.workspace_files)
+        if self.workspace_futures:
+            self.workspace_progress_var.set(f"Scanning {done}/{total} files...")
+            self.root.after(100, self._poll_workspace_scan)
+        else:
+            self.workspace_executor.shutdown(wait=False)
+            self.workspace_executor = None
+            untemplated = sum(r.get('count', 0) for r in self.workspace_results.values())
+            duration = time.time() - self.workspace_scan_start
+            self.workspace_progress_var.set(f"Scanned {total} files: {untemplated} untemplated elements.")
+            self.status_var.set(f"Workspace scan completed in {duration:.2f}s.")
+    
+    def _store_workspace_result(self, result: Dict):
+        path = result['path']
+        self.workspace_results[path] = result
+        if not self.workspace_tree.exists(path):
+            return
+        if result['success']:
+            status = 'Untemplated' if result['count'] else 'OK'
+            self.workspace_tree.item(path, values=(os.path.relpath(path, self.workspace_root), result['count'], status))
+        else:
+            self.workspace_tree.item(path, values=(os.path.relpath(path, self.workspace_root), '', 'Error'))
+    
+    def on_workspace_double_click(self, event):
+        path = self.workspace_tree.identify_row(event.y)
+        if path:
+            self.open_workspace_file(path)
+    
+    def open_workspace_file(self, path: str):
+        """Switch to a workspace file, reusing its cached scan result"""
+        self.current_file_path = path
+        self.file_path_var.set(path)
+        self.load_file_content()
+        
+        result = self.workspace_results.get(path)
+        if result is None or not result['success'] or result['mtime'] != os.path.getmtime(path):
+            # Not scanned yet or changed on disk since the scan
+            result = search_file(path)
+            self._store_workspace_result(result)
+        if not result['success']:
+            messagebox.showerror("Error", f"Failed to scan file: {result['error']}")
+            return
+        
+        self.show_search_results(result['elements'])
+        self.search_summary_var.set(
+            f"Found {result['count']} untemplated Korean elements "
+            f"({len(result['elements'])} Korean elements in total). Double-click a row to jump to it."
+        )
+        self.notebook.select(0)
+    
+    def apply_template_to_selected(self):
+        """Apply the BT template to the selected workspace files in bulk"""
+        paths = list(self.workspace_tree.selection())
+        if not paths:
+            messagebox.showwarning("Warning", "Please select one or more files in the workspace")
+            return
+        if self.workspace_futures:
+            messagebox.showinfo("Info", "Please wait for the workspace scan to finish")
+            return
+        if self.template_var.get() != "bt":
+            messagebox.showinfo("Info", "BVT Template is temporarily disabled. Only BT Template is available.")
+            return
+        
+        self.status_var.set(f"Applying template to {len(paths)} files...")
+        outcome = {}
+        
+        def worker():
+            try:
+                outcome['result'] = apply_batch(paths, write=True, assign_ids=False)
+            except Exception as e:
+                outcome['error'] = str(e)
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        
+        def poll():
+            if thread.is_alive():
+                self.root.after(100, poll)
+                return
+            if 'error' in outcome:
+                messagebox.showerror("Error", f"Failed to apply template: {outcome['error']}")
+                self.status_var.set("Error applying template")
+                return
+            self._show_bulk_apply_result(outcome['result'])
+            # Rescan the changed files so the cache stays current
+            for path in paths:
+                self.workspace_results.pop(path, None)
+                self.workspace_tree.item(path, values=(os.path.relpath(path, self.workspace_root), '', 'Scanning...'))
+            self._scan_workspace_files(paths)
+        
+        self.root.after(100, poll)
+    
+    def _show_bulk_apply_result(self, result: Dict):
+        self.apply_text.delete(1.0, tk.END)
+        self.apply_text.insert(tk.END, "Bulk template application completed!\n\n")
+        self.apply_text.insert(tk.END, f"Files processed: {result['files_scanned']}\n")
+        self.apply_text.insert(tk.END, f"Files changed: {result['files_changed']}\n")
+        self.apply_text.insert(tk.END, f"Replacements made: {result['replacements_count']}\n")
+        self.apply_text.insert(tk.END, f"Duration: {result['duration']:.2f}s\n")
+        for error in result['errors']:
+            self.apply_text.insert(tk.END, f"Error in {os.path.basename(error['path'])}: {error['error']}\n")
+        self.apply_text.insert(tk.END, "Backups created as .backup files next to each changed file\n")
+        self.status_var.set(result['message'])
+        self.notebook.select(1)
+    
     def load_file_content(self):
         try:
             with open(self.current_file_path, 'r', encoding='utf-8') as file:
@@ -114,118 +346,6 @@ class LocaleTool:
             messagebox.showerror("Error", f"Failed to load file: {str(e)}")
             self.status_var.set("Error loading file")
     
-    def detect_korean_text(self, text: str) -> List[str]:
-        """Detect Korean text in the given string"""
-        # Find all Korean text segments first
-        korean_segments = self.korean_pattern.findall(text)
-        
-        if not korean_segments:
-            return []
-        
-        # If there's only one segment, return it
-        if len(korean_segments) == 1:
-            return korean_segments
-        
-        # If there are multiple segments, try to find the largest continuous block
-        # Look for patterns like "다운로드 란눌" where Korean words are separated by spaces
-        largest_joined = ""
-        
-        # Try all possible combinations of segments
-        for i in range(len(korean_segments)):
-            for j in range(i + 1, len(korean_segments) + 1):
-                # Try to join segments from i to j-1
-                joined_text = " ".join(korean_segments[i:j])
-                # Check if this joined text exists in the original text
-                if joined_text in text and len(joined_text) > len(largest_joined):
-                    largest_joined = joined_text
-        
-        # If we found a joined text, return it
-        if largest_joined:
-            return [largest_joined]
-        
-        # If no joined text found, return all segments (this handles cases where they can't be joined)
-        return korean_segments
-    
-    def find_tsx_elements_with_korean(self, content: str) -> List[Dict]:
-        """Find TSX elements containing Korean text"""
-        elements = []
-        
-        # First, find simple elements (those without nested tags) - these are what we want
-        simple_pattern = r'<(\w+)([^>]*?)>([^<]*)</\1>'
-        
-        for match in re.finditer(simple_pattern, content):
-            tag_name = match.group(1)
-            attributes = match.group(2)
-            inner_text = match.group(3).strip()
-            
-            # Check if inner text contains Korean
-            korean_texts = self.detect_korean_text(inner_text)
-            if korean_texts:
-                elements.append({
-                    'tag': tag_name,
-                    'attributes': attributes,
-                    'inner_text': inner_text,
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_simple': True
-                })
-        
-        # Also check for self-closing tags with Korean text in attributes
-        self_closing_pattern = r'<(\w+)([^>]*?)/>'
-        for match in re.finditer(self_closing_pattern, content):
-            tag_name = match.group(1)
-            attributes = match.group(2)
-            
-            # Check if attributes contain Korean text
-            korean_texts = self.detect_korean_text(attributes)
-            if korean_texts:
-                elements.append({
-                    'tag': tag_name,
-                    'attributes': attributes,
-                    'inner_text': '',
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_self_closing': True
-                })
-        
-        # Also check for attributes with Korean text (placeholder, label, title, etc.)
-        attr_pattern = r'(\w+)=["\']([^"\']*[가-힣]+[^"\']*)["\']'
-        for match in re.finditer(attr_pattern, content):
-            attr_name = match.group(1)
-            attr_value = match.group(2)
-            korean_texts = self.detect_korean_text(attr_value)
-            if korean_texts:
-                elements.append({
-                    'tag': 'attribute',
-                    'attributes': f'{attr_name}="{attr_value}"',
-                    'inner_text': attr_value,
-                    'korean_texts': korean_texts,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'full_match': match.group(0),
-                    'is_attribute': True
-                })
-        
-        return elements
-    
-    def is_already_templated(self, text: str, template_type: str) -> bool:
-        """Check if text already has the specified template"""
-        if template_type == "bt":
-            return bool(re.search(self.bt_template, text))
-        elif template_type == "bvt":
-            return bool(re.search(self.bvt_template, text))
-        return False
-    
-    def has_any_template(self, text: str) -> bool:
-        """Check if text has any template (bt or bvt)"""
-        # Check for BT templates with any W number (e.g., W1152, W10979, etc.)
-        bt_pattern = r'\{bt\("W\d+",\s*"[^"]+"\)\}'
-        return bool(re.search(bt_pattern, text) or re.search(self.bvt_template, text))
-    
     def search_untemplated(self):
         """Search for elements without templates"""
         if not self.current_file_content:
@@ -234,36 +354,101 @@ class LocaleTool:
         
         start_time = time.time()
         
-        # Find elements with Korean text
-        elements = self.find_tsx_elements_with_korean(self.current_file_content)
-        
-        # Filter out already templated elements
-        untemplated_elements = []
-        for element in elements:
-            if not self.has_any_template(element['full_match']):
-                untemplated_elements.append(element)
+        # Classify every Korean element; untemplated ones are the search hits
+        try:
+            elements, untemplated_count = classify_elements(self.current_file_content, self.service)
+        except ScanBudgetExceeded as e:
+            messagebox.showerror("Error", f"Failed to scan file: {str(e)}")
+            self.status_var.set("Error searching file")
+            return
         
         # Display results
-        self.search_text.delete(1.0, tk.END)
-        
-        if not untemplated_elements:
-            self.search_text.insert(tk.END, "No untemplated Korean elements found.\n")
+        self.show_search_results(elements)
+        if not elements:
+            self.search_summary_var.set("No untemplated Korean elements found.")
         else:
-            self.search_text.insert(tk.END, f"Found {len(untemplated_elements)} untemplated Korean elements:\n\n")
-            
-            for i, element in enumerate(untemplated_elements, 1):
-                if element.get('is_attribute'):
-                    self.search_text.insert(tk.END, f"{i}. Attribute: {element['attributes']}\n")
-                elif element.get('is_self_closing'):
-                    self.search_text.insert(tk.END, f"{i}. Self-closing: <{element['tag']}{element['attributes']}/>\n")
-                else:
-                    self.search_text.insert(tk.END, f"{i}. Element: <{element['tag']}{element['attributes']}>{element['inner_text']}</{element['tag']}>\n")
-                
-                self.search_text.insert(tk.END, f"   Korean text: {', '.join(element['korean_texts'])}\n")
-                self.search_text.insert(tk.END, f"   Position: {element['start']}-{element['end']}\n\n")
+            self.search_summary_var.set(
+                f"Found {untemplated_count} untemplated Korean elements "
+                f"({len(elements)} Korean elements in total). Double-click a row to jump to it."
+            )
         
         duration = time.time() - start_time
-        self.status_var.set(f"Search completed in {duration:.2f}s. Found {len(untemplated_elements)} untemplated elements.")
+        self.status_var.set(f"Search completed in {duration:.2f}s. Found {untemplated_count} untemplated elements.")
+        self.notebook.select(0)
+    
+    def show_search_results(self, elements: List[Dict]):
+        """Replace the results table contents, sorted by the current sort column"""
+        self.search_results = elements
+        self._sort_search_results()
+        self._reload_results()
+    
+    def _sort_search_results(self):
+        sort_keys = {
+            'tag': lambda e: (e['tag'], e['line'], e['column']),
+            'korean': lambda e: (', '.join(e['korean_texts']), e['line'], e['column']),
+            'line': lambda e: (e['line'], e['column']),
+            'status': lambda e: (e['status'] != 'Untemplated', e['line'], e['column']),
+        }
+        self.search_results.sort(key=sort_keys[self.sort_column], reverse=self.sort_reverse)
+    
+    def sort_results(self, column: str):
+        """Sort the results table by a column (clicking twice reverses the order)"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._sort_search_results()
+        self._reload_results()
+    
+    def _reload_results(self):
+        # Only the rows loaded so far exist in the widget, so this stays cheap
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.results_loaded = 0
+        self.load_more_results()
+    
+    def load_more_results(self):
+        """Insert the next page of result rows into the table"""
+        self.results_loading = False
+        end = min(self.results_loaded + RESULTS_PAGE_SIZE, len(self.search_results))
+        for index in range(self.results_loaded, end):
+            element = self.search_results[index]
+            tag = 'attribute' if element.get('is_attribute') else element['tag']
+            self.results_tree.insert('', tk.END, iid=str(index), values=(
+                tag,
+                ', '.join(element['korean_texts']),
+                element['line'],
+                element['status']
+            ))
+        self.results_loaded = end
+    
+    def on_results_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more rows when nearing the end"""
+        self.search_scrollbar.set(first, last)
+        if float(last) > 0.9 and self.results_loaded < len(self.search_results) and not self.results_loading:
+            self.results_loading = True
+            self.root.after_idle(self.load_more_results)
+    
+    def on_result_double_click(self, event):
+        row = self.results_tree.identify_row(event.y)
+        if row:
+            self.show_source_location(self.search_results[int(row)])
+    
+    def show_source_location(self, element: Dict):
+        """Show the loaded file in the Source tab and highlight the element"""
+        if self.source_text_content is not self.current_file_content:
+            self.source_text.configure(state=tk.NORMAL)
+            self.source_text.delete(1.0, tk.END)
+            self.source_text.insert(tk.END, self.current_file_content)
+            self.source_text.configure(state=tk.DISABLED)
+            self.source_text_content = self.current_file_content
+        
+        start = f"{element['line']}.{element['column'] - 1}"
+        end = f"{element['end_line']}.{element['end_column'] - 1}"
+        self.source_text.tag_remove('highlight', 1.0, tk.END)
+        self.source_text.tag_add('highlight', start, end)
+        self.notebook.select(self.source_frame)
+        self.source_text.see(start)
     
     def apply_template(self):
         """Apply selected template to the file"""
@@ -272,7 +457,16 @@ class LocaleTool:
             return
         
         template_type = self.template_var.get()
-        start_time = time.time()
+        if template_type == "bvt":
+            # BVT template temporarily disabled
+            messagebox.showinfo("Info", "BVT Template is temporarily disabled. Only BT Template is available.")
+            return
+        
+        result = self.service.apply_template(self.current_file_content, template_type)
+        if not result['success']:
+            messagebox.showerror("Error", result['error'])
+            self.status_var.set("Error applying template")
+            return
         
         try:
             # Create backup
@@ -280,79 +474,16 @@ class LocaleTool:
             with open(backup_path, 'w', encoding='utf-8') as backup_file:
                 backup_file.write(self.current_file_content)
             
-            # Find and replace elements
-            updated_content = self.current_file_content
-            replacements_count = 0
-            
-            if template_type == "bt":
-                # Process simple JSX elements one by one to avoid multiple replacements
-                # Use the same approach as search: simple elements first
-                simple_pattern = r'<(\w+)([^>]*?)>([^<]*)</\1>'
-                
-                # Find all simple matches first (these are usually the ones we want)
-                simple_matches = list(re.finditer(simple_pattern, updated_content))
-                
-                # Process simple matches in reverse order to avoid position shifting issues
-                for match in reversed(simple_matches):
-                    tag_name = match.group(1)
-                    attributes = match.group(2)
-                    inner_text = match.group(3)
-                    
-                    # Check if already templated
-                    if self.has_any_template(match.group(0)):
-                        continue
-                    
-                    # Check if inner text contains Korean
-                    korean_texts = self.detect_korean_text(inner_text)
-                    if not korean_texts:
-                        continue
-                    
-                    # Apply BT template to Korean text only
-                    replacements_count += 1
-                    # Replace Korean text with template, preserving exact whitespace and structure
-                    new_inner_text = inner_text
-                    for korean_text in korean_texts:
-                        # Only replace if this Korean text is not already in a template
-                        if not self.has_any_template(korean_text):
-                            new_inner_text = new_inner_text.replace(korean_text, f'{{bt("W#", "{korean_text}")}}')
-                    
-                    # Replace the entire match
-                    new_element = f'<{tag_name}{attributes}>{new_inner_text}</{tag_name}>'
-                    updated_content = updated_content[:match.start()] + new_element + updated_content[match.end():]
-                
-                # Replace attributes with Korean text
-                attr_pattern = r'(\w+)=["\']([^"\']*[가-힣]+[^"\']*)["\']'
-                
-                # Find all attribute matches first
-                attr_matches = list(re.finditer(attr_pattern, updated_content))
-                
-                # Process matches in reverse order to avoid position shifting issues
-                for match in reversed(attr_matches):
-                    attr_name = match.group(1)
-                    attr_value = match.group(2)
-                    
-                    # Check if already templated
-                    if self.has_any_template(match.group(0)):
-                        continue
-                    
-                    # Apply BT template
-                    replacements_count += 1
-                    new_attr = f'{attr_name}={{{"bt(\"W#\", \"" + attr_value + "\")"}}}'
-                    updated_content = updated_content[:match.start()] + new_attr + updated_content[match.end():]
-                
-            elif template_type == "bvt":
-                # BVT template temporarily disabled
-                messagebox.showinfo("Info", "BVT Template is temporarily disabled. Only BT Template is available.")
-                return
-            
             # Write updated content
+            updated_content = result['updated_content']
             with open(self.current_file_path, 'w', encoding='utf-8') as file:
                 file.write(updated_content)
             
             # Update current content
             self.current_file_content = updated_content
             
-            duration = time.time() - start_time
+            replacements_count = result['replacements_count']
+            duration = result['duration']
             
             # Display results
             self.apply_text.delete(1.0, tk.END)
@@ -362,7 +493,7 @@ class LocaleTool:
             self.apply_text.insert(tk.END, f"Duration: {duration:.2f}s\n")
             self.apply_text.insert(tk.END, f"Backup created: {os.path.basename(backup_path)}\n")
             
-            self.status_var.set(f"Template applied successfully! {replacements_count} replacements in {duration:.2f}s")
+            self.status_var.set(result['message'])
             
             # Switch to apply results tab
             self.notebook.select(1)
@@ -373,7 +504,9 @@ class LocaleTool:
     
     def clear_results(self):
         """Clear all result displays"""
-        self.search_text.delete(1.0, tk.END)
+        self.search_results = []
+        self._reload_results()
+        self.search_summary_var.set("")
         self.apply_text.delete(1.0, tk.END)
         self.status_var.set("Results cleared")
 